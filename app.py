@@ -3,54 +3,19 @@ Voicify - TTS Multilíngue Avançado
 Versão 2.0 com recursos melhorados e interface consistente
 """
 import streamlit as st
-import io
 import os
 import time
 import re
+import shutil
 import hashlib
+from collections import OrderedDict
 from datetime import datetime
-from typing import List, Dict, Any
-from gtts import gTTS
-
-# ============================================
-# CONFIGURAÇÕES
-# ============================================
-
-class VoicifyConfig:
-    """Configurações gerais da aplicação."""
-    APP_TITLE = "Voicify - TTS Multilíngue Avançado"
-    APP_ICON = "🎤"
-    VERSION = "2.0"
-    MAX_TEXT_LENGTH = 10000
-    MAX_BATCH_SIZE = 10
-    DEFAULT_SPEED = 1.0
-    MIN_SPEED = 0.5
-    MAX_SPEED = 2.0
-    ENABLE_CACHE = True
-    CACHE_DIR = ".audio_cache"
-
-
-class LanguageConfig:
-    """Configurações de idiomas e variantes."""
-    LANGUAGES = {
-        "🇧🇷 Português (Brasil)": {"code": "pt", "tld": "com.br"},
-        "🇵🇹 Português (Portugal)": {"code": "pt", "tld": "pt"},
-        "🇺🇸 Inglês (EUA)": {"code": "en", "tld": "com"},
-        "🇬🇧 Inglês (UK)": {"code": "en", "tld": "co.uk"},
-        "🇦🇺 Inglês (Austrália)": {"code": "en", "tld": "com.au"},
-        "🇪🇸 Espanhol (Espanha)": {"code": "es", "tld": "es"},
-        "🇲🇽 Espanhol (México)": {"code": "es", "tld": "com.mx"},
-        "🇫🇷 Francês": {"code": "fr", "tld": "fr"},
-        "🇩🇪 Alemão": {"code": "de", "tld": "de"},
-        "🇮🇹 Italiano": {"code": "it", "tld": "it"},
-        "🇷🇺 Russo": {"code": "ru", "tld": "ru"},
-        "🇨🇳 Chinês (Simplificado)": {"code": "zh-cn", "tld": "com"},
-        "🇯🇵 Japonês": {"code": "ja", "tld": "co.jp"},
-        "🇰🇷 Coreano": {"code": "ko", "tld": "co.kr"},
-        "🇸🇦 Árabe": {"code": "ar", "tld": "com"},
-        "🇮🇳 Hindi": {"code": "hi", "tld": "co.in"},
-    }
+from typing import Dict, Any, Optional, Callable
 
+from audio_generator import AudioGenerator, get_shared_generator
+from config import VoicifyConfig, LanguageConfig
+from metrics import start_http_server
+from job_queue import JobQueue, DONE, FINISHED, QUEUED, get_job_queue, start_purger, start_workers
 
 # CSS Customizado
 CUSTOM_CSS = """
@@ -323,32 +288,224 @@ def calculate_text_hash(text: str) -> str:
 # GERADOR DE ÁUDIO
 # ============================================
 
-def generate_audio(text: str, lang_code: str, tld: str = 'com') -> Dict[str, Any]:
-    """Gera áudio a partir do texto."""
-    try:
-        start_time = time.time()
-        
-        # Gerar áudio
-        tts = gTTS(text=text, lang=lang_code, tld=tld, slow=False)
-        audio_buffer = io.BytesIO()
-        tts.write_to_fp(audio_buffer)
-        audio_buffer.seek(0)
-        audio_data = audio_buffer.read()
-        
-        generation_time = time.time() - start_time
-        
-        return {
-            'success': True,
-            'audio_data': audio_data,
-            'size': len(audio_data),
-            'generation_time': generation_time
-        }
-        
-    except Exception as e:
-        return {
-            'success': False,
-            'error': str(e)
-        }
+@st.cache_resource
+def get_audio_generator() -> AudioGenerator:
+    """Gerador de áudio único do processo, compartilhado por todas as sessões."""
+    if VoicifyConfig.METRICS_PORT:
+        start_http_server(VoicifyConfig.METRICS_PORT)
+    
+    return get_shared_generator()
+
+
+STAGE_LABELS = {
+    'cache_lookup': "cache",
+    'synthesis': "síntese",
+    'speed_adjust': "velocidade",
+    'encoding': "codificação",
+    'cache_write': "gravação",
+}
+
+
+@st.cache_resource
+def get_jobs() -> JobQueue:
+    """Fila de jobs do processo; inicia os workers embutidos, se configurados."""
+    queue = get_job_queue()
+    # Limpeza periódica enquanto o Streamlit roda: jobs, áudios e links publicados
+    start_purger(queue, VoicifyConfig.JOB_RETENTION, VoicifyConfig.JOB_PURGE_INTERVAL, purge_published_audio)
+    
+    if VoicifyConfig.JOB_EMBEDDED_WORKERS:
+        start_workers(
+            queue,
+            get_audio_generator(),
+            VoicifyConfig.JOB_EMBEDDED_WORKERS,
+            VoicifyConfig.JOB_POLL_INTERVAL
+        )
+    
+    return queue
+
+
+def submit_generation(text: str, language: str, name: str, quality: str) -> str:
+    """Enfileira a geração do áudio e retorna o ID do job."""
+    lang_info = LanguageConfig.LANGUAGES[language]
+    
+    return get_jobs().submit({
+        'text': text,
+        'lang': lang_info['code'],
+        'tld': lang_info['tld'],
+        'name': name,
+        'language': language,
+        'quality': quality,
+    })
+
+
+PROGRESS_LABELS = {
+    'cache_lookup': "🔎 Consultando o cache...",
+    'synthesis': "🎙️ Sintetizando voz...",
+    'speed_adjust': "🎚️ Ajustando a velocidade...",
+    'encoding': "🎚️ Codificando o áudio...",
+    'cache_write': "💾 Salvando no cache...",
+    'done': "✅ Concluído!",
+}
+
+
+def job_wait_expired(job: Dict[str, Any]) -> bool:
+    """Indica se a interface já esperou o job por mais de JOB_WAIT_TIMEOUT."""
+    return time.time() - job['created'] > VoicifyConfig.JOB_WAIT_TIMEOUT
+
+
+@st.fragment(run_every=VoicifyConfig.JOB_POLL_INTERVAL)
+def job_progress(job_id: str):
+    """
+    Exibe o progresso informado pelo worker, consultando a fila uma vez por execução.
+    
+    Só este trecho da página é refeito a cada JOB_POLL_INTERVAL; quando o
+    job termina (ou o prazo de espera acaba), a página inteira é refeita.
+    """
+    job = get_jobs().get(job_id)
+    if job is None or job['status'] in FINISHED or job_wait_expired(job):
+        st.rerun()
+    
+    if job['status'] == QUEUED:
+        st.progress(0)
+        st.text("⏳ Aguardando na fila...")
+    else:
+        st.progress(job['progress'])
+        st.text(PROGRESS_LABELS.get(job['stage'], "🎙️ Sintetizando voz..."))
+
+
+def forget_job():
+    """Descarta o job exibido na sessão (e na URL)."""
+    st.session_state.current_job = None
+    st.query_params.pop("job", None)
+
+
+# Áudios entregues pelos arquivos estáticos do Streamlit (/app/static/audio)
+STATIC_AUDIO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "audio")
+
+
+def publish_audio(job_id: str, path: str, audio_format: str) -> Optional[str]:
+    """
+    Publica o áudio de um job nos arquivos estáticos do Streamlit.
+    
+    O arquivo publicado é um hard link (uma cópia, se o link não for
+    possível) e o player recebe a URL: o navegador baixa o áudio direto,
+    sem que ele passe pela memória do Streamlit a cada rerun. Requer
+    server.enableStaticServing (ativado em .streamlit/config.toml).
+    
+    Returns:
+        str: URL do áudio ou None se a entrega estática estiver desativada
+    """
+    if not st.get_option("server.enableStaticServing"):
+        return None
+    
+    name = f"{job_id}.{audio_format}"
+    target = os.path.join(STATIC_AUDIO_DIR, name)
+    
+    if not os.path.exists(target):
+        os.makedirs(STATIC_AUDIO_DIR, exist_ok=True)
+        tmp_path = f"{target}.{os.getpid()}.tmp"
+        try:
+            os.link(path, tmp_path)
+        except OSError:
+            shutil.copyfile(path, tmp_path)
+        os.replace(tmp_path, target)
+    
+    return f"/app/static/audio/{name}"
+
+
+def purge_published_audio(queue: JobQueue):
+    """Remove os áudios publicados de jobs que já saíram da fila."""
+    if not os.path.isdir(STATIC_AUDIO_DIR):
+        return
+    
+    for entry in os.scandir(STATIC_AUDIO_DIR):
+        job_id = entry.name.split('.', 1)[0]
+        if queue.get(job_id) is None:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+
+def locate_audio(job: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Encontra o arquivo do áudio de um job: na fila ou, em jobs antigos, no cache."""
+    result = job['result']
+    generator = get_audio_generator()
+    cache = generator.cache if generator.enable_cache else None
+    cache_key = result.get('cache_key')
+    # Consultas sem contar acesso: reexibir um áudio não é um novo uso do cache
+    in_cache = bool(cache_key) and cache is not None and cache.contains(cache_key)
+    
+    audio_format = result.get('format', 'mp3')
+    
+    path = get_jobs().result_path(job['id'], audio_format)
+    if not os.path.exists(path):
+        if not in_cache:
+            return None
+        path = cache.path_for(cache_key)
+    
+    # Com a API no ar, o navegador busca o áudio direto dela (Range e ETag);
+    # sem ela, dos arquivos estáticos do Streamlit
+    if in_cache and VoicifyConfig.AUDIO_BASE_URL:
+        source = f"{VoicifyConfig.AUDIO_BASE_URL.rstrip('/')}/v1/audio/{cache_key}"
+    else:
+        source = publish_audio(job['id'], path, audio_format) or path
+    
+    return {
+        'path': path,
+        'source': source,
+        'format': audio_format,
+        'mime': result.get('mime', VoicifyConfig.AUDIO_MIME_TYPES[audio_format]),
+    }
+
+
+def audio_reference(job: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Referência ao áudio de um job concluído, sem carregar os bytes.
+    
+    O player recebe uma URL (da API ou dos arquivos estáticos do
+    Streamlit) e o download só lê o arquivo quando é clicado, então nenhum
+    rerun copia o áudio. Com as duas entregas desativadas, o player recebe
+    o caminho do arquivo, que o Streamlit lê a cada rerun. A sessão guarda
+    as SESSION_AUDIO_MAX_ITEMS referências mais recentes.
+    
+    Returns:
+        dict: 'path', 'source' (para o st.audio), 'format' e 'mime'; None
+        se o áudio foi removido (expirado na fila)
+    """
+    refs = st.session_state.audio_refs
+    ref = refs.get(job['id'])
+    
+    if ref is None or not os.path.exists(ref['path']):
+        ref = locate_audio(job)
+        if ref is None:
+            refs.pop(job['id'], None)
+            return None
+    
+    refs[job['id']] = ref
+    refs.move_to_end(job['id'])
+    while len(refs) > VoicifyConfig.SESSION_AUDIO_MAX_ITEMS:
+        refs.popitem(last=False)
+    
+    return ref
+
+
+def file_reader(path: str) -> Callable[[], bytes]:
+    """Leitura adiada do arquivo, feita só quando o download é pedido."""
+    def read() -> bytes:
+        with open(path, 'rb') as f:
+            return f.read()
+    return read
+
+
+def format_timings(timings: Dict[str, float]) -> str:
+    """Resume o tempo das etapas que levaram pelo menos 1 ms."""
+    parts = [
+        f"{label} {timings[stage]:.2f}s"
+        for stage, label in STAGE_LABELS.items()
+        if timings.get(stage, 0) >= 0.001
+    ]
+    return " · ".join(parts) or "-"
 
 
 # ============================================
@@ -365,6 +522,15 @@ def init_session_state():
         st.session_state.total_characters = 0
     if 'show_stats' not in st.session_state:
         st.session_state.show_stats = True
+    if 'current_job' not in st.session_state:
+        # O ID na URL permite retomar o job após uma reconexão
+        st.session_state.current_job = st.query_params.get("job")
+    if 'recorded_jobs' not in st.session_state:
+        # Jobs já contados nas estatísticas (os mais recentes)
+        st.session_state.recorded_jobs = OrderedDict()
+    if 'audio_refs' not in st.session_state:
+        # Referências (não bytes) aos áudios gerados, das mais antigas às mais recentes
+        st.session_state.audio_refs = OrderedDict()
 
 
 # ============================================
@@ -485,9 +651,9 @@ with col_settings:
         # Qualidade
         quality = st.select_slider(
             "Qualidade de Áudio:",
-            options=["Baixa", "Média", "Alta"],
-            value="Alta",
-            help="Qualidade do áudio gerado"
+            options=list(VoicifyConfig.OUTPUT_PROFILES.keys()),
+            value=VoicifyConfig.DEFAULT_QUALITY,
+            help="Baixa: Opus compacto, ideal para prévias no celular · Média: MP3 menor (16 kHz) · Alta: MP3 original"
         )
         
         # Preview antes de gerar
@@ -525,92 +691,101 @@ if generate_button:
     elif not is_valid:
         st.error(message)
     else:
-        # Processar geração
-        with st.spinner("🎵 Gerando áudio..."):
-            progress_bar = st.progress(0)
-            status_text = st.empty()
-            
-            # Simular progresso
-            for i in range(30):
-                time.sleep(0.03)
-                progress_bar.progress(i / 100)
-                status_text.text(f"Preparando... {i}%")
-            
-            status_text.text("🎙️ Sintetizando voz...")
-            progress_bar.progress(50)
+        # Enfileirar a geração; o ID fica na sessão e na URL
+        job_id = submit_generation(text_input, selected_language, audio_name, quality)
+        st.session_state.current_job = job_id
+        st.query_params["job"] = job_id
+
+job_id = st.session_state.current_job
+job = get_jobs().get(job_id) if job_id else None
+job_pending = job is not None and job['status'] not in FINISHED
+
+if job_pending and job_wait_expired(job):
+    # Sem worker disponível (ou job travado): para de acompanhar
+    forget_job()
+    st.error("⏱️ O áudio não ficou pronto a tempo. Tente gerá-lo novamente mais tarde.")
+
+elif job_pending:
+    # Acompanhar o job sem prender a sessão
+    job_progress(job_id)
+
+elif job_id:
+    audio = audio_reference(job) if job and job['status'] == DONE else None
+    
+    if job is None or (job['status'] == DONE and audio is None):
+        forget_job()
+        st.warning("⚠️ Este áudio não está mais disponível. Gere-o novamente.")
+    
+    elif job['status'] == DONE:
+        # Sucesso!
+        params = job['params']
+        result = job['result']
+        text = params['text']
+        name = params['name']
+        file_size = result['size']
+        gen_time = result['timings']['total']
+        audio_format = audio['format']
+        
+        # Atualizar estatísticas uma única vez por job
+        recorded = st.session_state.recorded_jobs
+        if job_id not in recorded:
+            recorded[job_id] = True
+            while len(recorded) > VoicifyConfig.SESSION_AUDIO_MAX_ITEMS:
+                recorded.popitem(last=False)
+            st.session_state.total_audios += 1
+            st.session_state.total_characters += len(text)
             
-            # Gerar áudio
-            result = generate_audio(
-                text_input,
-                lang_info['code'],
-                lang_info['tld']
+            # Adicionar ao histórico
+            st.session_state.history.append({
+                'name': name,
+                'language': params['language'],
+                'size': file_size,
+                'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                'chars': len(text),
+                'words': count_words(text),
+                'duration': format_duration(estimate_audio_duration(text))
+            })
+        
+        # Exibir resultado
+        st.markdown(f"""
+            <div class='success-box animate-in'>
+                <h3>✅ Áudio Gerado com Sucesso!</h3>
+                <p><strong>📁 Nome:</strong> {name}.{audio_format}</p>
+                <p><strong>📊 Tamanho:</strong> {format_file_size(file_size)}</p>
+                <p><strong>⏱️ Tempo de geração:</strong> {gen_time:.2f}s ({format_timings(result['timings'])})</p>
+                <p><strong>🌍 Idioma:</strong> {params['language']}</p>
+                <p><strong>📝 Palavras:</strong> {count_words(text):,}</p>
+                <p><strong>🎵 Duração estimada:</strong> {format_duration(estimate_audio_duration(text))}</p>
+            </div>
+        """, unsafe_allow_html=True)
+        
+        if result.get('conversion_error'):
+            st.warning(f"⚠️ Não foi possível ajustar o áudio; exibindo a versão original: {result['conversion_error']}")
+        
+        # Player de áudio
+        st.markdown("### 🎵 Preview do Áudio")
+        st.audio(audio['source'], format=audio['mime'])
+        
+        # Botões de ação
+        col_download, col_new = st.columns(2)
+        
+        with col_download:
+            st.download_button(
+                label=f"📥 Baixar Áudio {audio_format.upper()}",
+                data=file_reader(audio['path']),
+                file_name=f"{sanitize_filename(name)}.{audio_format}",
+                mime=audio['mime'],
+                use_container_width=True
             )
-            
-            progress_bar.progress(100)
-            status_text.text("✅ Concluído!")
-            
-            if result['success']:
-                # Sucesso!
-                audio_data = result['audio_data']
-                file_size = result['size']
-                gen_time = result['generation_time']
-                
-                # Atualizar estatísticas
-                st.session_state.total_audios += 1
-                st.session_state.total_characters += len(text_input)
-                
-                # Adicionar ao histórico
-                st.session_state.history.append({
-                    'name': audio_name,
-                    'language': selected_language,
-                    'size': file_size,
-                    'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    'chars': len(text_input),
-                    'words': count_words(text_input),
-                    'duration': format_duration(estimate_audio_duration(text_input))
-                })
-                
-                time.sleep(0.5)
-                progress_bar.empty()
-                status_text.empty()
-                
-                # Exibir resultado
-                st.markdown(f"""
-                    <div class='success-box animate-in'>
-                        <h3>✅ Áudio Gerado com Sucesso!</h3>
-                        <p><strong>📁 Nome:</strong> {audio_name}.mp3</p>
-                        <p><strong>📊 Tamanho:</strong> {format_file_size(file_size)}</p>
-                        <p><strong>⏱️ Tempo de geração:</strong> {gen_time:.2f}s</p>
-                        <p><strong>🌍 Idioma:</strong> {selected_language}</p>
-                        <p><strong>📝 Palavras:</strong> {count_words(text_input):,}</p>
-                        <p><strong>🎵 Duração estimada:</strong> {format_duration(estimate_audio_duration(text_input))}</p>
-                    </div>
-                """, unsafe_allow_html=True)
-                
-                # Player de áudio
-                st.markdown("### 🎵 Preview do Áudio")
-                st.audio(audio_data, format='audio/mp3')
-                
-                # Botões de ação
-                col_download, col_new = st.columns(2)
-                
-                with col_download:
-                    st.download_button(
-                        label="📥 Baixar Áudio MP3",
-                        data=audio_data,
-                        file_name=f"{sanitize_filename(audio_name)}.mp3",
-                        mime="audio/mp3",
-                        use_container_width=True
-                    )
-                
-                with col_new:
-                    if st.button("🔄 Gerar Novo Áudio", use_container_width=True):
-                        st.rerun()
-                
-            else:
-                progress_bar.empty()
-                status_text.empty()
-                st.error(f"❌ Erro ao gerar áudio: {result['error']}")
+        
+        with col_new:
+            if st.button("🔄 Gerar Novo Áudio", use_container_width=True):
+                forget_job()
+                st.rerun()
+    
+    else:
+        forget_job()
+        st.error(f"❌ Erro ao gerar áudio: {job['error']}")
 
 # ============================================
 # HISTÓRICO E ESTATÍSTICAS
@@ -741,8 +916,8 @@ with st.sidebar:
             <p style='margin-top: 1rem; margin-bottom: 0; color: #0d47a1;'><strong>Limites:</strong></p>
             <ul style='margin: 0.5rem 0 0 0; padding-left: 1.5rem; color: #1565c0;'>
                 <li>Máx: 10.000 caracteres</li>
-                <li>Formato: MP3</li>
-                <li>Qualidade: Alta</li>
+                <li>Formato: MP3 (Opus/OGG na qualidade Baixa)</li>
+                <li>Qualidade: Baixa, Média ou Alta</li>
             </ul>
         </div>
     """, unsafe_allow_html=True)
@@ -3,83 +3,357 @@ Gerador de áudio avançado com cache e otimizações
 """
 import os
 import io
+import math
+import time
+import random
+import asyncio
 import logging
-from typing import Optional, Dict, Any
-from gtts import gTTS
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from itertools import islice
+from typing import Optional, Dict, Any, Iterator, Callable
+import numpy as np
 from pydub import AudioSegment
-from pydub.effects import speedup
 import streamlit as st
 
+from cache import DiskCache, MemoryCache
 from config import VoicifyConfig
-from utils import calculate_text_hash, split_text_into_chunks
+from metrics import (
+    StageTimer, COALESCED, RATE_LIMIT_TIMEOUTS, UPSTREAM_REQUESTS, UPSTREAM_ERRORS, UPSTREAM_THROTTLED,
+    record_generation
+)
+from mp3_utils import concat_mp3
+from rate_limiter import (
+    AdaptiveRateLimiter, RateLimitTimeout, UpstreamThrottledError, get_rate_limiter, is_congestion_error
+)
+from singleflight import SingleFlight
+from time_stretch import time_stretch
+from tts_backends import TTSBackend, GTTSBackend
+from utils import calculate_text_hash, detect_audio_format, split_text_into_sentences
 
 logger = logging.getLogger(__name__)
 
+# Intervalo para conferir os tempos limite de um lote em andamento
+_BATCH_POLL_INTERVAL = 0.05
+
+# Caracteres por requisição HTTP (o gTTS divide o texto em trechos de ~100)
+_CHARS_PER_REQUEST = 100
+
+# Recebe o progresso da geração (0 a 1) e a etapa atual (ver metrics.STAGES)
+ProgressCallback = Callable[[float, str], None]
+
+
+class AudioConversionError(Exception):
+    """Falha ao decodificar, ajustar a velocidade ou recodificar um áudio."""
+
+
+class DeadlineExceeded(Exception):
+    """O prazo do pedido (ex.: de um item do lote) acabou antes da chamada ao backend."""
+
+
+class _Progress:
+    """
+    Converte os eventos da geração em progresso para o progress_callback.
+    
+    A síntese ocupa a maior parte da faixa, dividida entre os chunks; o
+    ajuste de velocidade, quando há, ocupa o trecho seguinte. O valor
+    nunca diminui, mesmo com chunks terminando em threads diferentes, e
+    um erro no callback não interrompe a geração.
+    """
+    
+    LOOKUP = 0.05
+    
+    def __init__(self, callback: Optional[ProgressCallback], speed_adjust: bool = False):
+        self.callback = callback
+        self.synthesis_end = 0.7 if speed_adjust else 0.9
+        self._value = 0.0
+        self._lock = threading.Lock()
+    
+    def report(self, value: float, stage: str):
+        """Repassa o progresso ao callback (ignora valores menores que o atual)."""
+        if self.callback is None:
+            return
+        
+        with self._lock:
+            if value < self._value:
+                return
+            self._value = value
+            try:
+                self.callback(value, stage)
+            except Exception as e:
+                logger.warning(f"Erro no progress_callback: {e}")
+    
+    def synthesis(self, done: int, total: int):
+        """Chunks sintetizados (ou encontrados no cache) até agora."""
+        span = self.synthesis_end - self.LOOKUP
+        self.report(self.LOOKUP + span * done / max(total, 1), 'synthesis')
+    
+    def at(self, fraction: float, stage: str):
+        """Posição dentro do trecho após a síntese (0 = fim da síntese, 1 = fim)."""
+        self.report(self.synthesis_end + (1.0 - self.synthesis_end) * fraction, stage)
+
+
+class BatchResult(list):
+    """
+    Lista de resultados de generate_batch, na ordem dos textos de entrada.
+    
+    Attributes:
+        total_time: Tempo total do lote em segundos
+        critical_path_time: Tempo do item mais lento em segundos (o menor
+            tempo possível para o lote, mesmo com workers ilimitados)
+    """
+    
+    def __init__(self, results=(), total_time: float = 0.0, critical_path_time: float = 0.0):
+        super().__init__(results)
+        self.total_time = total_time
+        self.critical_path_time = critical_path_time
+
 
 class AudioGenerator:
     """Classe para gerar áudio a partir de texto."""
     
-    def __init__(self, enable_cache: bool = True):
+    def __init__(
+        self,
+        enable_cache: bool = True,
+        backend: Optional[TTSBackend] = None,
+        cache_dir: Optional[str] = None,
+        rate_limiter: Optional[AdaptiveRateLimiter] = None
+    ):
         """
         Inicializa o gerador de áudio.
         
         Args:
             enable_cache: Se deve usar cache
+            backend: Backend de síntese (padrão: GTTSBackend)
+            cache_dir: Diretório do cache em disco (padrão: CACHE_DIR)
+            rate_limiter: Limitador das chamadas ao backend (padrão: o
+                limitador compartilhado do processo)
         """
         self.config = VoicifyConfig()
         self.enable_cache = enable_cache
+        self.cache_dir = cache_dir or self.config.CACHE_DIR
+        
+        if backend is None:
+            backend = GTTSBackend(
+                max_connections=self.config.ASYNC_MAX_CONCURRENCY,
+                max_keepalive_connections=self.config.ASYNC_MAX_KEEPALIVE,
+                timeout=self.config.ASYNC_HTTP_TIMEOUT,
+                pool_size=self.config.HTTP_POOL_SIZE,
+                max_retries=self.config.HTTP_MAX_RETRIES,
+                backoff_factor=self.config.HTTP_BACKOFF_FACTOR,
+                endpoint=self.config.GTTS_ENDPOINT
+            )
+        self.backend = backend
+        self.rate_limiter = rate_limiter or get_rate_limiter()
         
+        # Semáforo da API assíncrona, ligado ao event loop em uso
+        self._async_loop = None
+        self._async_semaphore = None
+
         if self.enable_cache:
             self._init_cache()
+        
+        # Sínteses idênticas simultâneas rodam uma única vez (entre
+        # processos, via locks de arquivo ao lado do cache)
+        self.single_flight = SingleFlight(
+            os.path.join(self.cache_dir, "locks") if self.enable_cache else None,
+            timeout=self.config.SINGLE_FLIGHT_TIMEOUT
+        )
     
     def _init_cache(self):
-        """Inicializa o diretório de cache."""
-        if not os.path.exists(self.config.CACHE_DIR):
-            os.makedirs(self.config.CACHE_DIR)
+        """Inicializa o cache em memória e o cache em disco."""
+        self.memory_cache = MemoryCache(self.config.MEMORY_CACHE_MAX_BYTES)
+        self.cache = DiskCache(
+            self.cache_dir,
+            max_bytes=self.config.CACHE_MAX_BYTES,
+            eviction_policy=self.config.CACHE_EVICTION_POLICY
+        )
+    
+    def _get_cache_key(
+        self,
+        text: str,
+        lang: str,
+        tld: str,
+        speed: float = 1.0,
+        quality: str = VoicifyConfig.DEFAULT_QUALITY
+    ) -> str:
+        """
+        Gera a chave do áudio no cache.
+        
+        O cache tem dois níveis: o render base, sintetizado pelo gTTS, é
+        identificado por (texto, idioma, tld); as variantes de velocidade
+        e de perfil de saída são derivadas localmente dele e incluem a
+        velocidade e o formato/bitrate do perfil na chave. O perfil padrão
+        não entra na chave (mantém as chaves já gravadas), e sem
+        recodificação (ver _needs_encoding) o áudio é o próprio render
+        base, com a chave dele.
+        
+        Args:
+            text: Texto
+            lang: Idioma
+            tld: Top-level domain
+            speed: Velocidade
+            quality: Perfil de saída (chave de OUTPUT_PROFILES)
+        
+        Returns:
+            str: Chave (hash MD5)
+        """
+        key = f"{self.backend.cache_namespace}{text}_{lang}_{tld}"
+        if speed != 1.0:
+            key += f"_{speed}"
+        if quality != self.config.DEFAULT_QUALITY and self._needs_encoding(speed, quality):
+            profile = self.config.OUTPUT_PROFILES[quality]
+            key += f"_{profile['format']}{profile['bitrate']}"
+            if 'sample_rate' in profile:
+                key += f"_{profile['sample_rate']}"
+        return calculate_text_hash(key)
     
-    def _get_cache_path(self, text: str, lang: str, speed: float) -> str:
+    def _get_cache_path(
+        self,
+        text: str,
+        lang: str,
+        tld: str,
+        speed: float = 1.0,
+        quality: str = VoicifyConfig.DEFAULT_QUALITY
+    ) -> str:
         """
         Gera caminho do arquivo no cache.
         
         Args:
             text: Texto
             lang: Idioma
+            tld: Top-level domain
             speed: Velocidade
+            quality: Perfil de saída
             
         Returns:
             str: Caminho do arquivo
         """
-        text_hash = calculate_text_hash(f"{text}_{lang}_{speed}")
-        return os.path.join(self.config.CACHE_DIR, f"{text_hash}.mp3")
+        return self.cache.path_for(self._get_cache_key(text, lang, tld, speed, quality))
+
+    def _get_chunk_cache_key(self, chunk: str, lang: str, tld: str) -> str:
+        """
+        Gera a chave de um chunk (frase) no cache.
+        
+        Chunks são guardados sem ajuste de velocidade, então a chave não
+        depende dela e o mesmo chunk serve a qualquer texto que o contenha.
+        
+        Args:
+            chunk: Texto do chunk
+            lang: Idioma
+            tld: Top-level domain
+        
+        Returns:
+            str: Chave (hash MD5)
+        """
+        return calculate_text_hash(f"{self.backend.cache_namespace}chunk_{chunk}_{lang}_{tld}")
+    
+    def _cache_get(self, cache_key: str) -> Optional[bytes]:
+        """
+        Busca uma chave no cache em memória e depois no cache em disco.
+        
+        Args:
+            cache_key: Chave
+            
+        Returns:
+            bytes: Dados do áudio ou None
+        """
+        audio_data = self.memory_cache.get(cache_key)
+        if audio_data is not None:
+            logger.info(f"Áudio recuperado do cache em memória: {cache_key}")
+            return audio_data
+        
+        try:
+            audio_data = self.cache.get(cache_key)
+            if audio_data is not None:
+                logger.info(f"Áudio recuperado do cache: {cache_key}")
+                self.memory_cache.put(cache_key, audio_data)
+            return audio_data
+        except Exception as e:
+            logger.error(f"Erro ao ler cache: {e}")
+        
+        return None
+    
+    def _cache_put(self, cache_key: str, audio_data: bytes):
+        """
+        Grava uma chave no cache em memória e no cache em disco.
+        
+        Args:
+            cache_key: Chave
+            audio_data: Dados do áudio
+        """
+        self.memory_cache.put(cache_key, audio_data)
+        
+        try:
+            self.cache.put(cache_key, audio_data)
+            logger.info(f"Áudio salvo no cache: {cache_key}")
+        except Exception as e:
+            logger.error(f"Erro ao salvar cache: {e}")
     
-    def _check_cache(self, text: str, lang: str, speed: float) -> Optional[bytes]:
+    def _check_cache(
+        self,
+        text: str,
+        lang: str,
+        tld: str,
+        speed: float = 1.0,
+        quality: str = VoicifyConfig.DEFAULT_QUALITY
+    ) -> Optional[bytes]:
         """
         Verifica se áudio está no cache.
         
         Args:
             text: Texto
             lang: Idioma
+            tld: Top-level domain
             speed: Velocidade
-            
+            quality: Perfil de saída
+        
         Returns:
             bytes: Dados do áudio ou None
         """
         if not self.enable_cache:
             return None
         
-        cache_path = self._get_cache_path(text, lang, speed)
+        return self._cache_get(self._get_cache_key(text, lang, tld, speed, quality))
+    
+    def is_cached(
+        self,
+        text: str,
+        lang: str,
+        speed: float = 1.0,
+        tld: str = 'com',
+        quality: str = VoicifyConfig.DEFAULT_QUALITY
+    ) -> bool:
+        """
+        Verifica se o áudio está no cache em disco, sem lê-lo.
         
-        if os.path.exists(cache_path):
-            try:
-                with open(cache_path, 'rb') as f:
-                    logger.info(f"Áudio recuperado do cache: {cache_path}")
-                    return f.read()
-            except Exception as e:
-                logger.error(f"Erro ao ler cache: {e}")
+        Não conta como acesso para a política de despejo.
         
-        return None
+        Args:
+            text: Texto
+            lang: Idioma
+            speed: Velocidade
+            tld: Top-level domain
+            quality: Perfil de saída
+        
+        Returns:
+            bool: Se generate_audio serviria o áudio direto do cache
+        """
+        if not self.enable_cache:
+            return False
+        
+        return self.cache.contains(self._get_cache_key(text, lang, tld, speed, quality))
     
-    def _save_to_cache(self, audio_data: bytes, text: str, lang: str, speed: float):
+    def _save_to_cache(
+        self,
+        audio_data: bytes,
+        text: str,
+        lang: str,
+        tld: str,
+        speed: float = 1.0,
+        quality: str = VoicifyConfig.DEFAULT_QUALITY
+    ):
         """
         Salva áudio no cache.
         
@@ -87,141 +361,1081 @@ class AudioGenerator:
             audio_data: Dados do áudio
             text: Texto
             lang: Idioma
+            tld: Top-level domain
             speed: Velocidade
+            quality: Perfil de saída
         """
         if not self.enable_cache:
             return
         
-        cache_path = self._get_cache_path(text, lang, speed)
+        self._cache_put(self._get_cache_key(text, lang, tld, speed, quality), audio_data)
+    
+    def _needs_encoding(self, speed: float, quality: str) -> bool:
+        """
+        Verifica se o render base precisa ser recodificado.
         
-        try:
-            with open(cache_path, 'wb') as f:
-                f.write(audio_data)
-            logger.info(f"Áudio salvo no cache: {cache_path}")
-        except Exception as e:
-            logger.error(f"Erro ao salvar cache: {e}")
+        O gTTS entrega MP3 mono de 24 kHz a SOURCE_BITRATE; sem ajuste de
+        velocidade, ele é servido como está nos perfis MP3 com esse bitrate
+        ou mais (recodificar só perderia qualidade). Perfis abaixo dele ou
+        com outra taxa de amostragem são de fato recodificados.
+        """
+        if speed != 1.0:
+            return True
+        
+        profile = self.config.OUTPUT_PROFILES[quality]
+        return (
+            profile['format'] != 'mp3'
+            or 'sample_rate' in profile
+            or int(profile['bitrate'].rstrip('k')) < int(self.config.SOURCE_BITRATE.rstrip('k'))
+        )
+    
+    def _encode_bitrate(self, profile: Dict[str, Any]) -> str:
+        """Bitrate da recodificação: o do perfil, limitado ao do render base."""
+        source = self.config.SOURCE_BITRATE
+        return profile['bitrate'] if int(profile['bitrate'].rstrip('k')) <= int(source.rstrip('k')) else source
+    
+    @staticmethod
+    def _cache_hit_result(audio_data: bytes) -> Dict[str, Any]:
+        """Resultado de um áudio encontrado no cache já na variante pedida."""
+        return {
+            'success': True,
+            'audio_data': audio_data,
+            'from_cache': True,
+            'size': len(audio_data)
+        }
+    
+    @staticmethod
+    def _rendered_result(
+        base: Dict[str, Any],
+        audio_data: bytes,
+        conversion_error: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Resultado de um áudio obtido do render base (sintetizado ou do cache).
+        
+        Args:
+            base: Render base (de _render_base ou da síntese assíncrona)
+            audio_data: Áudio entregue (a variante ou, se a conversão
+                falhou, o próprio render base)
+            conversion_error: Erro da conversão, se houve
+        """
+        result = {
+            'success': True,
+            'audio_data': audio_data,
+            'from_cache': False,
+            'base_from_cache': base['from_cache'],
+            'coalesced': base.get('coalesced', False),
+            'size': len(audio_data),
+            'chunks': base['chunks'],
+            'chunks_synthesized': base['chunks_synthesized']
+        }
+        if conversion_error:
+            result['conversion_error'] = conversion_error
+        return result
+    
+    def _complete_result(
+        self,
+        result: Dict[str, Any],
+        text: str,
+        lang: str,
+        tld: str,
+        speed: float,
+        quality: str
+    ):
+        """Acrescenta a um resultado de sucesso a chave no cache, a qualidade e o formato."""
+        # Identifica o áudio no cache (ETag e URL da API HTTP); sem a
+        # conversão, o áudio entregue é o render base
+        if 'conversion_error' in result:
+            result['cache_key'] = self._get_cache_key(text, lang, tld)
+        else:
+            result['cache_key'] = self._get_cache_key(text, lang, tld, speed, quality)
+        result['quality'] = quality
+        result.update(self._describe_audio(result['audio_data']))
+    
+    @staticmethod
+    def _failure_result(error: Exception) -> Dict[str, Any]:
+        """Resultado de uma geração que falhou."""
+        logger.error(f"Erro ao gerar áudio: {error}", exc_info=error)
+        return {
+            'success': False,
+            'error': str(error),
+            'throttled': is_congestion_error(error),
+            'rate_limited': isinstance(error, RateLimitTimeout),
+            'timed_out': isinstance(error, DeadlineExceeded)
+        }
+    
+    @staticmethod
+    def _record_result(result: Dict[str, Any], lang: str, timer: StageTimer) -> Dict[str, Any]:
+        """Fecha os tempos das etapas e registra a geração nas métricas."""
+        result['timings'] = timer.finish()
+        record_generation(lang, result)
+        return result
+    
+    @staticmethod
+    def _describe_audio(audio_data: bytes) -> Dict[str, Any]:
+        """Formato e tipo MIME do áudio (um perfil pode cair para MP3 se a recodificação falhar)."""
+        audio_format = detect_audio_format(audio_data)
+        return {'format': audio_format, 'mime': VoicifyConfig.AUDIO_MIME_TYPES[audio_format]}
+
+    def _synthesize(
+        self,
+        text: str,
+        lang: str,
+        tld: str,
+        timeout: Optional[float] = None,
+        deadline: Optional[float] = None
+    ) -> bytes:
+        """
+        Sintetiza um texto com uma única chamada ao backend.
+        
+        A chamada passa pelo limitador de taxa; cada trecho de ~100
+        caracteres (uma requisição HTTP) consome um token. Uma recusa por
+        limite de taxa (429) é repetida, até RATE_LIMIT_MAX_RETRIES vezes,
+        depois que o limitador reduz a concorrência.
+        
+        Args:
+            text: Texto
+            lang: Idioma
+            tld: Top-level domain
+            timeout: Tempo limite de cada requisição HTTP (segundos)
+            deadline: Prazo (time.monotonic()) do pedido: limita a espera
+                por uma vaga no limitador, o timeout HTTP e as novas tentativas
+            
+        Returns:
+            bytes: Áudio MP3
+        
+        Raises:
+            DeadlineExceeded: Se o prazo acabar antes da chamada
+            RateLimitTimeout: Se não houver vaga no limitador a tempo
+        """
+        for attempt in range(self.config.RATE_LIMIT_MAX_RETRIES + 1):
+            try:
+                with self.rate_limiter.slot(self._request_cost(text), self._time_left(deadline)):
+                    # Conta só as chamadas que de fato saem para o serviço
+                    UPSTREAM_REQUESTS.inc(backend=self.backend.name)
+                    return self.backend.synthesize(text, lang, tld, self._request_timeout(timeout, deadline))
+            except Exception as e:
+                self._count_upstream_error(e)
+                delay = self._retry_delay(e, attempt, deadline)
+                if delay is None:
+                    raise
+            
+            time.sleep(delay)
+    
+    @staticmethod
+    def _time_left(deadline: Optional[float]) -> Optional[float]:
+        """
+        Tempo restante até o prazo (None = sem prazo).
+        
+        Raises:
+            DeadlineExceeded: Se o prazo já acabou
+        """
+        if deadline is None:
+            return None
+        
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise DeadlineExceeded("Prazo esgotado antes da síntese")
+        return remaining
+    
+    def _request_timeout(self, timeout: Optional[float], deadline: Optional[float]) -> Optional[float]:
+        """Timeout HTTP da chamada: o pedido, limitado ao que resta do prazo."""
+        remaining = self._time_left(deadline)
+        if remaining is None:
+            return timeout
+        return remaining if timeout is None else min(timeout, remaining)
+    
+    def _request_cost(self, text: str) -> int:
+        """Número estimado de requisições HTTP para sintetizar um texto."""
+        return max(1, math.ceil(len(text) / _CHARS_PER_REQUEST))
+    
+    def _count_upstream_error(self, error: Exception):
+        """Registra nas métricas uma falha do backend (ou a falta de vaga no limitador)."""
+        if isinstance(error, DeadlineExceeded):
+            return
+        if isinstance(error, RateLimitTimeout):
+            # Nenhuma requisição foi enviada: não é erro nem recusa do serviço
+            RATE_LIMIT_TIMEOUTS.inc(backend=self.backend.name)
+            return
+        
+        UPSTREAM_ERRORS.inc(backend=self.backend.name)
+        if is_congestion_error(error):
+            UPSTREAM_THROTTLED.inc(backend=self.backend.name)
+    
+    def _retry_delay(self, error: Exception, attempt: int, deadline: Optional[float] = None) -> Optional[float]:
+        """
+        Calcula a espera antes de repetir uma chamada recusada por limite de taxa.
+        
+        Args:
+            error: Exceção da chamada
+            attempt: Número da tentativa que falhou (a partir de 0)
+            deadline: Prazo do pedido (time.monotonic()), se houver
+        
+        Returns:
+            float: Espera em segundos (backoff exponencial ou o Retry-After,
+            o que for maior), ou None se a chamada não deve ser repetida
+            (inclusive se a espera passaria do prazo)
+        """
+        if not isinstance(error, UpstreamThrottledError):
+            return None
+        if attempt >= self.config.RATE_LIMIT_MAX_RETRIES:
+            return None
+        
+        delay = max(self.config.RATE_LIMIT_RETRY_BACKOFF * 2 ** attempt, error.retry_after or 0.0)
+        delay *= random.uniform(1.0, 1.5)  # Evita que as chamadas recusadas voltem juntas
+        if deadline is not None and time.monotonic() + delay >= deadline:
+            return None
+        logger.info(f"Serviço de TTS recusou a chamada (429); nova tentativa {attempt + 1} em {delay:.2f}s")
+        return delay
+    
+    def _synthesize_chunk(
+        self,
+        chunk: str,
+        lang: str,
+        tld: str,
+        timeout: Optional[float] = None,
+        deadline: Optional[float] = None
+    ) -> bytes:
+        """
+        Sintetiza um chunk e o guarda no cache de chunks.
+        
+        Pedidos simultâneos do mesmo chunk (de outras sessões ou
+        processos) aguardam a síntese em andamento em vez de repeti-la.
+        
+        Args:
+            chunk: Texto do chunk
+            lang: Idioma
+            tld: Top-level domain
+            timeout: Tempo limite de cada requisição HTTP (segundos)
+            deadline: Prazo do pedido (ver _synthesize)
+        
+        Returns:
+            bytes: Áudio MP3
+        """
+        cache_key = self._get_chunk_cache_key(chunk, lang, tld)
+        
+        def synthesize() -> bytes:
+            audio_data = self._synthesize(chunk, lang, tld, timeout, deadline)
+            if self.enable_cache:
+                self._cache_put(cache_key, audio_data)
+            return audio_data
+        
+        audio_data, shared = self.single_flight.do(cache_key, synthesize, self._cache_recheck(cache_key))
+        if shared:
+            COALESCED.inc(level="chunk")
+        
+        return audio_data
+    
+    def _cache_recheck(self, cache_key: str, wrap=None):
+        """
+        Consulta ao cache feita pelo single-flight antes de sintetizar.
+        
+        Args:
+            cache_key: Chave
+            wrap: Converte o áudio encontrado no resultado esperado
+        
+        Returns:
+            callable: Função de consulta (None com o cache desativado)
+        """
+        if not self.enable_cache:
+            return None
+        
+        def recheck():
+            audio_data = self._cache_get(cache_key)
+            if audio_data is None:
+                return None
+            return wrap(audio_data) if wrap else audio_data
+        
+        return recheck
+    
+    def _synthesize_chunked(
+        self,
+        text: str,
+        lang: str,
+        tld: str,
+        max_workers: Optional[int] = None,
+        timeout: Optional[float] = None,
+        timer: Optional[StageTimer] = None,
+        progress: Optional[_Progress] = None,
+        deadline: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Sintetiza um texto longo em chunks paralelos.
+        
+        O texto é dividido em frases e cada frase é buscada no cache de
+        chunks. Só as frases ausentes (novas ou editadas) são enviadas ao
+        gTTS, em um pool limitado de threads. Os resultados são unidos na
+        ordem original em um único MP3.
+        
+        Args:
+            text: Texto
+            lang: Idioma
+            tld: Top-level domain
+            max_workers: Número máximo de chunks simultâneos
+            timeout: Tempo limite de cada requisição HTTP (segundos)
+            timer: Medidor das etapas da geração
+            progress: Recebe cada chunk pronto
+            deadline: Prazo do pedido (ver _synthesize)
+            
+        Returns:
+            dict: Áudio MP3 ('audio_data'), número de chunks ('chunks') e
+            de chunks que precisaram ser sintetizados ('chunks_synthesized')
+        """
+        if timer is None:
+            timer = StageTimer()
+        if progress is None:
+            progress = _Progress(None)
+        
+        chunks = split_text_into_sentences(text, self.config.CHUNK_MAX_CHARS)
+        
+        if not chunks:
+            with timer.stage('synthesis'):
+                audio_data = self._synthesize(text, lang, tld, timeout, deadline)
+            progress.synthesis(1, 1)
+            return {'audio_data': audio_data, 'chunks': 1, 'chunks_synthesized': 1}
+        
+        parts = {}
+        if self.enable_cache:
+            with timer.stage('cache_lookup'):
+                for chunk in set(chunks):
+                    audio_data = self._cache_get(self._get_chunk_cache_key(chunk, lang, tld))
+                    if audio_data is not None:
+                        parts[chunk] = audio_data
+
+        # Frases repetidas no texto são sintetizadas uma única vez
+        missing = [chunk for chunk in dict.fromkeys(chunks) if chunk not in parts]
+        total = len(parts) + len(missing)
+        done = len(parts)
+        lock = threading.Lock()
+        progress.synthesis(done, total)
+        
+        def synthesize(chunk: str) -> bytes:
+            nonlocal done
+            audio_data = self._synthesize_chunk(chunk, lang, tld, timeout, deadline)
+            with lock:
+                done += 1
+                progress.synthesis(done, total)
+            return audio_data
+        
+        if missing:
+            workers = min(max_workers or self.config.CHUNK_MAX_WORKERS, len(missing))
+            logger.info(f"Sintetizando {len(missing)} de {len(chunks)} chunks com {workers} workers")
+            
+            # Inclui a gravação de cada chunk no cache, feita pelos workers
+            with timer.stage('synthesis'), \
+                    ThreadPoolExecutor(max_workers=workers, thread_name_prefix="voicify-chunk") as executor:
+                synthesized = executor.map(synthesize, missing)
+                parts.update(zip(missing, synthesized))
+        
+        # Junta as partes frame a frame, sem passar pelo ffmpeg
+        with timer.stage('encoding'):
+            audio_data = concat_mp3(parts[chunk] for chunk in chunks)
+        
+        return {
+            'audio_data': audio_data,
+            'chunks': len(chunks),
+            'chunks_synthesized': len(missing)
+        }
+    
+    def _render_base(
+        self,
+        text: str,
+        lang: str,
+        tld: str,
+        chunked: Optional[bool] = None,
+        max_workers: Optional[int] = None,
+        timeout: Optional[float] = None,
+        check_cache: bool = True,
+        timer: Optional[StageTimer] = None,
+        progress: Optional[_Progress] = None,
+        deadline: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Obtém o render base (velocidade 1.0) de um texto.
+        
+        Busca no cache e, se não encontrar, sintetiza e salva.
+        
+        Args:
+            text: Texto
+            lang: Idioma
+            tld: Top-level domain
+            chunked: Sintetizar em chunks paralelos (None = automático)
+            max_workers: Número máximo de chunks simultâneos
+            timeout: Tempo limite de cada requisição HTTP (segundos)
+            check_cache: Se deve consultar o cache antes de sintetizar
+            timer: Medidor das etapas da geração
+            progress: Recebe os chunks sintetizados e a gravação no cache
+            deadline: Prazo do pedido (ver _synthesize)
+        
+        Returns:
+            dict: Áudio MP3 ('audio_data'), se veio do cache ('from_cache'),
+            se veio de uma síntese idêntica em andamento ('coalesced') e
+            contagem de chunks ('chunks', 'chunks_synthesized')
+        """
+        if timer is None:
+            timer = StageTimer()
+        if progress is None:
+            progress = _Progress(None)
+        
+        if check_cache:
+            with timer.stage('cache_lookup'):
+                cached_audio = self._check_cache(text, lang, tld)
+            if cached_audio:
+                return self._cached_base(cached_audio)
+        
+        if chunked is None:
+            chunked = len(text) > self.config.CHUNK_THRESHOLD
+        
+        def synthesize() -> Dict[str, Any]:
+            logger.info(f"Gerando áudio - Idioma: {lang}, TLD: {tld}, Chunks: {chunked}")
+            
+            if chunked:
+                synthesis = self._synthesize_chunked(text, lang, tld, max_workers, timeout, timer, progress, deadline)
+            else:
+                with timer.stage('synthesis'):
+                    audio_data = self._synthesize(text, lang, tld, timeout, deadline)
+                progress.synthesis(1, 1)
+                synthesis = {'audio_data': audio_data, 'chunks': 1, 'chunks_synthesized': 1}
+            
+            with timer.stage('cache_write'):
+                self._save_to_cache(synthesis['audio_data'], text, lang, tld)
+            progress.at(0.0, 'cache_write')
+            synthesis['from_cache'] = False
+            
+            return synthesis
+        
+        # Pedidos simultâneos do mesmo texto aguardam a síntese em andamento
+        cache_key = self._get_cache_key(text, lang, tld)
+        synthesis, shared = self.single_flight.do(
+            cache_key, synthesize, self._cache_recheck(cache_key, self._cached_base)
+        )
+        if shared:
+            COALESCED.inc(level="base")
+        
+        return dict(synthesis, coalesced=shared)
+    
+    @staticmethod
+    def _cached_base(audio_data: bytes) -> Dict[str, Any]:
+        """Render base encontrado no cache, no formato de _render_base."""
+        return {'audio_data': audio_data, 'from_cache': True, 'chunks': 0, 'chunks_synthesized': 0}
     
     def generate_audio(
         self,
         text: str,
         lang: str,
         speed: float = 1.0,
-        tld: str = 'com'
+        tld: str = 'com',
+        chunked: Optional[bool] = None,
+        max_workers: Optional[int] = None,
+        timeout: Optional[float] = None,
+        progress_callback: Optional[ProgressCallback] = None,
+        quality: str = VoicifyConfig.DEFAULT_QUALITY,
+        deadline: Optional[float] = None
     ) -> Dict[str, Any]:
         """
         Gera áudio a partir de texto.
         
+        Uma velocidade diferente de 1.0 ou outro perfil de saída é derivado
+        localmente do render base em cache, sem nova chamada ao gTTS.
+        
         Args:
             text: Texto para converter
             lang: Código do idioma
             speed: Velocidade da fala (0.5 a 2.0)
             tld: Top-level domain para variante
+            chunked: Sintetizar em chunks paralelos (None = automático
+                para textos acima de CHUNK_THRESHOLD caracteres)
+            max_workers: Número máximo de chunks simultâneos
+            timeout: Tempo limite de cada requisição HTTP (segundos)
+            progress_callback: Chamado com (progresso de 0 a 1, etapa) após
+                a consulta ao cache, a cada chunk sintetizado, a cada etapa
+                do ajuste de velocidade e a cada gravação no cache; 1.0 com
+                a etapa 'done' ao terminar com sucesso
+            quality: Perfil de saída (chave de OUTPUT_PROFILES)
+            deadline: Prazo (time.monotonic()) do pedido; depois dele
+                nenhuma chamada ao backend começa ou espera por vaga
             
         Returns:
-            dict: Informações do áudio gerado
+            dict: Informações do áudio gerado, com a chave do áudio no cache
+            ('cache_key'), o formato ('format' e 'mime') e o tempo de cada
+            etapa em 'timings' (cache_lookup, synthesis, speed_adjust,
+            encoding, cache_write e total)
         """
+        timer = StageTimer()
+        encode = self._needs_encoding(speed, quality)
+        progress = _Progress(progress_callback, speed_adjust=encode)
+        
         try:
-            # Verificar cache
-            cached_audio = self._check_cache(text, lang, speed)
-            if cached_audio:
-                return {
-                    'success': True,
-                    'audio_data': cached_audio,
-                    'from_cache': True,
-                    'size': len(cached_audio)
-                }
-            
-            # Gerar áudio
-            logger.info(f"Gerando áudio - Idioma: {lang}, Velocidade: {speed}")
-            
-            tts = gTTS(text=text, lang=lang, tld=tld, slow=False)
-            audio_buffer = io.BytesIO()
-            tts.write_to_fp(audio_buffer)
-            audio_buffer.seek(0)
-            audio_data = audio_buffer.read()
-            
-            # Ajustar velocidade se necessário
-            if speed != 1.0:
-                audio_data = self._adjust_speed(audio_data, speed)
+            # Verificar cache (já na velocidade e no perfil pedidos)
+            with timer.stage('cache_lookup'):
+                cached_audio = self._check_cache(text, lang, tld, speed, quality)
+            progress.report(_Progress.LOOKUP, 'cache_lookup')
             
-            # Salvar no cache
-            self._save_to_cache(audio_data, text, lang, speed)
+            if cached_audio:
+                result = self._cache_hit_result(cached_audio)
+            else:
+                # Render base: do cache ou sintetizado (sem recodificação a
+                # consulta acima já foi a do render base)
+                base = self._render_base(
+                    text, lang, tld, chunked, max_workers, timeout,
+                    check_cache=encode, timer=timer, progress=progress, deadline=deadline
+                )
+                audio_data = base['audio_data']
+                
+                # Derivar a variante de velocidade e de perfil
+                conversion_error = None
+                if encode:
+                    try:
+                        audio_data = self._adjust_speed(audio_data, speed, timer, progress, quality)
+                    except AudioConversionError as e:
+                        # Entrega o render base, sem gravá-lo na chave da variante
+                        conversion_error = str(e)
+                    else:
+                        with timer.stage('cache_write'):
+                            self._save_to_cache(audio_data, text, lang, tld, speed, quality)
+                    progress.at(0.9, 'cache_write')
+                
+                result = self._rendered_result(base, audio_data, conversion_error)
             
-            return {
-                'success': True,
-                'audio_data': audio_data,
-                'from_cache': False,
-                'size': len(audio_data)
-            }
+            self._complete_result(result, text, lang, tld, speed, quality)
+            progress.report(1.0, 'done')
             
         except Exception as e:
-            logger.error(f"Erro ao gerar áudio: {e}", exc_info=True)
-            return {
-                'success': False,
-                'error': str(e)
-            }
+            result = self._failure_result(e)
+        
+        return self._record_result(result, lang, timer)
+    
+    def stream_audio(
+        self,
+        text: str,
+        lang: str,
+        speed: float = 1.0,
+        tld: str = 'com',
+        max_workers: Optional[int] = None,
+        timeout: Optional[float] = None,
+        stats: Optional[Dict[str, Any]] = None
+    ) -> Iterator[bytes]:
+        """
+        Gera o áudio frase a frase, entregando cada pedaço assim que fica pronto.
+        
+        As frases são sintetizadas em paralelo (com uma janela limitada de
+        frases à frente) e entregues na ordem do texto. Cada pedaço é um
+        MP3 válido por si só e a concatenação de todos forma o áudio
+        completo, então o consumidor pode começar a reprodução logo após o
+        primeiro.
+        
+        Args:
+            text: Texto para converter
+            lang: Código do idioma
+            speed: Velocidade da fala (0.5 a 2.0)
+            tld: Top-level domain para variante
+            max_workers: Número máximo de frases simultâneas
+            timeout: Tempo limite de cada requisição HTTP (segundos)
+            stats: Dicionário preenchido com 'time_to_first_audio',
+                'total_time', 'chunks' e 'size' ao longo do streaming
+        
+        Yields:
+            bytes: Pedaços de MP3, na ordem do texto
+        """
+        if stats is None:
+            stats = {}
+        start = time.perf_counter()
+        stats.update({'time_to_first_audio': None, 'total_time': None, 'chunks': 0, 'size': 0})
+        
+        def emit(audio_data: bytes) -> bytes:
+            if stats['time_to_first_audio'] is None:
+                stats['time_to_first_audio'] = time.perf_counter() - start
+                logger.info(f"Streaming: primeiro áudio em {stats['time_to_first_audio']:.3f}s")
+            stats['chunks'] += 1
+            stats['size'] += len(audio_data)
+            return audio_data
+        
+        # Texto completo já em cache: um único pedaço
+        cached_audio = self._check_cache(text, lang, tld, speed)
+        if cached_audio:
+            yield emit(cached_audio)
+            stats['total_time'] = time.perf_counter() - start
+            return
+        
+        chunks = split_text_into_sentences(text, self.config.CHUNK_MAX_CHARS) or [text]
+        workers = min(max_workers or self.config.CHUNK_MAX_WORKERS, len(chunks))
+        
+        def render(chunk: str) -> bytes:
+            return self.render_chunk(chunk, lang, speed, tld, timeout)
+        
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="voicify-stream")
+        pending = deque()
+        remaining = iter(chunks)
+        
+        try:
+            # Janela limitada: no máximo 2 frases por worker à frente da reprodução
+            for chunk in islice(remaining, workers * 2):
+                pending.append(executor.submit(render, chunk))
+            
+            while pending:
+                audio_data = pending.popleft().result()
+                
+                for chunk in islice(remaining, 1):
+                    pending.append(executor.submit(render, chunk))
+                
+                yield emit(audio_data)
+        finally:
+            # Consumidor desistiu no meio: descarta as frases ainda não iniciadas
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=False)
+            stats['total_time'] = time.perf_counter() - start
     
-    def _adjust_speed(self, audio_data: bytes, speed: float) -> bytes:
+    def render_chunk(
+        self,
+        chunk: str,
+        lang: str,
+        speed: float = 1.0,
+        tld: str = 'com',
+        timeout: Optional[float] = None
+    ) -> bytes:
         """
-        Ajusta velocidade do áudio.
+        Obtém o áudio de um chunk (frase): do cache de chunks ou sintetizado.
+        
+        É a unidade usada pelo streaming e pelo modo de documentos longos;
+        cada chunk é um MP3 válido por si só.
+        
+        Args:
+            chunk: Texto do chunk (ver text_segmenter.iter_segments)
+            lang: Idioma
+            speed: Velocidade da fala (aplicada localmente ao chunk)
+            tld: Top-level domain
+            timeout: Tempo limite de cada requisição HTTP (segundos)
+        
+        Returns:
+            bytes: Áudio MP3
+        """
+        audio_data = None
+        if self.enable_cache:
+            audio_data = self._cache_get(self._get_chunk_cache_key(chunk, lang, tld))
+        if audio_data is None:
+            audio_data = self._synthesize_chunk(chunk, lang, tld, timeout)
+        if speed != 1.0:
+            try:
+                audio_data = self._adjust_speed(audio_data, speed)
+            except AudioConversionError as e:
+                # Chunks não são gravados na velocidade ajustada: segue com o original
+                logger.warning(f"Chunk entregue sem ajuste de velocidade: {e}")
+        return audio_data
+    
+    def _adjust_speed(
+        self,
+        audio_data: bytes,
+        speed: float,
+        timer: Optional[StageTimer] = None,
+        progress: Optional[_Progress] = None,
+        quality: str = VoicifyConfig.DEFAULT_QUALITY
+    ) -> bytes:
+        """
+        Ajusta velocidade do áudio sem alterar o tom e o codifica no perfil de saída.
+        
+        O MP3 é decodificado para PCM e esticado com time_stretch (WSOLA
+        em NumPy), tanto para acelerar quanto para desacelerar, e então
+        codificado em mono no formato e no bitrate (e, se houver, na taxa
+        de amostragem) do perfil. O bitrate nunca passa do SOURCE_BITRATE:
+        acima dele o arquivo só cresce, sem ganho de qualidade.
         
         Args:
             audio_data: Dados do áudio
             speed: Fator de velocidade
+            timer: Medidor das etapas da geração (decodificação e
+                time_stretch contam como 'speed_adjust'; a recodificação,
+                como 'encoding')
+            progress: Recebe o fim da decodificação, do time_stretch e da
+                recodificação
+            quality: Perfil de saída (chave de OUTPUT_PROFILES)
             
         Returns:
             bytes: Áudio com velocidade ajustada
+        
+        Raises:
+            AudioConversionError: Se a decodificação, o ajuste ou a
+                recodificação falhar (ex.: ffmpeg ausente)
         """
+        profile = self.config.OUTPUT_PROFILES[quality]
+        if timer is None:
+            timer = StageTimer()
+        if progress is None:
+            progress = _Progress(None)
+        
         try:
-            # Converter para AudioSegment
-            audio = AudioSegment.from_mp3(io.BytesIO(audio_data))
-            
-            # Ajustar velocidade
-            if speed > 1.0:
-                audio = speedup(audio, playback_speed=speed)
-            elif speed < 1.0:
-                # Para desacelerar, usar sample rate
-                new_sample_rate = int(audio.frame_rate * speed)
-                audio = audio._spawn(audio.raw_data, overrides={
-                    'frame_rate': new_sample_rate
-                }).set_frame_rate(audio.frame_rate)
+            with timer.stage('speed_adjust'):
+                # Converter para AudioSegment
+                audio = AudioSegment.from_mp3(io.BytesIO(audio_data))
+                progress.at(0.3, 'speed_adjust')
+                
+                # Ajustar velocidade
+                if speed != 1.0:
+                    dtype = np.dtype(audio.array_type)
+                    samples = np.frombuffer(audio.raw_data, dtype=dtype).reshape(-1, audio.channels)
+                    stretched = time_stretch(samples, speed, audio.frame_rate)
+                    limits = np.iinfo(dtype)
+                    pcm = np.clip(np.round(stretched), limits.min, limits.max).astype(dtype)
+                    audio = audio._spawn(pcm.tobytes())
+            progress.at(0.5, 'speed_adjust')
             
             # Converter de volta para bytes
-            output_buffer = io.BytesIO()
-            audio.export(output_buffer, format='mp3')
-            output_buffer.seek(0)
+            with timer.stage('encoding'):
+                output_buffer = io.BytesIO()
+                audio.export(
+                    output_buffer,
+                    format=profile['format'],
+                    codec=profile['codec'],
+                    bitrate=self._encode_bitrate(profile),
+                    parameters=["-ac", "1"] + (["-ar", str(profile['sample_rate'])] if 'sample_rate' in profile else [])
+                )
+                output_buffer.seek(0)
+            progress.at(0.7, 'encoding')
             
             return output_buffer.read()
             
         except Exception as e:
-            logger.warning(f"Erro ao ajustar velocidade: {e}")
-            return audio_data  # Retornar original em caso de erro
+            logger.warning(f"Erro ao converter o áudio (velocidade {speed}, qualidade {quality}): {e}")
+            raise AudioConversionError(str(e)) from e
     
     def generate_batch(
         self,
         texts: list,
         lang: str,
         speed: float = 1.0,
-        tld: str = 'com'
-    ) -> list:
+        tld: str = 'com',
+        max_workers: Optional[int] = None,
+        item_timeout: Optional[float] = None,
+        quality: str = VoicifyConfig.DEFAULT_QUALITY
+    ) -> BatchResult:
         """
-        Gera múltiplos áudios.
+        Gera múltiplos áudios em paralelo.
+        
+        Cada item tem o seu próprio tempo limite, contado a partir do
+        momento em que começa a ser processado. Um item que estoura o tempo
+        é marcado como falha ('timed_out') sem atrasar os demais. O mesmo
+        prazo limita a espera por vaga no limitador de taxa e a requisição
+        HTTP do item, o que libera o worker.
         
         Args:
             texts: Lista de textos
             lang: Idioma
             speed: Velocidade
             tld: Top-level domain
+            max_workers: Número máximo de itens simultâneos
+            item_timeout: Tempo limite de cada item (segundos)
+            quality: Perfil de saída (chave de OUTPUT_PROFILES)
             
         Returns:
-            list: Lista de resultados
+            BatchResult: Lista de resultados na ordem de entrada, com os
+            tempos total e do caminho crítico do lote
         """
-        results = []
+        if item_timeout is None:
+            item_timeout = self.config.BATCH_ITEM_TIMEOUT
+        workers = max(1, min(max_workers or self.config.BATCH_MAX_WORKERS, len(texts)))
+        
+        results = [None] * len(texts)
+        started = {}
+        
+        def run(index: int, text: str) -> Dict[str, Any]:
+            started[index] = time.perf_counter()
+            # O prazo vale também para a espera no limitador e as novas tentativas
+            result = self.generate_audio(
+                text, lang, speed, tld, timeout=item_timeout, quality=quality,
+                deadline=time.monotonic() + item_timeout
+            )
+            result['elapsed'] = time.perf_counter() - started[index]
+            return result
+        
+        batch_start = time.perf_counter()
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="voicify-batch")
+        
+        try:
+            futures = {executor.submit(run, i, text): i for i, text in enumerate(texts)}
+            pending = set(futures)
+            
+            while pending:
+                done, pending = wait(pending, timeout=_BATCH_POLL_INTERVAL, return_when=FIRST_COMPLETED)
+                
+                for future in done:
+                    index = futures[future]
+                    try:
+                        results[index] = future.result()
+                    except Exception as e:
+                        logger.error(f"Erro no item {index} do lote: {e}", exc_info=True)
+                        results[index] = {'success': False, 'error': str(e), 'elapsed': 0.0}
+                
+                now = time.perf_counter()
+                for future in list(pending):
+                    index = futures[future]
+                    if index in started and now - started[index] > item_timeout:
+                        logger.warning(f"Item {index} do lote excedeu {item_timeout}s")
+                        pending.discard(future)
+                        results[index] = {
+                            'success': False,
+                            'error': f"Tempo limite excedido ({item_timeout}s)",
+                            'timed_out': True,
+                            'elapsed': now - started[index]
+                        }
+        finally:
+            # Não espera por itens abandonados; eles terminam pelo timeout HTTP
+            executor.shutdown(wait=False, cancel_futures=True)
         
         for i, text in enumerate(texts):
-            result = self.generate_audio(text, lang, speed, tld)
-            result['index'] = i
+            results[i]['index'] = i
+            results[i]['text'] = text[:100] + "..." if len(text) > 100 else text
+        
+        return BatchResult(
+            results,
+            total_time=time.perf_counter() - batch_start,
+            critical_path_time=max((r['elapsed'] for r in results), default=0.0)
+        )
+    
+    def _get_async_semaphore(self) -> asyncio.Semaphore:
+        """
+        Retorna o semáforo da API assíncrona para o event loop atual.
+        
+        O semáforo fica ligado ao loop em que foi criado, então é recriado
+        quando o gerador passa a ser usado em outro loop.
+        
+        Returns:
+            asyncio.Semaphore: Semáforo que limita as sínteses simultâneas
+        """
+        loop = asyncio.get_running_loop()
+        
+        if self._async_loop is not loop:
+            self._async_loop = loop
+            self._async_semaphore = asyncio.Semaphore(self.config.ASYNC_MAX_CONCURRENCY)
+        
+        return self._async_semaphore
+    
+    async def _asynthesize(
+        self,
+        text: str,
+        lang: str,
+        tld: str,
+        timeout: Optional[float] = None,
+        deadline: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Sintetiza um texto pelo backend, sob o semáforo da API assíncrona
+        e o limitador de taxa.
+        
+        O GTTSBackend usa um cliente HTTP compartilhado (httpx) e envia em
+        paralelo os trechos de ~100 caracteres montados pelo gTTS.
+        
+        Args:
+            text: Texto
+            lang: Idioma
+            tld: Top-level domain
+            timeout: Tempo limite de cada requisição HTTP (segundos)
+            deadline: Prazo do pedido (ver _synthesize)
+        
+        Returns:
+            dict: Áudio MP3 ('audio_data') e número de chunks ('chunks')
+        """
+        for attempt in range(self.config.RATE_LIMIT_MAX_RETRIES + 1):
+            try:
+                async with self._get_async_semaphore():
+                    async with self.rate_limiter.aslot(self._request_cost(text), self._time_left(deadline)):
+                        UPSTREAM_REQUESTS.inc(backend=self.backend.name)
+                        audio_data = await self.backend.asynthesize(
+                            text, lang, tld, self._request_timeout(timeout, deadline)
+                        )
+                return {'audio_data': audio_data, 'chunks': 1}
+            except Exception as e:
+                self._count_upstream_error(e)
+                delay = self._retry_delay(e, attempt, deadline)
+                if delay is None:
+                    raise
+            
+            await asyncio.sleep(delay)
+    
+    async def agenerate_audio(
+        self,
+        text: str,
+        lang: str,
+        speed: float = 1.0,
+        tld: str = 'com',
+        timeout: Optional[float] = None,
+        progress_callback: Optional[ProgressCallback] = None,
+        quality: str = VoicifyConfig.DEFAULT_QUALITY,
+        deadline: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Versão assíncrona de generate_audio.
+        
+        Args:
+            text: Texto para converter
+            lang: Código do idioma
+            speed: Velocidade da fala (0.5 a 2.0)
+            tld: Top-level domain para variante
+            timeout: Tempo limite de cada requisição HTTP (segundos)
+            progress_callback: Mesmo de generate_audio (chamado no event loop
+                ou nas threads auxiliares; não deve bloquear)
+            quality: Perfil de saída (chave de OUTPUT_PROFILES)
+            deadline: Prazo do pedido (ver generate_audio)
+        
+        Returns:
+            dict: Informações do áudio gerado (mesmo formato de generate_audio)
+        """
+        timer = StageTimer()
+        encode = self._needs_encoding(speed, quality)
+        progress = _Progress(progress_callback, speed_adjust=encode)
+        
+        try:
+            # Verificar cache (já na velocidade e no perfil pedidos)
+            with timer.stage('cache_lookup'):
+                cached_audio = await asyncio.to_thread(self._check_cache, text, lang, tld, speed, quality)
+            progress.report(_Progress.LOOKUP, 'cache_lookup')
+            
+            if cached_audio:
+                result = self._cache_hit_result(cached_audio)
+            else:
+                # Render base: do cache ou sintetizado
+                base_audio = None
+                if encode:
+                    with timer.stage('cache_lookup'):
+                        base_audio = await asyncio.to_thread(self._check_cache, text, lang, tld)
+                
+                if base_audio:
+                    base = self._cached_base(base_audio)
+                else:
+                    async def synthesize() -> Dict[str, Any]:
+                        logger.info(f"Gerando áudio (async) - Idioma: {lang}, TLD: {tld}")
+                        with timer.stage('synthesis'):
+                            synthesis = await self._asynthesize(text, lang, tld, timeout, deadline)
+                        progress.synthesis(1, 1)
+                        with timer.stage('cache_write'):
+                            await asyncio.to_thread(self._save_to_cache, synthesis['audio_data'], text, lang, tld)
+                        progress.at(0.0, 'cache_write')
+                        return {
+                            'audio_data': synthesis['audio_data'],
+                            'from_cache': False,
+                            'chunks': synthesis['chunks'],
+                            'chunks_synthesized': synthesis['chunks']
+                        }
+                    
+                    # Pedidos simultâneos do mesmo texto (síncronos ou não)
+                    # aguardam a síntese em andamento
+                    cache_key = self._get_cache_key(text, lang, tld)
+                    base, shared = await self.single_flight.ado(
+                        cache_key, synthesize, self._cache_recheck(cache_key, self._cached_base)
+                    )
+                    if shared:
+                        COALESCED.inc(level="base")
+                    base = dict(base, coalesced=shared)
+                audio_data = base['audio_data']
+                
+                # Derivar a variante de velocidade e de perfil
+                conversion_error = None
+                if encode:
+                    try:
+                        audio_data = await asyncio.to_thread(self._adjust_speed, audio_data, speed, timer, progress, quality)
+                    except AudioConversionError as e:
+                        # Entrega o render base, sem gravá-lo na chave da variante
+                        conversion_error = str(e)
+                    else:
+                        with timer.stage('cache_write'):
+                            await asyncio.to_thread(self._save_to_cache, audio_data, text, lang, tld, speed, quality)
+                    progress.at(0.9, 'cache_write')
+                
+                result = self._rendered_result(base, audio_data, conversion_error)
+            
+            self._complete_result(result, text, lang, tld, speed, quality)
+            progress.report(1.0, 'done')
+        
+        except Exception as e:
+            result = self._failure_result(e)
+        
+        return self._record_result(result, lang, timer)
+    
+    async def agenerate_batch(
+        self,
+        texts: list,
+        lang: str,
+        speed: float = 1.0,
+        tld: str = 'com',
+        max_workers: Optional[int] = None,
+        item_timeout: Optional[float] = None,
+        quality: str = VoicifyConfig.DEFAULT_QUALITY
+    ) -> BatchResult:
+        """
+        Versão assíncrona de generate_batch.
+        
+        Args:
+            texts: Lista de textos
+            lang: Idioma
+            speed: Velocidade
+            tld: Top-level domain
+            max_workers: Número máximo de itens simultâneos (None = todos;
+                as requisições HTTP continuam limitadas pelo semáforo)
+            item_timeout: Tempo limite de cada item (segundos)
+            quality: Perfil de saída (chave de OUTPUT_PROFILES)
+        
+        Returns:
+            BatchResult: Lista de resultados na ordem de entrada
+        """
+        if item_timeout is None:
+            item_timeout = self.config.BATCH_ITEM_TIMEOUT
+        item_semaphore = asyncio.Semaphore(max_workers or max(len(texts), 1))
+        
+        async def run(index: int, text: str) -> Dict[str, Any]:
+            async with item_semaphore:
+                start = time.perf_counter()
+                try:
+                    result = await asyncio.wait_for(
+                        self.agenerate_audio(text, lang, speed, tld, timeout=item_timeout, quality=quality),
+                        timeout=item_timeout
+                    )
+                except asyncio.TimeoutError:
+                    logger.warning(f"Item {index} do lote excedeu {item_timeout}s")
+                    result = {
+                        'success': False,
+                        'error': f"Tempo limite excedido ({item_timeout}s)",
+                        'timed_out': True
+                    }
+                result['elapsed'] = time.perf_counter() - start
+            
+            result['index'] = index
             result['text'] = text[:100] + "..." if len(text) > 100 else text
-            results.append(result)
+            return result
+        
+        batch_start = time.perf_counter()
+        results = await asyncio.gather(*(run(i, text) for i, text in enumerate(texts)))
         
-        return results
+        return BatchResult(
+            results,
+            total_time=time.perf_counter() - batch_start,
+            critical_path_time=max((r['elapsed'] for r in results), default=0.0)
+        )
+    
+    async def aclose(self):
+        """Libera os recursos assíncronos do gerador e do backend."""
+        await self.backend.aclose()
+        self._async_loop = None
+        self._async_semaphore = None
+
+
+_shared_generator = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_generator() -> AudioGenerator:
+    """
+    Retorna o gerador único do processo, configurado por VoicifyConfig.
+    
+    A interface, a API HTTP e os workers do mesmo processo usam o mesmo
+    gerador, com o mesmo cache em memória e em disco, então um áudio gerado
+    por um deles é acerto de cache para os demais.
+    
+    Returns:
+        AudioGenerator: Gerador compartilhado
+    """
+    global _shared_generator
+    
+    with _shared_lock:
+        if _shared_generator is None:
+            _shared_generator = AudioGenerator(enable_cache=VoicifyConfig.ENABLE_CACHE)
+    
+    return _shared_generator
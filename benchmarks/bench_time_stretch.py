@@ -0,0 +1,76 @@
+"""
+Benchmark: ajuste de velocidade via pydub x time_stretch (WSOLA em NumPy)
+
+Uso:
+    python benchmarks/bench_time_stretch.py --minutes 10
+"""
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+from pydub import AudioSegment
+from pydub.effects import speedup
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from time_stretch import time_stretch  # noqa: E402
+
+SAMPLE_RATE = 24000  # Taxa do MP3 gerado pelo gTTS
+
+
+def synthetic_speech(seconds: float, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """Sinal com harmônicos e modulação de amplitude, parecido com voz."""
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    pitch = 140 + 30 * np.sin(2 * np.pi * 0.5 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+    voice = sum(np.sin(h * phase) / h for h in range(1, 6))
+    envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 3 * t) ** 2
+    return (voice * envelope * 6000).astype(np.int16)
+
+
+def pydub_adjust(audio: AudioSegment, speed: float) -> AudioSegment:
+    """Caminho antigo de AudioGenerator._adjust_speed (sem decodificação)."""
+    if speed > 1.0:
+        return speedup(audio, playback_speed=speed)
+    new_sample_rate = int(audio.frame_rate * speed)
+    return audio._spawn(audio.raw_data, overrides={
+        'frame_rate': new_sample_rate
+    }).set_frame_rate(audio.frame_rate)
+
+
+def numpy_adjust(audio: AudioSegment, speed: float) -> AudioSegment:
+    """Caminho novo: PCM -> time_stretch -> PCM."""
+    samples = np.frombuffer(audio.raw_data, dtype=np.int16)
+    stretched = time_stretch(samples, speed, audio.frame_rate)
+    return audio._spawn(np.clip(np.round(stretched), -32768, 32767).astype(np.int16).tobytes())
+
+
+def measure(func, *args) -> float:
+    """Executa a função uma vez e retorna o tempo em segundos."""
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=float, default=10.0, help="Duração do áudio de teste")
+    parser.add_argument("--speeds", type=float, nargs="+", default=[0.75, 1.25, 1.5, 2.0])
+    args = parser.parse_args()
+
+    samples = synthetic_speech(args.minutes * 60)
+    audio = AudioSegment(samples.tobytes(), sample_width=2, frame_rate=SAMPLE_RATE, channels=1)
+
+    print(f"Áudio de teste: {args.minutes:g} min, {SAMPLE_RATE} Hz mono")
+    print(f"{'velocidade':>10} {'pydub (s)':>10} {'numpy (s)':>10} {'ganho':>8}")
+
+    for speed in args.speeds:
+        pydub_time = measure(pydub_adjust, audio, speed)
+        numpy_time = measure(numpy_adjust, audio, speed)
+        print(f"{speed:>10.2f} {pydub_time:>10.2f} {numpy_time:>10.2f} {pydub_time / numpy_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+"""
+Suíte de benchmarks do pipeline de síntese
+
+Roda contra o LocalBackend (sem rede), grava os resultados em JSON e,
+opcionalmente, compara com um baseline salvo antes.
+
+Uso:
+    python benchmarks/run.py --output bench.json
+    python benchmarks/run.py --baseline bench.json --threshold 0.2
+    python benchmarks/run.py --quick --only split batch
+"""
+import os
+import io
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+from datetime import datetime
+from typing import Callable, Dict, Any, List, Optional
+
+from pydub import AudioSegment
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from audio_generator import AudioGenerator  # noqa: E402
+from rate_limiter import AdaptiveRateLimiter  # noqa: E402
+from tts_backends import GTTSBackend, LocalBackend  # noqa: E402
+from utils import split_text_into_chunks  # noqa: E402
+from bench_time_stretch import synthetic_speech, SAMPLE_RATE  # noqa: E402
+from standin_server import start_server  # noqa: E402
+
+GROUPS = ("generate", "speed", "split", "batch", "http")
+
+SENTENCE = "O Voicify converte texto em fala de forma rápida e natural. "
+
+
+def unlimited() -> AdaptiveRateLimiter:
+    """Limitador sem limite de taxa: mede o pipeline, não a configuração."""
+    return AdaptiveRateLimiter(rate=0, initial_window=1024, max_window=1024)
+
+
+def make_text(num_chars: int, seed: str = "", unique: bool = False) -> str:
+    """
+    Texto de teste com num_chars caracteres.
+
+    Args:
+        num_chars: Tamanho do texto
+        seed: Prefixo que torna o texto único
+        unique: Marca cada frase com o seed e um número, para que nenhum
+            chunk se repita (o cache de chunks não encurta a síntese a frio)
+    """
+    if not unique:
+        text = seed + SENTENCE * (num_chars // len(SENTENCE) + 1)
+        return text[:num_chars]
+
+    sentences = []
+    size = 0
+    while size < num_chars:
+        sentence = f"({seed} {len(sentences)}) {SENTENCE}"
+        sentences.append(sentence)
+        size += len(sentence)
+    return "".join(sentences)[:num_chars]
+
+
+def measure(func: Callable, repeats: int, setup: Optional[Callable] = None) -> List[float]:
+    """
+    Executa a função várias vezes e mede cada execução.
+
+    Args:
+        func: Função medida; recebe o retorno de setup (se houver)
+        repeats: Número de execuções
+        setup: Preparação de cada execução, fora da medição
+
+    Returns:
+        list: Tempos em segundos
+    """
+    times = []
+
+    for i in range(repeats):
+        if setup:
+            arg = setup(i)
+            start = time.perf_counter()
+            func(arg)
+        else:
+            start = time.perf_counter()
+            func()
+        times.append(time.perf_counter() - start)
+
+    return times
+
+
+def summarize(times: List[float], **params) -> Dict[str, Any]:
+    """Resume os tempos de um benchmark."""
+    return {
+        'median': statistics.median(times),
+        'min': min(times),
+        'mean': statistics.fmean(times),
+        'repeats': len(times),
+        'params': params,
+    }
+
+
+def bench_generate(args, cache_dir: str) -> Dict[str, Any]:
+    """generate_audio: síntese a frio e acertos no cache em memória e em disco."""
+    results = {}
+    backend = LocalBackend(latency=args.latency)
+    generator = AudioGenerator(backend=backend, cache_dir=os.path.join(cache_dir, "generate"), rate_limiter=unlimited())
+
+    for num_chars in ((200, 2000) if args.quick else (200, 2000, 10000)):
+        def cold(i, num_chars=num_chars):
+            return make_text(num_chars, seed=f"cold {num_chars} {i}", unique=True)
+
+        times = measure(lambda text: generator.generate_audio(text, 'pt', tld='com.br'), args.repeats, cold)
+        results[f"generate.cold.{num_chars}"] = summarize(times, chars=num_chars, latency=args.latency)
+
+        text = make_text(num_chars, seed="warm", unique=True)
+        generator.generate_audio(text, 'pt', tld='com.br')
+
+        times = measure(lambda: generator.generate_audio(text, 'pt', tld='com.br'), args.repeats)
+        results[f"generate.memory_hit.{num_chars}"] = summarize(times, chars=num_chars)
+
+        def disk(_):
+            generator.memory_cache.clear()
+
+        times = measure(lambda _: generator.generate_audio(text, 'pt', tld='com.br'), args.repeats, disk)
+        results[f"generate.disk_hit.{num_chars}"] = summarize(times, chars=num_chars)
+
+    return results
+
+
+def bench_speed(args, cache_dir: str) -> Dict[str, Any]:
+    """_adjust_speed: decodificação, time_stretch e recodificação do MP3."""
+    if not shutil.which("ffmpeg"):
+        print("speed: ffmpeg não encontrado, grupo ignorado")
+        return {}
+
+    results = {}
+    generator = AudioGenerator(enable_cache=False, backend=LocalBackend(), rate_limiter=unlimited())
+
+    for seconds in ((10, 60) if args.quick else (10, 60, 300)):
+        samples = synthetic_speech(seconds)
+        buffer = io.BytesIO()
+        AudioSegment(samples.tobytes(), sample_width=2, frame_rate=SAMPLE_RATE, channels=1).export(buffer, format='mp3')
+        audio_data = buffer.getvalue()
+
+        for speed in (0.75, 1.25, 1.5, 2.0):
+            times = measure(lambda: generator._adjust_speed(audio_data, speed), args.repeats)
+            results[f"speed.{speed:g}x.{seconds}s"] = summarize(times, seconds=seconds, speed=speed)
+
+    return results
+
+
+def bench_split(args, cache_dir: str) -> Dict[str, Any]:
+    """split_text_into_chunks: textos de 100 a 1.000.000 caracteres."""
+    results = {}
+    sizes = (100, 10_000, 100_000) if args.quick else (100, 10_000, 100_000, 1_000_000)
+
+    for num_chars in sizes:
+        text = make_text(num_chars)
+        times = measure(lambda: split_text_into_chunks(text), args.repeats)
+        results[f"split.{num_chars}"] = summarize(times, chars=num_chars)
+
+    return results
+
+
+def bench_batch(args, cache_dir: str) -> Dict[str, Any]:
+    """generate_batch: lotes de tamanhos diferentes, a frio."""
+    results = {}
+    backend = LocalBackend(latency=args.latency, jitter=args.latency / 2)
+    generator = AudioGenerator(backend=backend, cache_dir=os.path.join(cache_dir, "batch"), rate_limiter=unlimited())
+
+    for size in ((1, 10) if args.quick else (1, 10, 50)):
+        def texts(i, size=size):
+            return [make_text(300, seed=f"batch {size} {i} {n}", unique=True) for n in range(size)]
+
+        times = measure(lambda batch: generator.generate_batch(batch, 'pt', tld='com.br'), args.repeats, texts)
+        results[f"batch.{size}"] = summarize(times, size=size, latency=args.latency)
+
+    return results
+
+
+def bench_http(args, cache_dir: str) -> Dict[str, Any]:
+    """GTTSBackend contra o servidor local: pool de conexões compartilhado."""
+    results = {}
+    server = start_server(latency=args.latency / 5)
+
+    try:
+        backend = GTTSBackend(endpoint=server.url)
+        generator = AudioGenerator(backend=backend, cache_dir=os.path.join(cache_dir, "http"), rate_limiter=unlimited())
+
+        def cold(i):
+            return make_text(2000, seed=f"http {i}", unique=True)
+
+        times = measure(lambda text: generator.generate_audio(text, 'pt', tld='com.br'), args.repeats, cold)
+        stats = server.stats()
+        results["http.chunked.2000"] = summarize(
+            times, chars=2000, requests=stats['requests'], connections=stats['connections']
+        )
+    finally:
+        server.shutdown()
+
+    return results
+
+
+BENCHMARKS = {
+    "generate": bench_generate,
+    "speed": bench_speed,
+    "split": bench_split,
+    "batch": bench_batch,
+    "http": bench_http,
+}
+
+
+def environment() -> Dict[str, Any]:
+    """Informações do ambiente em que os benchmarks rodaram."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    Compara as medianas com as de um baseline.
+
+    Args:
+        results: Resultados atuais
+        baseline: Resultados do baseline
+        threshold: Piora relativa tolerada (0.2 = 20%)
+
+    Returns:
+        list: Nomes dos benchmarks que regrediram
+    """
+    regressions = []
+
+    print(f"\n{'benchmark':<28} {'baseline (ms)':>14} {'atual (ms)':>12} {'variação':>10}")
+
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            print(f"{name:<28} {'-':>14} {current['median'] * 1000:>12.2f} {'novo':>10}")
+            continue
+
+        change = current['median'] / previous['median'] - 1 if previous['median'] else 0.0
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSÃO"
+
+        print(
+            f"{name:<28} {previous['median'] * 1000:>14.2f} "
+            f"{current['median'] * 1000:>12.2f} {change:>+10.1%}{flag}"
+        )
+
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", nargs="+", choices=GROUPS, help="Grupos a executar")
+    parser.add_argument("--repeats", type=int, default=5, help="Execuções por benchmark")
+    parser.add_argument("--latency", type=float, default=0.05, help="Latência simulada do backend (s)")
+    parser.add_argument("--quick", action="store_true", help="Usa entradas menores")
+    parser.add_argument("--output", help="Arquivo JSON para gravar os resultados")
+    parser.add_argument("--baseline", help="Arquivo JSON de um baseline para comparação")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Piora tolerada em relação ao baseline")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="voicify-bench-") as cache_dir:
+        for group in args.only or GROUPS:
+            group_results = BENCHMARKS[group](args, cache_dir)
+            for name, result in group_results.items():
+                print(f"{name:<28} {result['median'] * 1000:>10.2f} ms (min {result['min'] * 1000:.2f})")
+            results.update(group_results)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'environment': environment(), 'results': results}, f, indent=2)
+        print(f"\nResultados gravados em {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) acima do limite de {args.threshold:.0%}")
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
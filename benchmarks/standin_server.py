@@ -0,0 +1,237 @@
+"""
+Servidor HTTP local que imita o endpoint de TTS usado pelo gTTS
+
+Responde no mesmo formato do batchexecute do Google Translate, com o
+áudio do LocalBackend, então o GTTSBackend pode ser testado e medido sem
+rede (GTTS_ENDPOINT ou GTTSBackend(endpoint=...)). Mantém conexões
+keep-alive (HTTP/1.1) e conta as conexões abertas, para conferir o reuso
+do pool.
+
+Uso:
+    python benchmarks/standin_server.py --port 8765 --latency 0.05
+    # GTTS_ENDPOINT = "http://127.0.0.1:8765/batchexecute"
+"""
+import os
+import sys
+import json
+import time
+import base64
+import random
+import argparse
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tts_backends import LocalBackend  # noqa: E402
+
+
+class StandinServer(ThreadingHTTPServer):
+    """Servidor com latência e falhas configuráveis e contadores de uso."""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        max_concurrency: int = 0,
+        seed: int = 0
+    ):
+        """
+        Inicializa o servidor.
+
+        Args:
+            address: (host, porta); porta 0 escolhe uma livre
+            latency: Latência de cada resposta (segundos)
+            error_rate: Fração das requisições que falham
+            error_status: Status HTTP das falhas (ex.: 503 ou 429)
+            max_concurrency: Requisições simultâneas aceitas; as excedentes
+                recebem 429, como um serviço com limite de taxa (0 = sem limite)
+            seed: Semente do sorteio das falhas
+        """
+        super().__init__(address, StandinHandler)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.max_concurrency = max_concurrency
+        self.active = 0
+        self.throttled = 0
+        self.renderer = LocalBackend()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.connections = 0
+
+    @property
+    def url(self) -> str:
+        """URL do endpoint, para GTTS_ENDPOINT."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/batchexecute"
+
+    def should_fail(self) -> bool:
+        """Sorteia se a requisição atual deve falhar."""
+        with self._lock:
+            self.requests += 1
+            fail = self.error_rate > 0 and self._random.random() < self.error_rate
+            if fail:
+                self.errors += 1
+        return fail
+
+    def enter(self) -> bool:
+        """Registra uma requisição em andamento; False se exceder o limite."""
+        with self._lock:
+            if self.max_concurrency and self.active >= self.max_concurrency:
+                self.throttled += 1
+                return False
+            self.active += 1
+            return True
+
+    def leave(self):
+        with self._lock:
+            self.active -= 1
+
+    def count_connection(self):
+        with self._lock:
+            self.connections += 1
+
+    def stats(self) -> dict:
+        """Contadores de requisições, falhas e conexões."""
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'errors': self.errors,
+                'throttled': self.throttled,
+                'connections': self.connections,
+            }
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    """Responde como o endpoint batchexecute do Google Translate."""
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server.count_connection()
+
+    def do_GET(self):
+        # Contadores para conferência (ex.: reuso de conexões)
+        self._send(200, json.dumps(self.server.stats()).encode('utf-8'), "application/json")
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length).decode('utf-8')
+
+        if not self.server.enter():
+            self._send(429, b"", "text/plain")
+            return
+
+        try:
+            self._respond(body)
+        finally:
+            self.server.leave()
+
+    def _respond(self, body: str):
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        if self.server.should_fail():
+            headers = {"Retry-After": "1"} if self.server.error_status == 429 else {}
+            self._send(self.server.error_status, b"", "text/plain", headers)
+            return
+
+        text, lang = parse_rpc(body)
+        tld = self.path.strip("/").split("/")[0] if "/" in self.path.strip("/") else "com"
+        audio = self.server.renderer.render(text, lang, tld)
+
+        audio_field = json.dumps([base64.b64encode(audio).decode('ascii')])
+        payload = json.dumps(
+            [["wrb.fr", "jQ1olc", audio_field, None, None, None, "generic"]],
+            separators=(",", ":")
+        )
+        response = f")]}}'\n\n{len(payload)}\n{payload}\n"
+        self._send(200, response.encode('utf-8'), "application/json; charset=utf-8")
+
+    def _send(self, status: int, body: bytes, content_type: str, headers: Optional[dict] = None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def parse_rpc(body: str):
+    """
+    Extrai texto e idioma do corpo montado por gTTS._package_rpc.
+
+    Args:
+        body: Corpo da requisição (f.req=...)
+
+    Returns:
+        tuple: (texto, idioma)
+    """
+    form = urllib.parse.parse_qs(body)
+    rpc = json.loads(form["f.req"][0])
+    text, lang = json.loads(rpc[0][0][1])[:2]
+    return text, lang
+
+
+def start_server(
+    port: int = 0,
+    host: str = "127.0.0.1",
+    **options
+) -> StandinServer:
+    """
+    Inicia o servidor em uma thread de fundo.
+
+    Args:
+        port: Porta (0 = uma livre)
+        host: Endereço de escuta
+        **options: Repassados a StandinServer (latency, error_rate...)
+
+    Returns:
+        StandinServer: Servidor iniciado (use .url e .shutdown())
+    """
+    server = StandinServer((host, port), **options)
+    threading.Thread(target=server.serve_forever, name="standin-tts", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Latência de cada resposta (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fração das requisições que falham")
+    parser.add_argument("--error-status", type=int, default=503, help="Status HTTP das falhas")
+    parser.add_argument("--max-concurrency", type=int, default=0, help="Requisições simultâneas aceitas (excedentes recebem 429)")
+    args = parser.parse_args()
+
+    server = StandinServer(
+        (args.host, args.port),
+        latency=args.latency,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        max_concurrency=args.max_concurrency
+    )
+    print(f"Servidor de TTS local em {server.url}")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
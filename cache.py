@@ -0,0 +1,420 @@
+"""
+Cache de áudio em disco com índice SQLite e limite de tamanho
+"""
+import os
+import time
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, Any
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILENAME = "index.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    last_access REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS entries_lru ON entries (last_access);
+CREATE INDEX IF NOT EXISTS entries_lfu ON entries (hits, last_access);
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO meta (name, value) VALUES ('total_bytes', 0);
+CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries BEGIN
+    UPDATE meta SET value = value + NEW.size WHERE name = 'total_bytes';
+END;
+CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries BEGIN
+    UPDATE meta SET value = value - OLD.size WHERE name = 'total_bytes';
+END;
+CREATE TRIGGER IF NOT EXISTS entries_update AFTER UPDATE OF size ON entries BEGIN
+    UPDATE meta SET value = value - OLD.size + NEW.size WHERE name = 'total_bytes';
+END;
+"""
+
+# Ordem de remoção de cada política de despejo
+_EVICTION_ORDER = {
+    'lru': "last_access ASC",
+    'lfu': "hits ASC, last_access ASC",
+}
+
+
+class DiskCache:
+    """
+    Cache de arquivos de áudio em disco.
+    
+    Os arquivos ficam em subdiretórios por prefixo da chave
+    (ab/cd/abcd....mp3), e um índice SQLite guarda tamanho, último acesso
+    e número de acertos de cada entrada. As buscas consultam apenas o
+    índice pela chave primária, sem listar diretórios. Quando o total
+    passa de max_bytes, as entradas são despejadas (LRU ou LFU) até
+    sobrar low_watermark do orçamento.
+    
+    Pode ser compartilhado entre threads e entre processos que usam o
+    mesmo diretório.
+    """
+    
+    def __init__(
+        self,
+        cache_dir: str,
+        max_bytes: int,
+        eviction_policy: str = 'lru',
+        low_watermark: float = 0.9,
+        extension: str = 'mp3'
+    ):
+        """
+        Inicializa o cache.
+        
+        Args:
+            cache_dir: Diretório do cache
+            max_bytes: Tamanho máximo do cache em bytes
+            eviction_policy: Política de despejo ('lru' ou 'lfu')
+            low_watermark: Fração do orçamento mantida após um despejo
+            extension: Extensão dos arquivos
+        """
+        if eviction_policy not in _EVICTION_ORDER:
+            raise ValueError(f"Política de despejo inválida: {eviction_policy}")
+        
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.eviction_policy = eviction_policy
+        self.low_watermark = low_watermark
+        self.extension = extension
+        self._local = threading.local()
+        
+        os.makedirs(cache_dir, exist_ok=True)
+        index_path = os.path.join(cache_dir, INDEX_FILENAME)
+        is_new_index = not os.path.exists(index_path)
+        
+        conn = self._connect()
+        conn.executescript(_SCHEMA)
+        
+        if is_new_index:
+            self._migrate_flat_files()
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Retorna a conexão SQLite da thread atual."""
+        conn = getattr(self._local, 'conn', None)
+        
+        if conn is None:
+            conn = sqlite3.connect(
+                os.path.join(self.cache_dir, INDEX_FILENAME),
+                timeout=30.0,
+                isolation_level=None  # autocommit; transações explícitas quando preciso
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        
+        return conn
+    
+    def path_for(self, key: str) -> str:
+        """
+        Caminho do arquivo de uma chave (exista ou não).
+        
+        Args:
+            key: Chave (hash hexadecimal)
+        
+        Returns:
+            str: Caminho do arquivo
+        """
+        return os.path.join(self.cache_dir, key[:2], key[2:4], f"{key}.{self.extension}")
+    
+    def contains(self, key: str) -> bool:
+        """Verifica se a chave está no índice."""
+        row = self._connect().execute(
+            "SELECT 1 FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+        return row is not None
+    
+    def get_path(self, key: str) -> Optional[str]:
+        """
+        Retorna o caminho do arquivo de uma chave presente no cache.
+        
+        Conta como acesso para a política de despejo.
+        
+        Args:
+            key: Chave
+        
+        Returns:
+            str: Caminho do arquivo ou None
+        """
+        conn = self._connect()
+        cursor = conn.execute(
+            "UPDATE entries SET last_access = ?, hits = hits + 1 WHERE key = ?",
+            (time.time(), key)
+        )
+        
+        if cursor.rowcount == 0:
+            return None
+        
+        return self.path_for(key)
+    
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Lê os dados de uma chave.
+        
+        Args:
+            key: Chave
+        
+        Returns:
+            bytes: Dados ou None
+        """
+        path = self.get_path(key)
+        
+        if path is None:
+            return None
+        
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            # Arquivo removido por fora; o índice deixa de apontar para ele
+            logger.warning(f"Entrada do cache sem arquivo: {path}")
+            self._connect().execute("DELETE FROM entries WHERE key = ?", (key,))
+            return None
+    
+    def put(self, key: str, data: bytes):
+        """
+        Grava os dados de uma chave, despejando entradas se necessário.
+        
+        Args:
+            key: Chave
+            data: Dados
+        """
+        path = self.path_for(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        
+        # Escrita atômica: leitores nunca veem um arquivo pela metade
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        
+        now = time.time()
+        self._connect().execute(
+            """
+            INSERT INTO entries (key, size, created, last_access, hits)
+            VALUES (?, ?, ?, ?, 0)
+            ON CONFLICT (key) DO UPDATE SET size = excluded.size, last_access = excluded.last_access
+            """,
+            (key, len(data), now, now)
+        )
+        
+        if self.total_bytes() > self.max_bytes:
+            self.evict()
+    
+    def delete(self, key: str):
+        """Remove uma chave do cache."""
+        self._connect().execute("DELETE FROM entries WHERE key = ?", (key,))
+        self._remove_file(self.path_for(key))
+    
+    def total_bytes(self) -> int:
+        """Tamanho total das entradas do índice, em bytes."""
+        row = self._connect().execute(
+            "SELECT value FROM meta WHERE name = 'total_bytes'"
+        ).fetchone()
+        return row[0] if row else 0
+    
+    def evict(self, target_bytes: Optional[int] = None) -> int:
+        """
+        Despeja entradas até o cache caber em target_bytes.
+        
+        Args:
+            target_bytes: Tamanho alvo (padrão: low_watermark * max_bytes)
+        
+        Returns:
+            int: Número de entradas removidas
+        """
+        if target_bytes is None:
+            target_bytes = int(self.max_bytes * self.low_watermark)
+        
+        conn = self._connect()
+        order = _EVICTION_ORDER[self.eviction_policy]
+        removed = []
+        
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            excess = self.total_bytes() - target_bytes
+            
+            for key, size in conn.execute(f"SELECT key, size FROM entries ORDER BY {order}"):
+                if excess <= 0:
+                    break
+                removed.append(key)
+                excess -= size
+            
+            conn.executemany("DELETE FROM entries WHERE key = ?", [(key,) for key in removed])
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        
+        for key in removed:
+            self._remove_file(self.path_for(key))
+        
+        if removed:
+            logger.info(f"Cache: {len(removed)} entradas despejadas ({self.eviction_policy})")
+        
+        return len(removed)
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Estatísticas do cache.
+        
+        Returns:
+            dict: Entradas, bytes usados, orçamento e acertos
+        """
+        entries, hits = self._connect().execute(
+            "SELECT COUNT(*), COALESCE(SUM(hits), 0) FROM entries"
+        ).fetchone()
+        
+        return {
+            'entries': entries,
+            'total_bytes': self.total_bytes(),
+            'max_bytes': self.max_bytes,
+            'hits': hits,
+            'eviction_policy': self.eviction_policy
+        }
+    
+    def clear(self):
+        """Remove todas as entradas do cache."""
+        self.evict(target_bytes=0)
+    
+    def _remove_file(self, path: str):
+        """Remove um arquivo do cache, ignorando se já não existir."""
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.error(f"Erro ao remover arquivo do cache: {e}")
+    
+    def _migrate_flat_files(self):
+        """Move arquivos do formato antigo (<hash>.mp3 na raiz) para o índice."""
+        suffix = f".{self.extension}"
+        migrated = 0
+        
+        for entry in os.scandir(self.cache_dir):
+            if not entry.is_file() or not entry.name.endswith(suffix):
+                continue
+            
+            key = entry.name[:-len(suffix)]
+            path = self.path_for(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(entry.path, path)
+            
+            stat = os.stat(path)
+            self._connect().execute(
+                "INSERT OR IGNORE INTO entries (key, size, created, last_access, hits) VALUES (?, ?, ?, ?, 0)",
+                (key, stat.st_size, stat.st_mtime, stat.st_mtime)
+            )
+            migrated += 1
+        
+        if migrated:
+            logger.info(f"Cache: {migrated} arquivos migrados para o índice")
+
+
+class MemoryCache:
+    """
+    Cache LRU em memória, limitado pelo total de bytes armazenados.
+    
+    Fica na frente do DiskCache: acertos são servidos da RAM sem abrir
+    arquivos. Seguro para uso entre threads.
+    """
+    
+    def __init__(self, max_bytes: int):
+        """
+        Inicializa o cache.
+        
+        Args:
+            max_bytes: Tamanho máximo em bytes
+        """
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Lê os dados de uma chave, marcando-a como usada recentemente.
+        
+        Args:
+            key: Chave
+        
+        Returns:
+            bytes: Dados ou None
+        """
+        with self._lock:
+            data = self._entries.get(key)
+            
+            if data is None:
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return data
+    
+    def put(self, key: str, data: bytes):
+        """
+        Armazena os dados de uma chave, removendo as menos usadas se preciso.
+        
+        Itens maiores que o orçamento inteiro não são armazenados.
+        
+        Args:
+            key: Chave
+            data: Dados
+        """
+        size = len(data)
+        if size > self.max_bytes:
+            return
+        
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._total_bytes -= len(old)
+            
+            self._entries[key] = data
+            self._total_bytes += size
+            
+            while self._total_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._total_bytes -= len(evicted)
+    
+    def delete(self, key: str):
+        """Remove uma chave do cache."""
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._total_bytes -= len(old)
+    
+    def clear(self):
+        """Remove todas as entradas do cache."""
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Estatísticas do cache.
+        
+        Returns:
+            dict: Entradas, bytes usados, orçamento, acertos e falhas
+        """
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'total_bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses
+            }
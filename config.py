@@ -0,0 +1,103 @@
+"""
+Configurações compartilhadas do Voicify
+"""
+
+
+class VoicifyConfig:
+    """Configurações gerais da aplicação."""
+    APP_TITLE = "Voicify - TTS Multilíngue Avançado"
+    APP_ICON = "🎤"
+    VERSION = "2.0"
+    MAX_TEXT_LENGTH = 10000
+    MAX_BATCH_SIZE = 10
+    DEFAULT_SPEED = 1.0
+    MIN_SPEED = 0.5
+    MAX_SPEED = 2.0
+    ENABLE_CACHE = True
+    CACHE_DIR = ".audio_cache"
+    CACHE_MAX_BYTES = 500 * 1024 * 1024  # Orçamento do cache em disco
+    CACHE_EVICTION_POLICY = "lru"  # "lru" ou "lfu"
+    MEMORY_CACHE_MAX_BYTES = 64 * 1024 * 1024  # Orçamento do cache em memória
+    SINGLE_FLIGHT_TIMEOUT = 300.0  # Espera máxima por uma síntese idêntica em andamento (segundos)
+
+    # Perfis de saída, escolhidos pelo controle "Qualidade de Áudio" (com
+    # taxa de amostragem opcional, em Hz). O gTTS entrega MP3 mono de 24 kHz
+    # a SOURCE_BITRATE: nos perfis MP3 com esse bitrate ou mais, sem ajuste
+    # de velocidade, esse arquivo é servido sem recodificar
+    OUTPUT_PROFILES = {
+        "Baixa": {"format": "ogg", "codec": "libopus", "bitrate": "16k"},  # Prévias (Opus mono)
+        "Média": {"format": "mp3", "codec": "libmp3lame", "bitrate": "24k", "sample_rate": 16000},  # MP3 menor
+        "Alta": {"format": "mp3", "codec": "libmp3lame", "bitrate": "128k"},  # MP3 original
+    }
+    SOURCE_BITRATE = "32k"  # Bitrate do MP3 entregue pelo gTTS
+    DEFAULT_QUALITY = "Alta"
+    AUDIO_MIME_TYPES = {"mp3": "audio/mpeg", "ogg": "audio/ogg"}
+
+    # Síntese em chunks paralelos
+    CHUNK_MAX_CHARS = 100  # Tamanho máximo de cada chunk (em caracteres; 1 requisição do gTTS)
+    CHUNK_THRESHOLD = 500  # Textos acima disso (em caracteres) usam chunks
+    CHUNK_MAX_WORKERS = 4  # Chunks sintetizados em paralelo
+
+    # Geração em lote
+    BATCH_MAX_WORKERS = 4  # Itens do lote processados em paralelo
+    BATCH_ITEM_TIMEOUT = 60.0  # Tempo limite de cada item (segundos)
+
+    # API assíncrona
+    ASYNC_MAX_CONCURRENCY = 64  # Requisições HTTP simultâneas por event loop
+    ASYNC_MAX_KEEPALIVE = 32  # Conexões mantidas abertas no pool
+    ASYNC_HTTP_TIMEOUT = 30.0  # Tempo limite padrão das requisições (segundos)
+
+    # Conexões com o serviço de TTS (pool compartilhado das chamadas síncronas)
+    HTTP_POOL_SIZE = 16  # Conexões keep-alive mantidas por host
+    HTTP_MAX_RETRIES = 3  # Novas tentativas em falhas de conexão e 5xx
+    HTTP_BACKOFF_FACTOR = 0.3  # Espera entre tentativas: 0.3s, 0.6s, 1.2s...
+    GTTS_ENDPOINT = None  # URL alternativa do serviço, aceita {tld} (ex.: servidor local)
+
+    # Limite de taxa adaptativo (compartilhado por todo o processo)
+    RATE_LIMIT_PER_SECOND = 8.0  # Requisições por segundo ao serviço de TTS
+    RATE_LIMIT_BURST = 16  # Rajada máxima de requisições
+    RATE_LIMIT_INITIAL_CONCURRENCY = 4  # Chamadas simultâneas no início
+    RATE_LIMIT_MIN_CONCURRENCY = 1  # Janela mínima após 429/timeouts
+    RATE_LIMIT_MAX_CONCURRENCY = 16  # Janela máxima após sucessos
+    RATE_LIMIT_MAX_WAIT = 60.0  # Espera máxima por uma vaga (segundos)
+    RATE_LIMIT_MAX_RETRIES = 3  # Novas tentativas após um 429
+    RATE_LIMIT_RETRY_BACKOFF = 0.5  # Espera antes da 1ª nova tentativa (dobra a cada uma)
+
+    # Métricas
+    METRICS_PORT = None  # Porta do endpoint /metrics (None = desativado)
+
+    # Fila de jobs
+    JOB_DIR = ".voicify_jobs"  # Banco da fila e áudios gerados pelos workers
+    JOB_EMBEDDED_WORKERS = 2  # Workers em threads do Streamlit (0 = só processos externos)
+    JOB_POLL_INTERVAL = 0.2  # Intervalo entre consultas à fila (segundos)
+    JOB_STALE_TIMEOUT = 120.0  # Sem sinal de vida por esse tempo, o job volta à fila
+    JOB_MAX_ATTEMPTS = 3  # Execuções de um job antes de marcá-lo como falho
+    JOB_RETENTION = 24 * 60 * 60  # Tempo que jobs finalizados são mantidos (segundos)
+    JOB_PURGE_INTERVAL = 60 * 60  # Intervalo entre limpezas dos jobs expirados (segundos)
+    JOB_WAIT_TIMEOUT = 10 * 60  # Espera máxima da interface por um job (segundos)
+
+    # Entrega do áudio na interface
+    AUDIO_BASE_URL = None  # URL da API (server.py) para o player buscar /v1/audio direto (None = arquivos estáticos do Streamlit)
+    SESSION_AUDIO_MAX_ITEMS = 5  # Referências de áudio mantidas por sessão (as mais antigas são liberadas)
+
+
+class LanguageConfig:
+    """Configurações de idiomas e variantes."""
+    LANGUAGES = {
+        "🇧🇷 Português (Brasil)": {"code": "pt", "tld": "com.br"},
+        "🇵🇹 Português (Portugal)": {"code": "pt", "tld": "pt"},
+        "🇺🇸 Inglês (EUA)": {"code": "en", "tld": "com"},
+        "🇬🇧 Inglês (UK)": {"code": "en", "tld": "co.uk"},
+        "🇦🇺 Inglês (Austrália)": {"code": "en", "tld": "com.au"},
+        "🇪🇸 Espanhol (Espanha)": {"code": "es", "tld": "es"},
+        "🇲🇽 Espanhol (México)": {"code": "es", "tld": "com.mx"},
+        "🇫🇷 Francês": {"code": "fr", "tld": "fr"},
+        "🇩🇪 Alemão": {"code": "de", "tld": "de"},
+        "🇮🇹 Italiano": {"code": "it", "tld": "it"},
+        "🇷🇺 Russo": {"code": "ru", "tld": "ru"},
+        "🇨🇳 Chinês (Simplificado)": {"code": "zh-cn", "tld": "com"},
+        "🇯🇵 Japonês": {"code": "ja", "tld": "co.jp"},
+        "🇰🇷 Coreano": {"code": "ko", "tld": "co.kr"},
+        "🇸🇦 Árabe": {"code": "ar", "tld": "com"},
+        "🇮🇳 Hindi": {"code": "hi", "tld": "co.in"},
+    }
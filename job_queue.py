@@ -0,0 +1,641 @@
+"""
+Fila persistente de gerações de áudio (SQLite) e workers que a consomem
+
+A interface só enfileira o pedido e acompanha o job pelo ID; a síntese
+roda em workers, que podem ficar no processo do Streamlit (threads) ou
+em processos próprios, escalados à parte:
+
+    python -m job_queue --workers 4
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import socket
+import signal
+import logging
+import argparse
+import threading
+import sqlite3
+import multiprocessing
+from typing import Any, Callable, Dict, List, Optional
+
+from config import VoicifyConfig
+
+logger = logging.getLogger(__name__)
+
+DB_FILENAME = "jobs.sqlite3"
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+FINISHED = (DONE, FAILED)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    params TEXT NOT NULL,
+    progress REAL NOT NULL DEFAULT 0,
+    stage TEXT,
+    result TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    created REAL NOT NULL,
+    started REAL,
+    heartbeat REAL,
+    finished REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created);
+"""
+
+# Campos do resultado de generate_audio guardados no job (o áudio vai para arquivo)
+_RESULT_FIELDS = ('size', 'from_cache', 'coalesced', 'chunks', 'timings', 'quality', 'format', 'mime', 'cache_key', 'conversion_error')
+
+
+class JobQueue:
+    """
+    Fila de jobs de síntese em um banco SQLite.
+    
+    Cada job guarda os parâmetros, o estado, o progresso e o resultado; o
+    áudio gerado fica em um arquivo ao lado do banco, que é um hard link
+    para o arquivo do cache quando possível (uma só cópia em disco, que
+    continua lá mesmo se o cache despejar a entrada). Como tudo está em
+    disco, um job sobrevive a reruns do Streamlit, a reconexões do
+    navegador e a reinícios dos workers. Pode ser compartilhada entre
+    threads e entre processos que usam o mesmo diretório.
+    """
+    
+    def __init__(
+        self,
+        queue_dir: str,
+        stale_timeout: float = 120.0,
+        max_attempts: int = 3
+    ):
+        """
+        Inicializa a fila.
+        
+        Args:
+            queue_dir: Diretório do banco e dos áudios gerados
+            stale_timeout: Segundos sem sinal de vida até um job em
+                execução voltar para a fila (worker que caiu)
+            max_attempts: Execuções de um job antes de marcá-lo como falho
+        """
+        self.queue_dir = queue_dir
+        self.results_dir = os.path.join(queue_dir, "results")
+        self.stale_timeout = stale_timeout
+        self.max_attempts = max_attempts
+        self._local = threading.local()
+        
+        os.makedirs(self.results_dir, exist_ok=True)
+        self._connect().executescript(_SCHEMA)
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Retorna a conexão SQLite da thread atual."""
+        conn = getattr(self._local, 'conn', None)
+        
+        if conn is None:
+            conn = sqlite3.connect(
+                os.path.join(self.queue_dir, DB_FILENAME),
+                timeout=30.0,
+                isolation_level=None  # autocommit; transações explícitas quando preciso
+            )
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        
+        return conn
+    
+    def result_path(self, job_id: str, audio_format: str = 'mp3') -> str:
+        """Caminho do arquivo de áudio de um job (exista ou não)."""
+        return os.path.join(self.results_dir, f"{job_id}.{audio_format}")
+    
+    def submit(self, params: Dict[str, Any]) -> str:
+        """
+        Enfileira um job.
+        
+        Args:
+            params: Parâmetros da geração (text, lang, tld, speed e
+                metadados livres da interface)
+        
+        Returns:
+            str: ID do job
+        """
+        job_id = uuid.uuid4().hex
+        self._connect().execute(
+            "INSERT INTO jobs (id, status, params, created) VALUES (?, ?, ?, ?)",
+            (job_id, QUEUED, json.dumps(params, ensure_ascii=False), time.time())
+        )
+        logger.info(f"Job enfileirado: {job_id}")
+        return job_id
+    
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Consulta um job.
+        
+        Args:
+            job_id: ID do job
+        
+        Returns:
+            dict: Job (status, params, progress, stage, result, error...)
+            ou None se não existir
+        """
+        row = self._connect().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+    
+    def read_audio(self, job_id: str, audio_format: str = 'mp3') -> Optional[bytes]:
+        """
+        Lê o áudio de um job concluído gravado na fila.
+        
+        Args:
+            job_id: ID do job
+            audio_format: Formato do resultado (result['format'] do job)
+        
+        Returns:
+            bytes: Áudio ou None se o arquivo não existir (mais)
+        """
+        try:
+            with open(self.result_path(job_id, audio_format), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+    
+    def claim(self, worker: str) -> Optional[Dict[str, Any]]:
+        """
+        Reserva o job mais antigo da fila para um worker.
+        
+        Antes, devolve à fila os jobs cujo worker parou de dar sinal de vida.
+        
+        Args:
+            worker: Identificação do worker
+        
+        Returns:
+            dict: Job reservado ou None se a fila estiver vazia
+        """
+        conn = self._connect()
+        now = time.time()
+        
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._requeue_stale(conn, now)
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE status = ? ORDER BY created LIMIT 1", (QUEUED,)
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, worker = ?, attempts = attempts + 1, "
+                    "started = ?, heartbeat = ?, progress = 0, stage = NULL WHERE id = ?",
+                    (RUNNING, worker, now, now, row['id'])
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        
+        if row is None:
+            return None
+        
+        job = self._to_dict(row)
+        job.update(status=RUNNING, worker=worker, attempts=job['attempts'] + 1)
+        return job
+    
+    def _requeue_stale(self, conn: sqlite3.Connection, now: float):
+        """Devolve à fila (ou falha) os jobs de workers sem sinal de vida."""
+        cutoff = now - self.stale_timeout
+        
+        failed = conn.execute(
+            "UPDATE jobs SET status = ?, error = ?, finished = ? "
+            "WHERE status = ? AND heartbeat < ? AND attempts >= ?",
+            (FAILED, "Worker interrompido durante a geração", now, RUNNING, cutoff, self.max_attempts)
+        ).rowcount
+        requeued = conn.execute(
+            "UPDATE jobs SET status = ?, worker = NULL WHERE status = ? AND heartbeat < ?",
+            (QUEUED, RUNNING, cutoff)
+        ).rowcount
+        
+        if failed or requeued:
+            logger.warning(f"Jobs sem sinal de vida: {requeued} devolvidos à fila, {failed} falharam")
+    
+    def heartbeat(self, job_id: str, progress: Optional[float] = None, stage: Optional[str] = None):
+        """
+        Registra que o job continua em execução e, opcionalmente, o progresso.
+        
+        Args:
+            job_id: ID do job
+            progress: Fração concluída (0 a 1)
+            stage: Etapa atual
+        """
+        self._connect().execute(
+            "UPDATE jobs SET heartbeat = ?, progress = COALESCE(?, progress), "
+            "stage = COALESCE(?, stage) WHERE id = ? AND status = ?",
+            (time.time(), progress, stage, job_id, RUNNING)
+        )
+    
+    def _finish(self, conn: sqlite3.Connection, job_id: str, worker: str, sets: str, values: tuple) -> bool:
+        """
+        Finaliza um job ainda em execução pelo worker.
+        
+        Um worker dado como parado pode terminar depois que o job voltou à
+        fila (ou foi reservado por outro); esse resultado atrasado é ignorado.
+        
+        Returns:
+            bool: True se o job foi atualizado
+        """
+        updated = conn.execute(
+            f"UPDATE jobs SET {sets} WHERE id = ? AND status = ? AND worker = ?",
+            (*values, job_id, RUNNING, worker)
+        ).rowcount
+        
+        if not updated:
+            logger.warning(f"Job {job_id} não pertence mais ao worker {worker}; resultado descartado")
+        return bool(updated)
+    
+    def complete(
+        self,
+        job_id: str,
+        worker: str,
+        audio_data: bytes,
+        result: Dict[str, Any],
+        source_path: Optional[str] = None
+    ) -> bool:
+        """
+        Grava o áudio e marca o job como concluído.
+        
+        Args:
+            job_id: ID do job
+            worker: Worker que reservou o job
+            audio_data: Áudio gerado
+            result: Metadados do resultado (tamanho, tempos, formato...)
+            source_path: Arquivo com o mesmo áudio (ex.: no cache), ligado
+                por hard link em vez de copiado; se o link falhar (outro
+                sistema de arquivos, arquivo já despejado), audio_data é gravado
+        
+        Returns:
+            bool: False se o job não estava mais com esse worker (o áudio
+            não é gravado)
+        """
+        path = self.result_path(job_id, result.get('format', 'mp3'))
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        
+        linked = False
+        if source_path is not None:
+            try:
+                os.link(source_path, tmp_path)
+                linked = True
+            except OSError as e:
+                logger.debug(f"Sem hard link para o job {job_id}, copiando o áudio: {e}")
+        
+        if not linked:
+            with open(tmp_path, 'wb') as f:
+                f.write(audio_data)
+        
+        # O arquivo só vai para o lugar se o job ainda é deste worker; como a
+        # troca acontece dentro da transação, quem lê o job concluído já
+        # encontra o áudio, e um worker atrasado não sobrescreve o resultado
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            owned = self._finish(
+                conn, job_id, worker,
+                "status = ?, progress = 1, result = ?, error = NULL, finished = ?",
+                (DONE, json.dumps(result), time.time())
+            )
+            if owned:
+                os.replace(tmp_path, path)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+        
+        if not owned:
+            return False
+        
+        logger.info(f"Job concluído: {job_id}")
+        return True
+    
+    def fail(self, job_id: str, worker: str, error: str) -> bool:
+        """
+        Marca o job como falho.
+        
+        Returns:
+            bool: False se o job não estava mais com esse worker
+        """
+        if not self._finish(
+            self._connect(), job_id, worker,
+            "status = ?, error = ?, finished = ?",
+            (FAILED, error, time.time())
+        ):
+            return False
+        
+        logger.error(f"Job falhou: {job_id}: {error}")
+        return True
+    
+    def purge(self, older_than: float) -> int:
+        """
+        Remove jobs finalizados há mais de older_than segundos e seus áudios.
+        
+        Returns:
+            int: Número de jobs removidos
+        """
+        conn = self._connect()
+        cutoff = time.time() - older_than
+        rows = conn.execute(
+            "SELECT id, result FROM jobs WHERE status IN (?, ?) AND finished < ?", (*FINISHED, cutoff)
+        ).fetchall()
+        
+        for row in rows:
+            result = json.loads(row['result']) if row['result'] else {}
+            try:
+                os.remove(self.result_path(row['id'], result.get('format', 'mp3')))
+            except FileNotFoundError:
+                pass
+            conn.execute("DELETE FROM jobs WHERE id = ?", (row['id'],))
+        
+        return len(rows)
+    
+    def counts(self) -> Dict[str, int]:
+        """Número de jobs por estado."""
+        rows = self._connect().execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status")
+        return {row['status']: row['n'] for row in rows}
+    
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job['params'] = json.loads(job['params'])
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        return job
+
+
+class JobWorker:
+    """
+    Worker que retira jobs da fila e os executa com um AudioGenerator.
+    
+    O progresso informado pelo AudioGenerator é gravado no job. Enquanto
+    um job roda, uma thread de fundo também renova o sinal de vida, para
+    que etapas longas não façam o job voltar à fila por engano.
+    """
+    
+    def __init__(
+        self,
+        queue: JobQueue,
+        generator,
+        name: Optional[str] = None,
+        poll_interval: float = 0.5
+    ):
+        """
+        Inicializa o worker.
+        
+        Args:
+            queue: Fila de jobs
+            generator: AudioGenerator usado nas sínteses
+            name: Identificação do worker (padrão: host:pid:thread)
+            poll_interval: Espera entre consultas com a fila vazia (segundos)
+        """
+        self.queue = queue
+        self.generator = generator
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}"
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+    
+    def stop(self):
+        """Pede ao worker que pare após o job atual."""
+        self._stop.set()
+    
+    def run(self):
+        """Consome a fila até stop() ser chamado."""
+        logger.info(f"Worker {self.name} iniciado")
+        
+        while not self._stop.is_set():
+            try:
+                job = self.queue.claim(self.name)
+            except sqlite3.Error as e:
+                logger.error(f"Erro ao consultar a fila de jobs: {e}")
+                job = None
+            
+            if job is None:
+                self._stop.wait(self.poll_interval)
+                continue
+            
+            self.process(job)
+        
+        logger.info(f"Worker {self.name} encerrado")
+    
+    def process(self, job: Dict[str, Any]):
+        """
+        Executa um job reservado e grava o resultado na fila.
+        
+        Args:
+            job: Job retornado por JobQueue.claim
+        """
+        params = job['params']
+        done = threading.Event()
+        beat = threading.Thread(target=self._keep_alive, args=(job['id'], done), daemon=True)
+        beat.start()
+        
+        def report(progress: float, stage: str):
+            self.queue.heartbeat(job['id'], progress, stage)
+        
+        try:
+            result = self.generator.generate_audio(
+                params['text'],
+                params.get('lang', 'pt'),
+                params.get('speed', 1.0),
+                params.get('tld', 'com'),
+                progress_callback=report,
+                quality=params.get('quality', VoicifyConfig.DEFAULT_QUALITY)
+            )
+        except Exception as e:
+            result = {'success': False, 'error': str(e)}
+        finally:
+            done.set()
+        
+        if result['success']:
+            meta = {field: result[field] for field in _RESULT_FIELDS if field in result}
+            # Áudio já no cache: o job ganha um hard link para o arquivo (uma
+            # cópia em disco, mantida até JOB_RETENTION mesmo se o cache a despejar)
+            cache = self.generator.cache if self.generator.enable_cache else None
+            source_path = None
+            if cache is not None and cache.contains(result['cache_key']):
+                source_path = cache.path_for(result['cache_key'])
+            self.queue.complete(job['id'], self.name, result['audio_data'], meta, source_path)
+        else:
+            self.queue.fail(job['id'], self.name, result['error'])
+    
+    def _keep_alive(self, job_id: str, done: threading.Event):
+        """Renova o sinal de vida do job até done ser sinalizado."""
+        interval = max(self.queue.stale_timeout / 4, 0.1)
+        
+        while not done.wait(interval):
+            try:
+                self.queue.heartbeat(job_id)
+            except sqlite3.Error as e:
+                logger.warning(f"Falha ao renovar o job {job_id}: {e}")
+
+
+def get_job_queue() -> JobQueue:
+    """
+    Cria a fila configurada por VoicifyConfig.
+    
+    Returns:
+        JobQueue: Fila no diretório JOB_DIR
+    """
+    config = VoicifyConfig()
+    return JobQueue(
+        config.JOB_DIR,
+        stale_timeout=config.JOB_STALE_TIMEOUT,
+        max_attempts=config.JOB_MAX_ATTEMPTS
+    )
+
+
+def start_workers(
+    queue: JobQueue,
+    generator,
+    count: int,
+    poll_interval: float = 0.5
+) -> List[JobWorker]:
+    """
+    Inicia workers em threads de fundo do processo atual.
+    
+    Args:
+        queue: Fila de jobs
+        generator: AudioGenerator compartilhado pelos workers
+        count: Número de workers
+        poll_interval: Espera entre consultas com a fila vazia
+    
+    Returns:
+        list: Workers iniciados (use stop() para encerrá-los)
+    """
+    workers = []
+    
+    for i in range(count):
+        worker = JobWorker(queue, generator, name=f"{socket.gethostname()}:{os.getpid()}:t{i}", poll_interval=poll_interval)
+        threading.Thread(target=worker.run, name=f"voicify-job-worker-{i}", daemon=True).start()
+        workers.append(worker)
+    
+    return workers
+
+
+def start_purger(
+    queue: JobQueue,
+    retention: float,
+    interval: float,
+    on_purge: Optional[Callable[[JobQueue], None]] = None
+) -> threading.Event:
+    """
+    Remove os jobs expirados agora e depois a cada interval, numa thread de fundo.
+    
+    Args:
+        queue: Fila de jobs
+        retention: Idade (segundos) a partir da qual jobs finalizados são removidos
+        interval: Espera entre limpezas (segundos)
+        on_purge: Chamada após cada limpeza (ex.: remover cópias dos áudios)
+    
+    Returns:
+        threading.Event: Sinalize para encerrar a thread
+    """
+    stopped = threading.Event()
+    
+    def run():
+        while True:
+            try:
+                removed = queue.purge(retention)
+                if on_purge is not None:
+                    on_purge(queue)
+                if removed:
+                    logger.info(f"Limpeza da fila: {removed} jobs expirados removidos")
+            except (sqlite3.Error, OSError) as e:
+                logger.error(f"Erro na limpeza da fila de jobs: {e}")
+            
+            if stopped.wait(interval):
+                return
+    
+    threading.Thread(target=run, name="voicify-job-purge", daemon=True).start()
+    return stopped
+
+
+def _worker_process(queue_dir: str, index: int, threads: int):
+    """Ponto de entrada de cada processo do pool de workers."""
+    from audio_generator import get_shared_generator
+    
+    config = VoicifyConfig()
+    queue = JobQueue(queue_dir, stale_timeout=config.JOB_STALE_TIMEOUT, max_attempts=config.JOB_MAX_ATTEMPTS)
+    generator = get_shared_generator()
+    workers = start_workers(queue, generator, threads, config.JOB_POLL_INTERVAL)
+    
+    stopped = threading.Event()
+    
+    def shutdown(signum, frame):
+        for worker in workers:
+            worker.stop()
+        stopped.set()
+    
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+    logger.info(f"Processo de workers {index} iniciado ({threads} threads)")
+    
+    purger = start_purger(queue, config.JOB_RETENTION, config.JOB_PURGE_INTERVAL)
+    stopped.wait()
+    purger.set()
+
+
+def run_pool(queue_dir: str, processes: int, threads: int = 1):
+    """
+    Executa um pool de processos de workers até receber SIGINT/SIGTERM.
+    
+    Args:
+        queue_dir: Diretório da fila
+        processes: Número de processos
+        threads: Workers (threads) por processo
+    """
+    pool = [
+        multiprocessing.Process(target=_worker_process, args=(queue_dir, i, threads), name=f"voicify-worker-{i}")
+        for i in range(processes)
+    ]
+    
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+    
+    for process in pool:
+        process.start()
+    
+    # SIGTERM no pool encerra também os processos filhos
+    signal.signal(signal.SIGTERM, stop)
+    
+    try:
+        for process in pool:
+            process.join()
+    except KeyboardInterrupt:
+        for process in pool:
+            process.terminate()
+        for process in pool:
+            process.join()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    config = VoicifyConfig()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=2, help="Processos de workers")
+    parser.add_argument("--threads", type=int, default=1, help="Workers (threads) por processo")
+    parser.add_argument("--queue-dir", default=config.JOB_DIR, help="Diretório da fila")
+    args = parser.parse_args(argv)
+    
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(processName)s %(levelname)s %(message)s")
+    
+    JobQueue(args.queue_dir)
+    logger.info(f"Pool de workers: {args.workers} processos x {args.threads} threads em {args.queue_dir}")
+    run_pool(args.queue_dir, args.workers, args.threads)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
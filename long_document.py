@@ -0,0 +1,220 @@
+"""
+Narração de documentos longos (capítulos, livros) com memória constante
+
+O texto é lido do arquivo em blocos, segmentado em frases e sintetizado
+aos poucos, com uma janela limitada de frases em andamento; o áudio de
+cada frase vai direto para o arquivo de saída. Nem o texto nem o áudio
+completos ficam em memória, então não há o limite de MAX_TEXT_LENGTH.
+
+Um checkpoint ao lado da saída (<saída>.progress.json) registra quantas
+frases já foram gravadas; rodar de novo com os mesmos parâmetros continua
+de onde parou.
+"""
+import os
+import json
+import time
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Dict, Optional
+
+from config import VoicifyConfig
+from mp3_utils import mp3_duration, write_frames
+from text_segmenter import iter_file, iter_segments
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_SUFFIX = ".progress.json"
+
+# Frases gravadas entre dois checkpoints
+CHECKPOINT_EVERY = 20
+
+
+def checkpoint_path(output_path: str) -> str:
+    """Caminho do checkpoint de uma saída."""
+    return output_path + CHECKPOINT_SUFFIX
+
+
+def _load_checkpoint(path: str, job: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Lê o checkpoint, se existir e for da mesma entrada e dos mesmos parâmetros."""
+    try:
+        with open(path, encoding='utf-8') as f:
+            state = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    
+    if state.get('job') != job:
+        logger.info("Checkpoint de outra entrada ou parâmetros; recomeçando do início")
+        return None
+    
+    return state
+
+
+def _save_checkpoint(path: str, state: Dict[str, Any]):
+    """Grava o checkpoint de forma atômica."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+
+def render_document(
+    input_path: str,
+    output_path: str,
+    lang: str,
+    tld: str = 'com',
+    speed: float = 1.0,
+    generator=None,
+    max_workers: Optional[int] = None,
+    timeout: Optional[float] = None,
+    progress_callback: Optional[Callable[[float, str], None]] = None
+) -> Dict[str, Any]:
+    """
+    Narra um arquivo de texto de qualquer tamanho em um MP3.
+    
+    As frases são sintetizadas em paralelo (até 2 por worker à frente da
+    gravação), passando pelo cache de chunks, e gravadas na ordem do texto.
+    
+    Args:
+        input_path: Arquivo de texto (UTF-8)
+        output_path: Arquivo MP3 de saída
+        lang: Código do idioma
+        tld: Top-level domain para variante
+        speed: Velocidade da fala (aplicada a cada frase)
+        generator: AudioGenerator (padrão: o gerador compartilhado do processo)
+        max_workers: Frases sintetizadas em paralelo
+        timeout: Tempo limite de cada requisição HTTP (segundos)
+        progress_callback: Chamado com (fração do texto gravada, 'synthesis')
+            a cada frase gravada e com (1.0, 'done') no fim
+    
+    Returns:
+        dict: 'success', 'segments', 'resumed_from' (frases puladas pelo
+        checkpoint), 'size' (bytes da saída), 'duration' (segundos do áudio
+        gravado nesta execução) e 'elapsed'; ou 'error' em caso de falha
+        (o checkpoint é mantido para retomar)
+    """
+    if generator is None:
+        from audio_generator import get_shared_generator
+        generator = get_shared_generator()
+    
+    config = VoicifyConfig()
+    workers = max_workers or config.CHUNK_MAX_WORKERS
+    start = time.perf_counter()
+    
+    stat = os.stat(input_path)
+    job = {
+        'input': os.path.abspath(input_path),
+        'input_size': stat.st_size,
+        'input_mtime': stat.st_mtime,
+        'lang': lang,
+        'tld': tld,
+        'speed': speed,
+        'max_chars': config.CHUNK_MAX_CHARS,
+    }
+    progress_file = checkpoint_path(output_path)
+    state = _load_checkpoint(progress_file, job)
+    
+    # Saída menor que o registrado (apagada ou truncada por fora): recomeça
+    if state is not None and (not os.path.exists(output_path) or os.path.getsize(output_path) < state['bytes']):
+        state = None
+    
+    if state is None:
+        state = {'job': job, 'segments': 0, 'bytes': 0, 'text_bytes': 0}
+        output = open(output_path, 'wb')
+    else:
+        # Descarta o que foi gravado depois do último checkpoint
+        output = open(output_path, 'r+b')
+        output.truncate(state['bytes'])
+        output.seek(state['bytes'])
+        logger.info(f"Retomando {output_path} a partir da frase {state['segments']}")
+    
+    resumed_from = state['segments']
+    duration = 0.0
+    
+    def report(value: float, stage: str):
+        if progress_callback is None:
+            return
+        try:
+            progress_callback(value, stage)
+        except Exception as e:
+            logger.warning(f"Erro no progress_callback: {e}")
+    
+    def save():
+        output.flush()
+        os.fsync(output.fileno())
+        _save_checkpoint(progress_file, state)
+    
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="voicify-document")
+    pending = deque()
+    
+    try:
+        with open(input_path, encoding='utf-8') as text_file:
+            segments = iter_segments(iter_file(text_file), config.CHUNK_MAX_CHARS)
+            
+            # Frases já gravadas: só avançam o segmentador
+            resume_count = state['segments']
+            deque(islice(segments, resume_count), maxlen=0)
+            
+            def submit(segment: str):
+                future = executor.submit(generator.render_chunk, segment, lang, speed, tld, timeout)
+                pending.append((segment, future))
+            
+            # Janela limitada: no máximo 2 frases por worker à frente da gravação
+            for segment in islice(segments, workers * 2):
+                submit(segment)
+            
+            while pending:
+                segment, future = pending.popleft()
+                audio_data = future.result()
+                
+                for next_segment in islice(segments, 1):
+                    submit(next_segment)
+                
+                state['bytes'] += write_frames(audio_data, output)
+                state['segments'] += 1
+                state['text_bytes'] += len(segment.encode('utf-8')) + 1
+                duration += mp3_duration(audio_data)
+                
+                if (state['segments'] - resume_count) % CHECKPOINT_EVERY == 0:
+                    save()
+                report(min(state['text_bytes'] / max(stat.st_size, 1), 0.99), 'synthesis')
+        
+        if state['segments'] == 0:
+            raise ValueError("O documento está vazio")
+        save()
+    
+    except Exception as e:
+        logger.error(f"Erro ao narrar {input_path}: {e}", exc_info=True)
+        for _, future in pending:
+            future.cancel()
+        # Guarda o que já foi gravado, para a próxima execução continuar daí
+        try:
+            save()
+        except OSError as save_error:
+            logger.error(f"Erro ao gravar o checkpoint: {save_error}")
+        return {
+            'success': False,
+            'error': str(e),
+            'segments': state['segments'],
+            'resumed_from': resumed_from,
+        }
+    
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        output.close()
+    
+    os.remove(progress_file)
+    report(1.0, 'done')
+    
+    elapsed = time.perf_counter() - start
+    logger.info(f"Documento narrado: {state['segments']} frases, {state['bytes']} bytes em {elapsed:.1f}s")
+    
+    return {
+        'success': True,
+        'segments': state['segments'],
+        'resumed_from': resumed_from,
+        'size': state['bytes'],
+        'duration': duration,
+        'elapsed': elapsed,
+    }
@@ -0,0 +1,452 @@
+"""
+Métricas do processo (contadores e histogramas) no formato do Prometheus
+"""
+import time
+import bisect
+import logging
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Any, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Tipo de conteúdo do formato de texto do Prometheus
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Limites (segundos) dos histogramas de latência
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Etapas medidas em cada geração
+STAGES = ('cache_lookup', 'synthesis', 'speed_adjust', 'encoding', 'cache_write')
+
+
+def _format_labels(labelnames: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    """Monta o bloco {nome="valor",...} de uma série."""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    """Escapa um valor de label."""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    """Formata um valor numérico no formato de texto do Prometheus."""
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    """Contador monotônico, opcionalmente com labels."""
+    
+    kind = "counter"
+    
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()):
+        """
+        Inicializa o contador.
+        
+        Args:
+            name: Nome da métrica
+            help_text: Descrição
+            labelnames: Nomes dos labels
+        """
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+    
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+    
+    def inc(self, amount: float = 1.0, **labels):
+        """Incrementa o contador da série indicada pelos labels."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+    
+    def value(self, **labels) -> float:
+        """Valor atual de uma série."""
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+    
+    def total(self) -> float:
+        """Soma de todas as séries."""
+        with self._lock:
+            return sum(self._values.values())
+    
+    def reset(self):
+        """Zera todas as séries."""
+        with self._lock:
+            self._values.clear()
+    
+    def collect(self) -> Iterator[str]:
+        """Linhas da métrica no formato de texto do Prometheus."""
+        with self._lock:
+            items = sorted(self._values.items())
+        
+        for key, value in items:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Gauge:
+    """Valor calculado no momento da coleta."""
+    
+    kind = "gauge"
+    
+    def __init__(self, name: str, help_text: str, func: Callable[[], float]):
+        """
+        Inicializa o gauge.
+        
+        Args:
+            name: Nome da métrica
+            help_text: Descrição
+            func: Função que retorna o valor atual
+        """
+        self.name = name
+        self.help_text = help_text
+        self.func = func
+    
+    def reset(self):
+        """Gauges calculados não têm estado."""
+    
+    def collect(self) -> Iterator[str]:
+        """Linhas da métrica no formato de texto do Prometheus."""
+        yield f"{self.name} {_format_value(self.func())}"
+
+
+class Histogram:
+    """Histograma com buckets fixos, opcionalmente com labels."""
+    
+    kind = "histogram"
+    
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = LATENCY_BUCKETS
+    ):
+        """
+        Inicializa o histograma.
+        
+        Args:
+            name: Nome da métrica
+            help_text: Descrição
+            labelnames: Nomes dos labels
+            buckets: Limites superiores dos buckets (em ordem crescente)
+        """
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._series: Dict[Tuple[str, ...], Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+    
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+    
+    def observe(self, value: float, **labels):
+        """Registra uma observação na série indicada pelos labels."""
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            series['counts'][index] += 1
+            series['sum'] += value
+            series['count'] += 1
+    
+    def count(self, **labels) -> int:
+        """Número de observações de uma série."""
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            return series['count'] if series else 0
+    
+    def quantile(self, q: float, **labels) -> Optional[float]:
+        """
+        Estima um quantil de uma série por interpolação nos buckets.
+        
+        Usa a mesma aproximação de histogram_quantile do Prometheus.
+        
+        Args:
+            q: Quantil entre 0 e 1 (ex.: 0.95)
+            **labels: Labels da série
+        
+        Returns:
+            float: Valor estimado ou None sem observações
+        """
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            if not series or not series['count']:
+                return None
+            counts = list(series['counts'])
+            total = series['count']
+        
+        rank = q * total
+        cumulative = 0
+        
+        for i, count in enumerate(counts):
+            if cumulative + count >= rank and count:
+                upper = self.buckets[i]
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                if upper == float("inf"):
+                    return lower
+                return lower + (upper - lower) * (rank - cumulative) / count
+            cumulative += count
+        
+        return self.buckets[-2]
+    
+    def reset(self):
+        """Zera todas as séries."""
+        with self._lock:
+            self._series.clear()
+    
+    def collect(self) -> Iterator[str]:
+        """Linhas da métrica no formato de texto do Prometheus."""
+        with self._lock:
+            items = sorted((key, dict(series, counts=list(series['counts']))) for key, series in self._series.items())
+        
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series['counts']):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(series['sum'])}"
+            yield f"{self.name}_count{labels} {series['count']}"
+
+
+class Registry:
+    """Conjunto das métricas do processo."""
+    
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+    
+    def register(self, metric):
+        """Registra uma métrica e a retorna."""
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Métrica já registrada: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+    
+    def reset(self):
+        """Zera todas as métricas (útil em benchmarks)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.reset()
+    
+    def render_prometheus(self) -> str:
+        """
+        Exporta todas as métricas no formato de texto do Prometheus.
+        
+        Returns:
+            str: Texto no formato de exposição 0.0.4
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.collect())
+        
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+CACHE_REQUESTS = REGISTRY.register(Counter(
+    "voicify_cache_requests_total",
+    "Gerações por resultado do cache (hit, base_hit ou miss)",
+    ("result",)
+))
+BYTES_SERVED = REGISTRY.register(Counter(
+    "voicify_bytes_served_total",
+    "Bytes de áudio entregues"
+))
+GENERATIONS = REGISTRY.register(Counter(
+    "voicify_generations_total",
+    "Gerações por idioma e status (success ou error)",
+    ("lang", "status")
+))
+GENERATION_SECONDS = REGISTRY.register(Histogram(
+    "voicify_generation_seconds",
+    "Latência total das gerações por idioma",
+    ("lang",)
+))
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "voicify_stage_seconds",
+    "Tempo gasto em cada etapa da geração",
+    ("stage",)
+))
+UPSTREAM_REQUESTS = REGISTRY.register(Counter(
+    "voicify_upstream_requests_total",
+    "Chamadas ao backend de síntese",
+    ("backend",)
+))
+UPSTREAM_ERRORS = REGISTRY.register(Counter(
+    "voicify_upstream_errors_total",
+    "Chamadas ao backend de síntese que falharam",
+    ("backend",)
+))
+COALESCED = REGISTRY.register(Counter(
+    "voicify_coalesced_total",
+    "Sínteses evitadas por coalescência com uma síntese idêntica em andamento",
+    ("level",)
+))
+UPSTREAM_THROTTLED = REGISTRY.register(Counter(
+    "voicify_upstream_throttled_total",
+    "Chamadas recusadas por limite de taxa (429) ou que excederam o tempo limite",
+    ("backend",)
+))
+RATE_LIMIT_TIMEOUTS = REGISTRY.register(Counter(
+    "voicify_rate_limit_timeouts_total",
+    "Chamadas abandonadas sem vaga no limitador local (nenhuma requisição enviada)",
+    ("backend",)
+))
+
+
+def cache_hit_ratio() -> float:
+    """Fração das gerações atendidas inteiramente pelo cache."""
+    total = CACHE_REQUESTS.total()
+    return CACHE_REQUESTS.value(result="hit") / total if total else 0.0
+
+
+def upstream_error_rate() -> float:
+    """Fração das chamadas ao backend que falharam."""
+    total = UPSTREAM_REQUESTS.total()
+    return UPSTREAM_ERRORS.total() / total if total else 0.0
+
+
+REGISTRY.register(Gauge(
+    "voicify_cache_hit_ratio",
+    "Fração das gerações atendidas inteiramente pelo cache",
+    cache_hit_ratio
+))
+REGISTRY.register(Gauge(
+    "voicify_upstream_error_ratio",
+    "Fração das chamadas ao backend de síntese que falharam",
+    upstream_error_rate
+))
+
+
+class StageTimer:
+    """
+    Mede o tempo de cada etapa de uma geração.
+    
+    Exemplo:
+        timer = StageTimer()
+        with timer.stage('synthesis'):
+            ...
+        timings = timer.finish()
+    """
+    
+    def __init__(self):
+        self.timings = {stage: 0.0 for stage in STAGES}
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+    
+    @contextmanager
+    def stage(self, name: str):
+        """Soma ao tempo da etapa a duração do bloco."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.timings[name] = self.timings.get(name, 0.0) + elapsed
+    
+    def finish(self) -> Dict[str, float]:
+        """
+        Encerra a medição.
+        
+        Returns:
+            dict: Tempo (segundos) de cada etapa e o total ('total')
+        """
+        timings = dict(self.timings)
+        timings['total'] = time.perf_counter() - self._start
+        return timings
+
+
+def record_generation(lang: str, result: Dict[str, Any]):
+    """
+    Registra nas métricas do processo o resultado de uma geração.
+    
+    Args:
+        lang: Código do idioma
+        result: Resultado de AudioGenerator.generate_audio
+    """
+    timings = result.get('timings', {})
+    
+    if not result.get('success'):
+        GENERATIONS.inc(lang=lang, status="error")
+        return
+    
+    GENERATIONS.inc(lang=lang, status="success")
+    BYTES_SERVED.inc(result.get('size', 0))
+    
+    if result.get('from_cache'):
+        CACHE_REQUESTS.inc(result="hit")
+    elif result.get('base_from_cache'):
+        CACHE_REQUESTS.inc(result="base_hit")
+    else:
+        CACHE_REQUESTS.inc(result="miss")
+    
+    if 'total' in timings:
+        GENERATION_SECONDS.observe(timings['total'], lang=lang)
+    
+    for stage in STAGES:
+        if timings.get(stage):
+            STAGE_SECONDS.observe(timings[stage], stage=stage)
+
+
+def render_prometheus() -> str:
+    """Exporta as métricas do processo no formato de texto do Prometheus."""
+    return REGISTRY.render_prometheus()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Responde a qualquer GET com as métricas do processo."""
+    
+    def do_GET(self):
+        body = render_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        logger.debug(f"metrics: {format % args}")
+
+
+def start_http_server(port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """
+    Expõe as métricas em HTTP, em uma thread de fundo.
+    
+    Args:
+        port: Porta
+        host: Endereço de escuta
+    
+    Returns:
+        ThreadingHTTPServer: Servidor iniciado
+    """
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    thread = threading.Thread(target=server.serve_forever, name="voicify-metrics", daemon=True)
+    thread.start()
+    logger.info(f"Métricas disponíveis em http://{host}:{port}/metrics")
+    return server
@@ -0,0 +1,280 @@
+"""
+Utilitários para manipular fluxos MP3 em nível de frame, sem decodificar
+"""
+import logging
+from typing import Iterable, Iterator, NamedTuple, Optional, Tuple, BinaryIO
+
+logger = logging.getLogger(__name__)
+
+# Bitrates em kbps, indexados por [versão MPEG-1?][camada][índice]
+_BITRATES = {
+    (True, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (True, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (True, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (False, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (False, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (False, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+
+# Taxas de amostragem por versão (bits do cabeçalho: 3 = 1, 2 = 2, 0 = 2.5)
+_SAMPLE_RATES = {
+    3: (44100, 48000, 32000),
+    2: (22050, 24000, 16000),
+    0: (11025, 12000, 8000),
+}
+
+_VERSIONS = {3: '1', 2: '2', 0: '2.5'}
+
+ID3V2_HEADER_SIZE = 10
+ID3V1_SIZE = 128
+APE_FOOTER_SIZE = 32
+
+
+class FrameHeader(NamedTuple):
+    """Campos de um cabeçalho de frame MPEG de áudio."""
+    version: str
+    layer: int
+    bitrate: int
+    sample_rate: int
+    padding: int
+    protected: bool
+    channel_mode: int
+    frame_length: int
+    samples: int
+
+
+def parse_frame_header(data: bytes, offset: int = 0) -> Optional[FrameHeader]:
+    """
+    Interpreta o cabeçalho de frame na posição indicada.
+    
+    Args:
+        data: Dados MP3
+        offset: Posição do cabeçalho
+    
+    Returns:
+        FrameHeader: Cabeçalho ou None se não houver um frame válido
+    """
+    if offset + 4 > len(data):
+        return None
+    
+    b0, b1, b2, b3 = data[offset], data[offset + 1], data[offset + 2], data[offset + 3]
+    
+    if b0 != 0xFF or (b1 & 0xE0) != 0xE0:
+        return None
+    
+    version_bits = (b1 >> 3) & 0x03
+    layer_bits = (b1 >> 1) & 0x03
+    bitrate_index = b2 >> 4
+    sample_rate_index = (b2 >> 2) & 0x03
+    
+    if version_bits == 1 or layer_bits == 0 or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+    
+    mpeg1 = version_bits == 3
+    layer = 4 - layer_bits
+    bitrate = _BITRATES[(mpeg1, layer)][bitrate_index] * 1000
+    sample_rate = _SAMPLE_RATES[version_bits][sample_rate_index]
+    padding = (b2 >> 1) & 0x01
+    
+    if layer == 1:
+        frame_length = (12 * bitrate // sample_rate + padding) * 4
+        samples = 384
+    elif layer == 2:
+        frame_length = 144 * bitrate // sample_rate + padding
+        samples = 1152
+    else:
+        frame_length = (144 if mpeg1 else 72) * bitrate // sample_rate + padding
+        samples = 1152 if mpeg1 else 576
+    
+    return FrameHeader(
+        version=_VERSIONS[version_bits],
+        layer=layer,
+        bitrate=bitrate,
+        sample_rate=sample_rate,
+        padding=padding,
+        protected=not (b1 & 0x01),
+        channel_mode=b3 >> 6,
+        frame_length=frame_length,
+        samples=samples
+    )
+
+
+def _id3v2_size(data: bytes, offset: int) -> int:
+    """Tamanho total de uma tag ID3v2 na posição indicada (0 se não houver)."""
+    if data[offset:offset + 3] != b'ID3' or offset + ID3V2_HEADER_SIZE > len(data):
+        return 0
+    
+    flags = data[offset + 5]
+    size_bytes = data[offset + 6:offset + 10]
+    
+    # Tamanho "syncsafe": 7 bits úteis por byte
+    size = 0
+    for byte in size_bytes:
+        size = (size << 7) | (byte & 0x7F)
+    
+    footer = ID3V2_HEADER_SIZE if flags & 0x10 else 0
+    return ID3V2_HEADER_SIZE + size + footer
+
+
+def _audio_end(data: bytes) -> int:
+    """Posição final dos dados de áudio, descontando tags ID3v1/APE no fim."""
+    end = len(data)
+    
+    if end >= ID3V1_SIZE and data[end - ID3V1_SIZE:end - ID3V1_SIZE + 3] == b'TAG':
+        end -= ID3V1_SIZE
+    
+    if end >= APE_FOOTER_SIZE and data[end - APE_FOOTER_SIZE:end - APE_FOOTER_SIZE + 8] == b'APETAGEX':
+        footer = data[end - APE_FOOTER_SIZE:end]
+        tag_size = int.from_bytes(footer[12:16], 'little')
+        has_header = bool(int.from_bytes(footer[20:24], 'little') & 0x80000000)
+        end -= tag_size + (APE_FOOTER_SIZE if has_header else 0)
+    
+    return max(end, 0)
+
+
+def _is_info_frame(data: bytes, offset: int, header: FrameHeader) -> bool:
+    """Verifica se o frame é um cabeçalho Xing/Info/VBRI (metadados, sem áudio)."""
+    if header.layer != 3:
+        return False
+    
+    mono = header.channel_mode == 3
+    if header.version == '1':
+        side_info = 17 if mono else 32
+    else:
+        side_info = 9 if mono else 17
+    
+    xing_offset = offset + 4 + (2 if header.protected else 0) + side_info
+    if data[xing_offset:xing_offset + 4] in (b'Xing', b'Info'):
+        return True
+    
+    return data[offset + 36:offset + 40] == b'VBRI'
+
+
+def iter_frames(data: bytes) -> Iterator[Tuple[int, FrameHeader]]:
+    """
+    Percorre os frames de áudio de um fluxo MP3.
+    
+    Tags ID3v2 (em qualquer posição), ID3v1/APE no fim e frames
+    Xing/Info/VBRI são pulados. Bytes que não formam um frame válido são
+    ignorados até o próximo sincronismo.
+    
+    Args:
+        data: Dados MP3
+    
+    Yields:
+        tuple: (posição, cabeçalho) de cada frame de áudio
+    """
+    end = _audio_end(data)
+    offset = 0
+    first_frame = True
+    synced = False
+    
+    while offset + 4 <= end:
+        tag_size = _id3v2_size(data, offset)
+        if tag_size:
+            offset += tag_size
+            synced = False
+            continue
+        
+        header = parse_frame_header(data, offset)
+        if header is None or offset + header.frame_length > end:
+            offset += 1
+            synced = False
+            continue
+        
+        # Fora de sincronismo, só aceita o frame se o seguinte também for
+        # válido (evita falsos positivos dentro de dados quaisquer)
+        next_offset = offset + header.frame_length
+        if not synced and next_offset + 4 <= end \
+                and parse_frame_header(data, next_offset) is None \
+                and not _id3v2_size(data, next_offset):
+            offset += 1
+            continue
+        
+        if not (first_frame and _is_info_frame(data, offset, header)):
+            yield offset, header
+        
+        first_frame = False
+        synced = True
+        offset = next_offset
+
+
+def strip_tags(data: bytes) -> bytes:
+    """
+    Remove tags e frames de metadados, mantendo só os frames de áudio.
+    
+    Args:
+        data: Dados MP3
+    
+    Returns:
+        bytes: Frames de áudio concatenados
+    """
+    view = memoryview(data)
+    return b''.join(view[offset:offset + header.frame_length] for offset, header in iter_frames(data))
+
+
+def write_frames(data: bytes, fp: BinaryIO) -> int:
+    """
+    Escreve os frames de áudio de um fluxo MP3 em um arquivo.
+    
+    Args:
+        data: Dados MP3
+        fp: Arquivo binário aberto para escrita
+    
+    Returns:
+        int: Número de bytes escritos
+    """
+    frames = strip_tags(data)
+    fp.write(frames)
+    return len(frames)
+
+
+def concat_mp3(streams: Iterable[bytes]) -> bytes:
+    """
+    Concatena fluxos MP3 frame a frame, sem decodificar nem recodificar.
+    
+    Cada fluxo tem suas tags e cabeçalhos Xing/Info removidos, de modo
+    que o resultado é um único fluxo MP3 válido (CBR, sem tags).
+    
+    Args:
+        streams: Fluxos MP3, na ordem
+    
+    Returns:
+        bytes: Fluxo MP3 resultante
+    """
+    parts = []
+    reference = None
+    
+    for index, data in enumerate(streams):
+        frames = list(iter_frames(data))
+        
+        if not frames:
+            raise ValueError(f"Fluxo MP3 {index} não contém frames de áudio")
+        
+        header = frames[0][1]
+        if reference is None:
+            reference = header
+        elif (header.version, header.layer, header.sample_rate) != \
+                (reference.version, reference.layer, reference.sample_rate):
+            logger.warning(
+                f"Fluxo MP3 {index} tem formato diferente "
+                f"(MPEG-{header.version} L{header.layer} {header.sample_rate} Hz)"
+            )
+        
+        view = memoryview(data)
+        parts.extend(view[offset:offset + h.frame_length] for offset, h in frames)
+    
+    return b''.join(parts)
+
+
+def mp3_duration(data: bytes) -> float:
+    """
+    Calcula a duração de um fluxo MP3 somando os frames.
+    
+    Args:
+        data: Dados MP3
+    
+    Returns:
+        float: Duração em segundos
+    """
+    return sum(header.samples / header.sample_rate for _, header in iter_frames(data))
@@ -0,0 +1,309 @@
+"""
+Controle adaptativo da taxa de chamadas ao serviço de síntese
+"""
+import time
+import asyncio
+import logging
+import threading
+from contextlib import contextmanager, asynccontextmanager
+from typing import Optional
+
+import requests
+
+from config import VoicifyConfig
+from metrics import REGISTRY, Gauge
+
+logger = logging.getLogger(__name__)
+
+# Intervalo máximo entre verificações de quem espera na API assíncrona
+_ASYNC_POLL_INTERVAL = 0.05
+
+
+class UpstreamThrottledError(Exception):
+    """O serviço de síntese recusou a chamada por excesso de requisições."""
+    
+    def __init__(self, message: str = "Serviço de TTS sobrecarregado (HTTP 429)", retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class RateLimitTimeout(Exception):
+    """
+    Nenhuma vaga no limitador local dentro do tempo de espera.
+    
+    Não é um sinal do serviço (nenhuma requisição foi enviada), então não
+    reduz a janela nem é repetida.
+    """
+
+
+def is_congestion_error(error: BaseException) -> bool:
+    """
+    Verifica se um erro indica congestionamento do serviço (429 ou timeout).
+    
+    Args:
+        error: Exceção levantada pela síntese
+    
+    Returns:
+        bool: True se o erro deve reduzir a concorrência
+    """
+    return isinstance(error, (UpstreamThrottledError, TimeoutError, requests.exceptions.Timeout))
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Interpreta o cabeçalho Retry-After em segundos (None se ausente ou em data)."""
+    try:
+        return max(float(value), 0.0) if value else None
+    except ValueError:
+        return None
+
+
+class AdaptiveRateLimiter:
+    """
+    Limitador de taxa (token bucket) com janela de concorrência adaptativa.
+    
+    O token bucket limita as chamadas por segundo, com rajadas de até
+    `burst` chamadas. A janela limita quantas chamadas ficam em andamento
+    ao mesmo tempo e se ajusta como no AIMD: cresce aos poucos a cada
+    sucesso (+increase / janela) e é multiplicada por decrease_factor a cada
+    429 ou timeout, no máximo uma vez por cooldown. Um Retry-After recebido
+    pausa a emissão de tokens pelo tempo pedido.
+    """
+    
+    def __init__(
+        self,
+        rate: float = 8.0,
+        burst: int = 16,
+        initial_window: float = 4.0,
+        min_window: float = 1.0,
+        max_window: float = 16.0,
+        increase: float = 1.0,
+        decrease_factor: float = 0.5,
+        cooldown: float = 1.0,
+        max_wait: float = 60.0
+    ):
+        """
+        Inicializa o limitador.
+        
+        Args:
+            rate: Chamadas por segundo (0 = sem limite de taxa)
+            burst: Tamanho máximo de uma rajada (capacidade do bucket)
+            initial_window: Chamadas simultâneas no início
+            min_window: Menor janela de concorrência
+            max_window: Maior janela de concorrência
+            increase: Aumento aditivo da janela a cada janela de sucessos
+            decrease_factor: Fator multiplicativo aplicado em 429 ou timeout
+            cooldown: Intervalo mínimo entre duas reduções (segundos)
+            max_wait: Espera máxima padrão por uma vaga (segundos)
+        """
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.min_window = min_window
+        self.max_window = max_window
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.cooldown = cooldown
+        self.max_wait = max_wait
+        
+        self.window = min(max(initial_window, min_window), max_window)
+        self.in_flight = 0
+        self._tokens = float(self.burst)
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+        
+        self.throttled = 0
+        self.succeeded = 0
+    
+    def _refill(self, now: float):
+        """Repõe os tokens proporcionalmente ao tempo decorrido."""
+        if self.rate > 0:
+            self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+    
+    def _try_acquire(self, cost: float) -> float:
+        """
+        Tenta ocupar uma vaga (chamar com o lock adquirido).
+        
+        Returns:
+            float: 0 se conseguiu; senão, quanto tempo esperar (inf = até
+            uma vaga da janela ser liberada)
+        """
+        now = time.monotonic()
+        self._refill(now)
+        
+        if now < self._paused_until:
+            return self._paused_until - now
+        
+        if self.in_flight >= int(self.window):
+            return float("inf")
+        
+        if self.rate > 0:
+            cost = min(cost, self.burst)
+            if self._tokens < cost:
+                return (cost - self._tokens) / self.rate
+            self._tokens -= cost
+        
+        self.in_flight += 1
+        return 0.0
+    
+    def _timeout_error(self, timeout: float) -> RateLimitTimeout:
+        return RateLimitTimeout(
+            f"Limite de requisições ao serviço de TTS: nenhuma vaga em {timeout:g}s"
+        )
+    
+    def acquire(self, cost: float = 1.0, timeout: Optional[float] = None):
+        """
+        Espera por um token e por uma vaga na janela de concorrência.
+        
+        Args:
+            cost: Tokens consumidos (ex.: número de requisições HTTP)
+            timeout: Espera máxima (padrão: max_wait)
+        
+        Raises:
+            RateLimitTimeout: Se não houver vaga dentro do tempo limite
+        """
+        timeout = self.max_wait if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        
+        with self._condition:
+            while True:
+                wait = self._try_acquire(cost)
+                if wait == 0.0:
+                    return
+                
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise self._timeout_error(timeout)
+                self._condition.wait(min(wait, remaining))
+    
+    async def aacquire(self, cost: float = 1.0, timeout: Optional[float] = None):
+        """Versão assíncrona de acquire (não bloqueia o event loop)."""
+        timeout = self.max_wait if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        
+        while True:
+            with self._condition:
+                wait = self._try_acquire(cost)
+            if wait == 0.0:
+                return
+            
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise self._timeout_error(timeout)
+            await asyncio.sleep(min(wait, remaining, _ASYNC_POLL_INTERVAL))
+    
+    def release(self, error: Optional[BaseException] = None):
+        """
+        Libera a vaga e ajusta a janela conforme o resultado da chamada.
+        
+        Args:
+            error: Exceção da chamada (None = sucesso). Só 429 e timeouts
+                reduzem a janela; outros erros não a alteram.
+        """
+        with self._condition:
+            self.in_flight -= 1
+            
+            if error is None:
+                self.succeeded += 1
+                self.window = min(self.max_window, self.window + self.increase / self.window)
+            elif is_congestion_error(error):
+                self._on_congestion(error)
+            
+            self._condition.notify_all()
+    
+    def _on_congestion(self, error: BaseException):
+        """Reduz a janela (AIMD) e respeita o Retry-After (chamar com o lock)."""
+        now = time.monotonic()
+        self.throttled += 1
+        
+        retry_after = getattr(error, 'retry_after', None)
+        if retry_after:
+            self._paused_until = max(self._paused_until, now + retry_after)
+        
+        # Várias falhas da mesma rajada contam como um único sinal
+        if now - self._last_decrease >= self.cooldown:
+            self._last_decrease = now
+            self.window = max(self.min_window, self.window * self.decrease_factor)
+            logger.warning(f"Serviço de TTS congestionado ({type(error).__name__}); janela reduzida para {self.window:.1f}")
+    
+    @contextmanager
+    def slot(self, cost: float = 1.0, timeout: Optional[float] = None):
+        """
+        Ocupa uma vaga durante o bloco.
+        
+        Exemplo:
+            with limiter.slot():
+                audio = backend.synthesize(...)
+        """
+        self.acquire(cost, timeout)
+        try:
+            yield
+        except BaseException as e:
+            self.release(e)
+            raise
+        self.release()
+    
+    @asynccontextmanager
+    async def aslot(self, cost: float = 1.0, timeout: Optional[float] = None):
+        """Versão assíncrona de slot."""
+        await self.aacquire(cost, timeout)
+        try:
+            yield
+        except BaseException as e:
+            self.release(e)
+            raise
+        self.release()
+    
+    def stats(self) -> dict:
+        """
+        Estado atual do limitador.
+        
+        Returns:
+            dict: Janela, chamadas em andamento, tokens e contadores
+        """
+        with self._condition:
+            self._refill(time.monotonic())
+            return {
+                'window': self.window,
+                'in_flight': self.in_flight,
+                'tokens': self._tokens,
+                'succeeded': self.succeeded,
+                'throttled': self.throttled,
+            }
+
+
+_shared_limiter = None
+_shared_lock = threading.Lock()
+
+
+def get_rate_limiter() -> AdaptiveRateLimiter:
+    """
+    Retorna o limitador único do processo, configurado por VoicifyConfig.
+    
+    Todos os geradores do processo compartilham o limitador, então o
+    limite vale para a soma das sessões, lotes e chunks em andamento.
+    
+    Returns:
+        AdaptiveRateLimiter: Limitador compartilhado
+    """
+    global _shared_limiter
+    
+    with _shared_lock:
+        if _shared_limiter is None:
+            config = VoicifyConfig()
+            _shared_limiter = AdaptiveRateLimiter(
+                rate=config.RATE_LIMIT_PER_SECOND,
+                burst=config.RATE_LIMIT_BURST,
+                initial_window=config.RATE_LIMIT_INITIAL_CONCURRENCY,
+                min_window=config.RATE_LIMIT_MIN_CONCURRENCY,
+                max_window=config.RATE_LIMIT_MAX_CONCURRENCY,
+                max_wait=config.RATE_LIMIT_MAX_WAIT
+            )
+            REGISTRY.register(Gauge(
+                "voicify_rate_limit_window",
+                "Chamadas simultâneas permitidas pelo limitador adaptativo",
+                lambda: _shared_limiter.window
+            ))
+    
+    return _shared_limiter
@@ -0,0 +1,501 @@
+"""
+API HTTP de síntese (ASGI) para outros serviços usarem o Voicify
+
+Usa o mesmo gerador e o mesmo cache da interface: um áudio gerado pela
+API é acerto de cache no Streamlit e vice-versa.
+
+Endpoints:
+    POST /v1/synthesize   {"text", "language" | "lang" [+ "tld"], "speed", "quality"} -> audio/mpeg ou audio/ogg
+    POST /v1/batch        {"texts": [...], "language", "speed", "quality"} -> JSON com as chaves
+    POST /v1/stream       mesmo corpo de /v1/synthesize, só na qualidade padrão -> audio/mpeg em partes
+    GET  /v1/audio/{key}  áudio em cache (ETag, If-None-Match, Range e If-Range)
+    GET  /metrics         métricas no formato do Prometheus
+    GET  /health
+
+Uso:
+    uvicorn server:app --host 0.0.0.0 --port 8000
+    python server.py --port 8000
+"""
+import os
+import re
+import sys
+import json
+import asyncio
+import logging
+import argparse
+from typing import Any, Dict, List, Optional, Tuple
+
+from audio_generator import get_shared_generator
+from config import VoicifyConfig, LanguageConfig
+from metrics import CONTENT_TYPE, render_prometheus
+from utils import detect_audio_format, validate_text
+
+logger = logging.getLogger(__name__)
+
+AUDIO_CONTENT_TYPE = "audio/mpeg"
+
+# Tamanho máximo do corpo de uma requisição (bytes)
+MAX_BODY_BYTES = 1024 * 1024
+
+# Bytes lidos do arquivo por mensagem ao servir um áudio do cache
+READ_CHUNK_BYTES = 64 * 1024
+
+_AUDIO_PATH = re.compile(r"^/v1/audio/([0-9a-f]{32})$")
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class HTTPError(Exception):
+    """Erro que vira uma resposta JSON {'success': False, 'error': ...}."""
+    
+    def __init__(self, status: int, message: str, headers: Optional[List[Tuple[str, str]]] = None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or []
+
+
+def etag_for(cache_key: str) -> str:
+    """ETag de um áudio: a própria chave do cache, que identifica o conteúdo."""
+    return f'"{cache_key}"'
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """
+    Verifica um If-None-Match: '*' ou a ETag na lista.
+    
+    A comparação é a fraca (RFC 9110): W/"x" equivale a "x".
+    """
+    if not header:
+        return False
+    
+    tags = [tag.strip() for tag in header.split(',')]
+    return '*' in tags or any(tag.removeprefix('W/') == etag for tag in tags)
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Interpreta um cabeçalho Range de um único intervalo.
+    
+    Args:
+        header: Valor do cabeçalho (ex.: 'bytes=0-1023', 'bytes=-500')
+        size: Tamanho do arquivo
+    
+    Returns:
+        tuple: (início, fim inclusivo) ou None para enviar o arquivo inteiro
+        (sem Range, ou com vários intervalos)
+    
+    Raises:
+        HTTPError: 416 se o intervalo estiver fora do arquivo
+    """
+    if not header:
+        return None
+    
+    match = _RANGE.match(header.strip())
+    if not match:
+        return None
+    
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    
+    if not first:
+        # Sufixo: os últimos N bytes
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    
+    if start >= size or start > end:
+        raise HTTPError(416, "Intervalo fora do arquivo", [("content-range", f"bytes */{size}")])
+    
+    return start, end
+
+
+def resolve_language(body: Dict[str, Any]) -> Tuple[str, str]:
+    """
+    Obtém idioma e TLD do corpo: pelo rótulo ('language') ou pelo código ('lang').
+    
+    Returns:
+        tuple: (código do idioma, tld)
+    """
+    label = body.get('language')
+    if label is not None:
+        info = LanguageConfig.LANGUAGES.get(label)
+        if info is None:
+            raise HTTPError(400, f"Idioma desconhecido: {label!r}")
+        return info['code'], info['tld']
+    
+    lang = body.get('lang', 'pt')
+    variants = [info for info in LanguageConfig.LANGUAGES.values() if info['code'] == lang]
+    if not variants:
+        raise HTTPError(400, f"Idioma desconhecido: {lang!r}")
+    
+    return lang, body.get('tld') or variants[0]['tld']
+
+
+def parse_speed(body: Dict[str, Any]) -> float:
+    """Lê e valida a velocidade do corpo (padrão: DEFAULT_SPEED)."""
+    try:
+        speed = float(body.get('speed', VoicifyConfig.DEFAULT_SPEED))
+    except (TypeError, ValueError):
+        speed = None
+    
+    if speed is None or not VoicifyConfig.MIN_SPEED <= speed <= VoicifyConfig.MAX_SPEED:
+        raise HTTPError(400, f"Velocidade inválida: {body.get('speed')!r}")
+    
+    return speed
+
+
+def parse_quality(body: Dict[str, Any]) -> str:
+    """Lê e valida o perfil de saída do corpo (padrão: DEFAULT_QUALITY)."""
+    quality = body.get('quality', VoicifyConfig.DEFAULT_QUALITY)
+    if not isinstance(quality, str) or quality not in VoicifyConfig.OUTPUT_PROFILES:
+        raise HTTPError(400, f"Qualidade inválida: {quality!r} (use {', '.join(VoicifyConfig.OUTPUT_PROFILES)})")
+    
+    return quality
+
+
+def content_type_for(path: str) -> str:
+    """Tipo MIME de um áudio do cache, pelo conteúdo do arquivo."""
+    with open(path, 'rb') as f:
+        return VoicifyConfig.AUDIO_MIME_TYPES[detect_audio_format(f.read(4))]
+
+
+def parse_text(text: Any) -> str:
+    """Valida um texto do corpo da requisição."""
+    if not isinstance(text, str):
+        raise HTTPError(400, "O campo 'text' deve ser uma string")
+    
+    is_valid, message = validate_text(text, VoicifyConfig.MAX_TEXT_LENGTH)
+    if not is_valid:
+        raise HTTPError(400, message)
+    
+    return text
+
+
+def _generation_error(result: Dict[str, Any]) -> HTTPError:
+    """Converte uma geração com falha no erro HTTP correspondente."""
+    if result.get('throttled'):
+        return HTTPError(503, result['error'], [("retry-after", "1")])
+    if result.get('rate_limited'):
+        # Sem vaga no limitador local: o serviço não chegou a ser chamado
+        return HTTPError(504, result['error'])
+    return HTTPError(502, result['error'])
+
+
+class VoicifyAPI:
+    """
+    Aplicação ASGI da API de síntese.
+    
+    As gerações usam a API assíncrona do gerador compartilhado do
+    processo, então passam pelo mesmo cache, pelo mesmo limitador de taxa
+    e pela mesma coalescência de pedidos da interface, sem ocupar uma
+    thread por requisição.
+    """
+    
+    def __init__(self, generator=None):
+        """
+        Inicializa a aplicação.
+        
+        Args:
+            generator: AudioGenerator (padrão: o gerador compartilhado do
+                processo, criado na primeira requisição)
+        """
+        self._generator = generator
+    
+    @property
+    def generator(self):
+        if self._generator is None:
+            self._generator = get_shared_generator()
+        return self._generator
+    
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        
+        if scope['type'] != 'http':
+            return
+        
+        try:
+            await self._route(scope, receive, send)
+        except HTTPError as e:
+            await self._send_json(send, e.status, {'success': False, 'error': str(e)}, e.headers)
+        except Exception as e:
+            logger.error(f"Erro na API: {e}", exc_info=True)
+            await self._send_json(send, 500, {'success': False, 'error': "Erro interno"})
+    
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                self.generator
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.generator.aclose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+    
+    async def _route(self, scope, receive, send):
+        method, path = scope['method'], scope['path']
+        
+        audio_match = _AUDIO_PATH.match(path)
+        if audio_match:
+            self._allow(method, ('GET', 'HEAD'))
+            await self._serve_audio(scope, send, audio_match.group(1), head=method == 'HEAD')
+        elif path == '/v1/synthesize':
+            self._allow(method, ('POST',))
+            await self._synthesize(await self._read_json(receive), send)
+        elif path == '/v1/batch':
+            self._allow(method, ('POST',))
+            await self._batch(await self._read_json(receive), send)
+        elif path == '/v1/stream':
+            self._allow(method, ('POST',))
+            await self._stream(await self._read_json(receive), send)
+        elif path == '/metrics':
+            self._allow(method, ('GET',))
+            await self._send(send, 200, render_prometheus().encode('utf-8'), [("content-type", CONTENT_TYPE)])
+        elif path == '/health':
+            await self._send_json(send, 200, {'status': 'ok'})
+        else:
+            raise HTTPError(404, f"Rota não encontrada: {path}")
+    
+    @staticmethod
+    def _allow(method: str, allowed: Tuple[str, ...]):
+        if method not in allowed:
+            raise HTTPError(405, f"Método não permitido: {method}", [("allow", ", ".join(allowed))])
+    
+    async def _synthesize(self, body: Dict[str, Any], send):
+        """POST /v1/synthesize: gera (ou busca no cache) e devolve o áudio."""
+        text = parse_text(body.get('text'))
+        lang, tld = resolve_language(body)
+        speed = parse_speed(body)
+        quality = parse_quality(body)
+        
+        result = await self.generator.agenerate_audio(text, lang, speed, tld, quality=quality)
+        if not result['success']:
+            raise _generation_error(result)
+        
+        headers = [
+            ("content-type", result['mime']),
+            ("etag", etag_for(result['cache_key'])),
+            ("x-voicify-cache", "hit" if result['from_cache'] else "miss"),
+            ("x-voicify-generation-time", f"{result['timings']['total']:.3f}"),
+        ]
+        if self.generator.enable_cache:
+            headers.append(("content-location", f"/v1/audio/{result['cache_key']}"))
+        
+        await self._send(send, 200, result['audio_data'], headers)
+    
+    async def _batch(self, body: Dict[str, Any], send):
+        """POST /v1/batch: gera vários textos e devolve as chaves no cache."""
+        texts = body.get('texts')
+        if not isinstance(texts, list) or not texts:
+            raise HTTPError(400, "O campo 'texts' deve ser uma lista não vazia")
+        if len(texts) > VoicifyConfig.MAX_BATCH_SIZE:
+            raise HTTPError(413, f"Lote muito grande. Máximo: {VoicifyConfig.MAX_BATCH_SIZE} textos")
+        
+        texts = [parse_text(text) for text in texts]
+        lang, tld = resolve_language(body)
+        speed = parse_speed(body)
+        quality = parse_quality(body)
+        
+        results = await self.generator.agenerate_batch(
+            texts, lang, speed, tld, max_workers=VoicifyConfig.BATCH_MAX_WORKERS, quality=quality
+        )
+        items = []
+        
+        for result in results:
+            if result['success']:
+                items.append({
+                    'success': True,
+                    'cache_key': result['cache_key'],
+                    'url': f"/v1/audio/{result['cache_key']}" if self.generator.enable_cache else None,
+                    'size': result['size'],
+                    'format': result['format'],
+                    'from_cache': result['from_cache'],
+                })
+            else:
+                items.append({'success': False, 'error': result['error']})
+        
+        await self._send_json(send, 200, {
+            'success': all(item['success'] for item in items),
+            'results': items,
+            'total_time': results.total_time,
+        })
+    
+    async def _stream(self, body: Dict[str, Any], send):
+        """
+        POST /v1/stream: envia o áudio frase a frase (transferência em partes).
+        
+        Os pedaços são MP3 do render base concatenados, então só a
+        qualidade padrão é aceita; outros perfis usam /v1/synthesize.
+        """
+        text = parse_text(body.get('text'))
+        lang, tld = resolve_language(body)
+        speed = parse_speed(body)
+        if parse_quality(body) != VoicifyConfig.DEFAULT_QUALITY:
+            raise HTTPError(400, f"O streaming só está disponível na qualidade {VoicifyConfig.DEFAULT_QUALITY}")
+        
+        stream = self.generator.stream_audio(text, lang, speed, tld)
+        
+        # O primeiro pedaço sai antes dos cabeçalhos: uma falha logo no
+        # início ainda pode virar uma resposta de erro
+        try:
+            first = await asyncio.to_thread(next, stream, None)
+        except Exception as e:
+            raise HTTPError(502, str(e))
+        
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': self._encode_headers([("content-type", AUDIO_CONTENT_TYPE), ("x-accel-buffering", "no")]),
+        })
+        
+        try:
+            chunk = first
+            while chunk is not None:
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+                chunk = await asyncio.to_thread(next, stream, None)
+        except Exception as e:
+            # Cabeçalhos já enviados: só resta interromper a resposta
+            logger.error(f"Streaming interrompido: {e}")
+        finally:
+            await asyncio.to_thread(stream.close)
+        
+        await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+    
+    async def _serve_audio(self, scope, send, cache_key: str, head: bool = False):
+        """
+        GET /v1/audio/{key}: áudio do cache, com requisições condicionais e Range.
+        
+        If-None-Match usa a comparação fraca; If-Range, a forte, e só com
+        ETag (sem Last-Modified, uma data nunca confere e o arquivo vai
+        inteiro).
+        """
+        etag = etag_for(cache_key)
+        request_headers = self._request_headers(scope)
+        
+        path = None
+        if self.generator.enable_cache:
+            path = await asyncio.to_thread(self.generator.cache.get_path, cache_key)
+        
+        try:
+            size = os.path.getsize(path) if path else None
+            content_type = content_type_for(path) if path else None
+        except OSError:
+            size = None
+        if size is None:
+            raise HTTPError(404, "Áudio não encontrado no cache")
+        
+        headers = [
+            ("etag", etag),
+            ("accept-ranges", "bytes"),
+            ("cache-control", "public, max-age=86400"),
+            ("content-type", content_type),
+        ]
+        
+        # O conteúdo de uma chave não muda: ETag igual = cópia do cliente válida
+        if etag_matches(request_headers.get('if-none-match'), etag):
+            await self._send(send, 304, b'', headers[:3])
+            return
+        
+        # If-Range diferente da ETag atual: a cópia parcial do cliente é de
+        # outro conteúdo, então vai o arquivo inteiro
+        byte_range = None
+        if_range = request_headers.get('if-range')
+        if if_range is None or if_range.strip() == etag:
+            byte_range = parse_range(request_headers.get('range'), size)
+        status = 200
+        start, end = 0, size - 1
+        if byte_range is not None:
+            status = 206
+            start, end = byte_range
+            headers.append(("content-range", f"bytes {start}-{end}/{size}"))
+        
+        length = end - start + 1
+        headers.append(("content-length", str(length)))
+        await send({'type': 'http.response.start', 'status': status, 'headers': self._encode_headers(headers)})
+        
+        if head:
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+        
+        with open(path, 'rb') as f:
+            f.seek(start)
+            remaining = length
+            while remaining > 0:
+                data = await asyncio.to_thread(f.read, min(READ_CHUNK_BYTES, remaining))
+                if not data:
+                    break
+                remaining -= len(data)
+                await send({'type': 'http.response.body', 'body': data, 'more_body': True})
+        
+        # Sempre encerra a resposta, mesmo com arquivo vazio ou que encolheu
+        # durante o envio (despejado e regravado)
+        await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+    
+    @staticmethod
+    def _request_headers(scope) -> Dict[str, str]:
+        return {name.decode('latin-1').lower(): value.decode('latin-1') for name, value in scope['headers']}
+    
+    @staticmethod
+    async def _read_json(receive) -> Dict[str, Any]:
+        """Lê o corpo da requisição como um objeto JSON."""
+        body = bytearray()
+        
+        while True:
+            message = await receive()
+            body += message.get('body', b'')
+            if len(body) > MAX_BODY_BYTES:
+                raise HTTPError(413, "Corpo da requisição muito grande")
+            if not message.get('more_body'):
+                break
+        
+        try:
+            data = json.loads(body or b'{}')
+        except ValueError:
+            raise HTTPError(400, "Corpo da requisição não é um JSON válido")
+        
+        if not isinstance(data, dict):
+            raise HTTPError(400, "O corpo da requisição deve ser um objeto JSON")
+        
+        return data
+    
+    @staticmethod
+    def _encode_headers(headers: List[Tuple[str, str]]) -> List[Tuple[bytes, bytes]]:
+        return [(name.encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+    
+    async def _send(self, send, status: int, body: bytes, headers: List[Tuple[str, str]]):
+        headers = list(headers)
+        if status != 304:
+            headers.append(("content-length", str(len(body))))
+        await send({'type': 'http.response.start', 'status': status, 'headers': self._encode_headers(headers)})
+        await send({'type': 'http.response.body', 'body': body})
+    
+    async def _send_json(self, send, status: int, data: Dict[str, Any], headers: Optional[List[Tuple[str, str]]] = None):
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        await self._send(send, status, body, [("content-type", "application/json; charset=utf-8"), *(headers or [])])
+
+
+app = VoicifyAPI()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args(argv)
+    
+    try:
+        import uvicorn
+    except ImportError:
+        print("Instale um servidor ASGI para rodar a API: pip install uvicorn", file=sys.stderr)
+        return 1
+    
+    logging.basicConfig(level=logging.INFO)
+    uvicorn.run(app, host=args.host, port=args.port)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
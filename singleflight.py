@@ -0,0 +1,282 @@
+"""
+Coalescência de sínteses idênticas simultâneas (single-flight)
+"""
+import os
+import time
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows - só a coalescência entre threads
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class _LeaderAborted(Exception):
+    """O executor foi cancelado ou interrompido antes de produzir o resultado."""
+
+
+class SingleFlight:
+    """
+    Executa uma única vez as chamadas simultâneas com a mesma chave.
+    
+    Entre threads, o primeiro chamador de uma chave executa a função e os
+    demais esperam pelo seu resultado (ou exceção). Entre processos do
+    mesmo host, o executor também segura um lock de arquivo da chave; quem
+    obtém o lock depois de outro processo consulta antes o cache (função
+    recheck) e só sintetiza se o áudio ainda não estiver lá.
+    
+    Se o executor for cancelado, quem aguardava assume a chamada; nenhuma
+    espera (pelo lock de arquivo ou pelo resultado) passa de timeout.
+    """
+    
+    POLL_INTERVAL = 0.05  # Intervalo entre tentativas de obter o lock de arquivo (segundos)
+    
+    def __init__(self, lock_dir: Optional[str] = None, timeout: float = 300.0):
+        """
+        Inicializa o coordenador.
+        
+        Args:
+            lock_dir: Diretório dos locks de arquivo (None = só entre
+                threads do processo)
+            timeout: Espera máxima pelo resultado de outra chamada ou pelo
+                lock de arquivo (segundos); esgotado o lock, a chamada
+                segue sem ele
+        """
+        self.lock_dir = lock_dir if fcntl is not None else None
+        self.timeout = timeout
+        self._calls = {}
+        self._lock = threading.Lock()
+        
+        if self.lock_dir:
+            os.makedirs(self.lock_dir, exist_ok=True)
+    
+    def _join(self, key: str) -> Tuple[Future, bool]:
+        """Retorna a chamada em andamento da chave, criando-a se não houver."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                return call, False
+            call = self._calls[key] = Future()
+            return call, True
+    
+    def _finish(self, key: str):
+        with self._lock:
+            self._calls.pop(key, None)
+    
+    def _lock_path(self, key: str) -> str:
+        return os.path.join(self.lock_dir, f"{key}.lock")
+    
+    def _try_file_lock(self, key: str) -> Optional[int]:
+        """
+        Tenta obter, sem bloquear, o lock de arquivo exclusivo da chave.
+        
+        O arquivo é removido ao liberar o lock; se outro processo o
+        removeu nesse meio-tempo, o lock obtido é de um arquivo antigo
+        e a tentativa é refeita com o arquivo atual.
+        
+        Returns:
+            int: Descritor do arquivo de lock (None se outro processo o segura)
+        """
+        path = self._lock_path(key)
+        
+        while True:
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                if os.fstat(fd).st_ino == os.stat(path).st_ino:
+                    return fd
+            except BlockingIOError:
+                os.close(fd)
+                return None
+            except FileNotFoundError:
+                pass
+            except BaseException:
+                os.close(fd)
+                raise
+            os.close(fd)
+    
+    def _lock_expired(self, key: str, deadline: float) -> bool:
+        if time.monotonic() < deadline:
+            return False
+        logger.warning(f"Lock de arquivo ocupado por mais de {self.timeout:g}s, seguindo sem ele: {key}")
+        return True
+    
+    def _acquire_file_lock(self, key: str) -> Optional[int]:
+        """
+        Obtém o lock de arquivo exclusivo da chave, esperando até timeout.
+        
+        Returns:
+            int: Descritor do arquivo de lock (None sem locks de arquivo ou
+            se o prazo acabou)
+        """
+        if not self.lock_dir:
+            return None
+        
+        deadline = time.monotonic() + self.timeout
+        while True:
+            fd = self._try_file_lock(key)
+            if fd is not None or self._lock_expired(key, deadline):
+                return fd
+            time.sleep(self.POLL_INTERVAL)
+    
+    async def _aacquire_file_lock(self, key: str) -> Optional[int]:
+        """
+        Versão assíncrona de _acquire_file_lock.
+        
+        Cada tentativa é não bloqueante e roda no próprio loop: se a tarefa
+        for cancelada durante a espera, nenhum lock fica preso numa thread.
+        """
+        if not self.lock_dir:
+            return None
+        
+        deadline = time.monotonic() + self.timeout
+        while True:
+            fd = self._try_file_lock(key)
+            if fd is not None or self._lock_expired(key, deadline):
+                return fd
+            await asyncio.sleep(self.POLL_INTERVAL)
+    
+    def _release_file_lock(self, key: str, fd: Optional[int]):
+        """Remove o arquivo de lock e o libera."""
+        if fd is None:
+            return
+        
+        try:
+            os.unlink(self._lock_path(key))
+        except FileNotFoundError:
+            pass
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+    
+    @contextmanager
+    def _file_lock(self, key: str):
+        fd = self._acquire_file_lock(key)
+        try:
+            yield
+        finally:
+            self._release_file_lock(key, fd)
+    
+    def _settle_aborted(self, call: Future, error: BaseException):
+        """Repassa a falha do executor a quem aguarda a chamada."""
+        if isinstance(error, Exception):
+            call.set_exception(error)
+        else:
+            # Cancelamento ou interrupção do executor não é falha da
+            # chamada: quem aguarda tenta de novo
+            call.set_exception(_LeaderAborted(type(error).__name__))
+    
+    def _timed_out(self, key: str) -> TimeoutError:
+        return TimeoutError(f"Síntese em andamento não terminou em {self.timeout:g}s: {key}")
+    
+    def do(
+        self,
+        key: str,
+        fn: Callable[[], Any],
+        recheck: Optional[Callable[[], Any]] = None
+    ) -> Tuple[Any, bool]:
+        """
+        Executa fn, a menos que uma chamada com a mesma chave esteja em andamento.
+        
+        Args:
+            key: Chave da chamada (ex.: chave de cache)
+            fn: Função que produz o resultado
+            recheck: Consulta feita pelo executor antes de chamar fn (ex.:
+                o cache); um retorno diferente de None é usado no lugar de fn
+        
+        Returns:
+            tuple: (resultado, compartilhado); compartilhado é True quando
+            o resultado veio de outra chamada ou da consulta recheck
+        
+        Raises:
+            TimeoutError: A chamada em andamento não terminou em timeout
+        """
+        while True:
+            call, leader = self._join(key)
+            if leader:
+                break
+        
+            logger.info(f"Aguardando síntese em andamento: {key}")
+            try:
+                return call.result(timeout=self.timeout), True
+            except FutureTimeout:
+                raise self._timed_out(key) from None
+            except _LeaderAborted:
+                logger.info(f"Síntese em andamento interrompida, assumindo: {key}")
+        
+        try:
+            with self._file_lock(key):
+                value = recheck() if recheck else None
+                shared = value is not None
+                if not shared:
+                    value = fn()
+            call.set_result(value)
+            return value, shared
+        except BaseException as e:
+            self._settle_aborted(call, e)
+            raise
+        finally:
+            self._finish(key)
+    
+    async def ado(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[Any]],
+        recheck: Optional[Callable[[], Any]] = None
+    ) -> Tuple[Any, bool]:
+        """
+        Versão assíncrona de do.
+        
+        Coalesce também com chamadas síncronas da mesma chave. O lock de
+        arquivo é tentado sem bloquear e a função recheck roda em thread,
+        sem travar o loop.
+        
+        Args:
+            key: Chave da chamada
+            fn: Função assíncrona que produz o resultado
+            recheck: Consulta síncrona feita antes de chamar fn
+        
+        Returns:
+            tuple: (resultado, compartilhado)
+        
+        Raises:
+            TimeoutError: A chamada em andamento não terminou em timeout
+        """
+        while True:
+            call, leader = self._join(key)
+            if leader:
+                break
+        
+            logger.info(f"Aguardando síntese em andamento: {key}")
+            try:
+                # shield: cancelar quem aguarda não cancela a chamada compartilhada
+                value = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(call)), self.timeout)
+                return value, True
+            except asyncio.TimeoutError:
+                raise self._timed_out(key) from None
+            except _LeaderAborted:
+                logger.info(f"Síntese em andamento interrompida, assumindo: {key}")
+        
+        try:
+            fd = await self._aacquire_file_lock(key)
+            try:
+                value = await asyncio.to_thread(recheck) if recheck else None
+                shared = value is not None
+                if not shared:
+                    value = await fn()
+            finally:
+                self._release_file_lock(key, fd)
+            call.set_result(value)
+            return value, shared
+        except BaseException as e:
+            self._settle_aborted(call, e)
+            raise
+        finally:
+            self._finish(key)
@@ -0,0 +1,10 @@
+"""
+Configuração compartilhada dos testes
+
+Uso:
+    python -m pytest tests
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,329 @@
+"""
+Testes do gerador de áudio (audio_generator) com o backend local
+"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from audio_generator import AudioConversionError, AudioGenerator
+from config import VoicifyConfig
+from mp3_utils import concat_mp3
+from rate_limiter import AdaptiveRateLimiter
+from tts_backends import LocalBackend
+from utils import split_text_into_sentences
+
+
+@pytest.fixture
+def generator(tmp_path):
+    return AudioGenerator(
+        backend=LocalBackend(),
+        cache_dir=str(tmp_path / "cache"),
+        rate_limiter=AdaptiveRateLimiter(rate=0, initial_window=64, max_window=64)
+    )
+
+
+def test_encode_bitrate_never_exceeds_the_source(generator):
+    profiles = VoicifyConfig.OUTPUT_PROFILES
+    assert generator._encode_bitrate(profiles['Alta']) == VoicifyConfig.SOURCE_BITRATE
+    assert generator._encode_bitrate(profiles['Média']) == profiles['Média']['bitrate']
+    assert generator._encode_bitrate(profiles['Baixa']) == profiles['Baixa']['bitrate']
+
+
+def test_source_mp3_is_served_as_is_only_when_no_encoding_helps(generator):
+    assert not generator._needs_encoding(1.0, 'Alta')
+    assert generator._needs_encoding(1.5, 'Alta')
+    assert generator._needs_encoding(1.0, 'Média')
+    assert generator._needs_encoding(1.0, 'Baixa')
+
+
+def test_quality_profiles_have_their_own_cache_keys(generator):
+    keys = {generator._get_cache_key("olá", 'pt', 'com.br', 1.0, quality) for quality in VoicifyConfig.OUTPUT_PROFILES}
+    assert len(keys) == len(VoicifyConfig.OUTPUT_PROFILES)
+    assert generator._get_cache_key("olá", 'pt', 'com.br') == generator._get_cache_key("olá", 'pt', 'com.br', 1.0, 'Alta')
+
+
+class FailingBackend(LocalBackend):
+    """Backend local que sempre falha."""
+
+    def synthesize(self, text, lang, tld, timeout=None):
+        raise ConnectionError("serviço fora do ar")
+
+    async def asynthesize(self, text, lang, tld, timeout=None):
+        raise ConnectionError("serviço fora do ar")
+
+
+def test_async_generation_matches_the_sync_result(generator, tmp_path):
+    twin = AudioGenerator(
+        backend=LocalBackend(),
+        cache_dir=str(tmp_path / "twin"),
+        rate_limiter=AdaptiveRateLimiter(rate=0, initial_window=64, max_window=64)
+    )
+
+    sync = generator.generate_audio("Olá, mundo.", 'pt', 1.0, 'com.br')
+    result = asyncio.run(twin.agenerate_audio("Olá, mundo.", 'pt', 1.0, 'com.br'))
+
+    assert result['success'] and sync['success']
+    assert result['audio_data'] == sync['audio_data']
+    for field in ('cache_key', 'quality', 'format', 'mime', 'from_cache', 'chunks'):
+        assert result[field] == sync[field]
+
+    # A segunda chamada é acerto de cache nos dois caminhos
+    assert asyncio.run(twin.agenerate_audio("Olá, mundo.", 'pt', 1.0, 'com.br'))['from_cache']
+    assert generator.generate_audio("Olá, mundo.", 'pt', 1.0, 'com.br')['from_cache']
+
+
+def test_failures_have_the_same_shape_in_both_paths(tmp_path):
+    generator = AudioGenerator(
+        backend=FailingBackend(),
+        cache_dir=str(tmp_path / "cache"),
+        rate_limiter=AdaptiveRateLimiter(rate=0, initial_window=64, max_window=64)
+    )
+
+    sync = generator.generate_audio("Olá.", 'pt')
+    result = asyncio.run(generator.agenerate_audio("Olá.", 'pt'))
+
+    for failure in (sync, result):
+        assert failure['success'] is False
+        assert "fora do ar" in failure['error']
+        assert failure['throttled'] is False
+        assert 'total' in failure['timings']
+
+
+class SlowBackend(LocalBackend):
+    """Backend local em que textos começando com 'lento' demoram."""
+
+    def synthesize(self, text, lang, tld, timeout=None):
+        if text.startswith("lento"):
+            time.sleep(1.0)
+        return super().synthesize(text, lang, tld, timeout)
+
+
+def test_batch_keeps_input_order_and_times_out_items_independently(tmp_path):
+    generator = AudioGenerator(
+        backend=SlowBackend(),
+        cache_dir=str(tmp_path / "cache"),
+        rate_limiter=AdaptiveRateLimiter(rate=0, initial_window=64, max_window=64)
+    )
+    texts = ["Primeira frase.", "lento demais.", "Terceira frase."]
+
+    start = time.perf_counter()
+    results = generator.generate_batch(texts, 'pt', max_workers=3, item_timeout=0.3)
+
+    assert time.perf_counter() - start < 0.9
+    assert [result['index'] for result in results] == [0, 1, 2]
+    assert [result['success'] for result in results] == [True, False, True]
+    assert results[1]['timed_out']
+    assert results[0]['audio_data'] == generator.generate_audio(texts[0], 'pt')['audio_data']
+    assert results.critical_path_time >= 0.3
+
+
+def test_deadline_bounds_the_wait_for_a_rate_limiter_slot(tmp_path):
+    limiter = AdaptiveRateLimiter(rate=0, initial_window=1, max_window=1, max_wait=60)
+    generator = AudioGenerator(backend=LocalBackend(), cache_dir=str(tmp_path), rate_limiter=limiter)
+    limiter.acquire()  # a única vaga está ocupada
+
+    start = time.monotonic()
+    result = generator.generate_audio("Olá.", 'pt', deadline=start + 0.1)
+    assert time.monotonic() - start < 1.0
+    assert result['rate_limited']
+
+    expired = generator.generate_audio("Olá.", 'pt', deadline=time.monotonic() - 1)
+    assert expired['timed_out'] and not expired['throttled']
+
+
+def test_identical_concurrent_requests_synthesize_once(tmp_path):
+    backend = LocalBackend(latency=0.2)
+    generator = AudioGenerator(
+        backend=backend,
+        cache_dir=str(tmp_path / "cache"),
+        rate_limiter=AdaptiveRateLimiter(rate=0, initial_window=64, max_window=64)
+    )
+
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        results = list(executor.map(lambda _: generator.generate_audio("Mesma frase.", 'pt'), range(6)))
+
+    assert backend.calls == 1
+    assert len({result['audio_data'] for result in results}) == 1
+    assert sum(result.get('coalesced', False) or result['from_cache'] for result in results) == 5
+
+
+def long_text(count: int = 14, edited: int = None) -> str:
+    sentences = [f"Esta é a frase número {i} do texto longo." for i in range(count)]
+    if edited is not None:
+        sentences[edited] = "Esta frase foi editada pelo usuário."
+    return ' '.join(sentences)
+
+
+def test_long_text_is_synthesized_in_parallel_chunks(tmp_path):
+    backend = LocalBackend(latency=0.1)
+    generator = AudioGenerator(
+        backend=backend,
+        cache_dir=str(tmp_path / "cache"),
+        rate_limiter=AdaptiveRateLimiter(rate=0, initial_window=64, max_window=64)
+    )
+    text = long_text()
+    assert len(text) > VoicifyConfig.CHUNK_THRESHOLD
+
+    start = time.perf_counter()
+    result = generator.generate_audio(text, 'pt', max_workers=7)
+    elapsed = time.perf_counter() - start
+
+    assert result['success']
+    assert (result['chunks'], result['chunks_synthesized'], backend.calls) == (14, 14, 14)
+    assert elapsed < 14 * 0.1 / 2  # duas levas de 7, não 14 chamadas seguidas
+
+    # As partes são unidas na ordem do texto, frame a frame
+    sentences = split_text_into_sentences(text, VoicifyConfig.CHUNK_MAX_CHARS)
+    assert result['audio_data'] == concat_mp3(LocalBackend().render(s, 'pt', 'com') for s in sentences)
+
+
+def test_repeated_sentences_are_synthesized_once(generator):
+    text = ' '.join(["Uma frase que se repete no texto."] * 10 + ["E uma frase final diferente."] * 6)
+
+    result = generator.generate_audio(text, 'pt', chunked=True)
+    assert (result['chunks'], result['chunks_synthesized']) == (16, 2)
+    assert generator.backend.calls == 2
+
+
+def test_editing_one_sentence_resynthesizes_only_that_chunk(generator):
+    generator.generate_audio(long_text(), 'pt')
+    assert generator.backend.calls == 14
+
+    edited = generator.generate_audio(long_text(edited=5), 'pt')
+    assert edited['success'] and not edited['from_cache']
+    assert (edited['chunks'], edited['chunks_synthesized']) == (14, 1)
+    assert generator.backend.calls == 15
+
+
+def test_speed_variants_are_derived_from_the_cached_base(generator, monkeypatch):
+    base = generator.generate_audio("Olá, mundo.", 'pt')
+    conversions = []
+
+    def adjust_speed(audio_data, speed, timer=None, progress=None, quality=VoicifyConfig.DEFAULT_QUALITY):
+        conversions.append((audio_data, speed, quality))
+        return b'variante'
+
+    monkeypatch.setattr(generator, '_adjust_speed', adjust_speed)
+
+    fast = generator.generate_audio("Olá, mundo.", 'pt', speed=1.5)
+    assert fast['audio_data'] == b'variante' and fast['base_from_cache']
+    assert conversions == [(base['audio_data'], 1.5, 'Alta')]
+    assert generator.backend.calls == 1
+
+    # A variante fica no cache com a sua própria chave
+    again = generator.generate_audio("Olá, mundo.", 'pt', speed=1.5)
+    assert again['from_cache'] and again['audio_data'] == b'variante'
+    assert again['cache_key'] != base['cache_key']
+    assert len(conversions) == 1
+
+
+def test_failed_conversion_delivers_the_base_render(generator, monkeypatch):
+    def broken(*args, **kwargs):
+        raise AudioConversionError("ffmpeg ausente")
+
+    monkeypatch.setattr(generator, '_adjust_speed', broken)
+
+    result = generator.generate_audio("Olá, mundo.", 'pt', speed=0.75)
+    assert result['success']
+    assert result['conversion_error'] == "ffmpeg ausente"
+    assert result['cache_key'] == generator._get_cache_key("Olá, mundo.", 'pt', 'com')
+    assert result['audio_data'] == generator.generate_audio("Olá, mundo.", 'pt')['audio_data']
+
+    # Nada foi gravado na chave da variante
+    assert not generator.is_cached("Olá, mundo.", 'pt', 0.75, 'com')
+
+
+def test_stream_yields_sentences_in_order_before_the_end(tmp_path):
+    backend = LocalBackend(latency=0.05)
+    generator = AudioGenerator(
+        backend=backend,
+        cache_dir=str(tmp_path / "cache"),
+        rate_limiter=AdaptiveRateLimiter(rate=0, initial_window=64, max_window=64)
+    )
+    text = long_text()
+    stats = {}
+
+    parts = list(generator.stream_audio(text, 'pt', max_workers=2, stats=stats))
+
+    sentences = split_text_into_sentences(text, VoicifyConfig.CHUNK_MAX_CHARS)
+    assert parts == [LocalBackend().render(s, 'pt', 'com') for s in sentences]
+    assert stats['chunks'] == 14 and stats['size'] == sum(map(len, parts))
+    assert stats['time_to_first_audio'] < stats['total_time'] / 3
+
+    # Os chunks ficaram no cache: o texto completo sai sem novas chamadas
+    assert generator.generate_audio(text, 'pt')['chunks_synthesized'] == 0
+    assert backend.calls == 14
+
+
+def test_stream_of_a_cached_text_is_a_single_part(generator):
+    audio = generator.generate_audio("Olá, mundo.", 'pt')['audio_data']
+
+    assert list(generator.stream_audio("Olá, mundo.", 'pt')) == [audio]
+    assert generator.backend.calls == 1
+
+
+def test_abandoned_stream_does_not_render_the_rest(tmp_path):
+    backend = LocalBackend(latency=0.05)
+    generator = AudioGenerator(
+        backend=backend,
+        cache_dir=str(tmp_path / "cache"),
+        rate_limiter=AdaptiveRateLimiter(rate=0, initial_window=64, max_window=64)
+    )
+
+    stream = generator.stream_audio(long_text(40), 'pt', max_workers=2)
+    next(stream)
+    stream.close()
+    time.sleep(0.3)
+
+    assert backend.calls <= 2 * 2 + 2
+
+
+def test_backends_do_not_share_cache_entries(generator, tmp_path):
+    text = "O mesmo texto em dois backends."
+    generator.generate_audio(text, 'pt', tld='com.br')
+
+    other = AudioGenerator(
+        backend=LocalBackend(),
+        cache_dir=str(tmp_path / "cache"),
+        rate_limiter=AdaptiveRateLimiter(rate=0, initial_window=64, max_window=64)
+    )
+    other.backend.cache_namespace = "other:"
+
+    assert generator.is_cached(text, 'pt', tld='com.br')
+    assert not other.is_cached(text, 'pt', tld='com.br')
+    assert other.generate_audio(text, 'pt', tld='com.br')['from_cache'] is False
+
+
+def test_progress_follows_each_chunk_and_ends_done(generator):
+    events = []
+    result = generator.generate_audio(long_text(), 'pt', chunked=True, max_workers=4,
+                                      progress_callback=lambda value, stage: events.append((value, stage)))
+
+    values = [value for value, _ in events]
+    assert result['success']
+    assert values == sorted(values)
+    assert events[0] == (pytest.approx(0.05), 'cache_lookup')
+    synthesis = [value for value, stage in events if stage == 'synthesis' and value > 0.05]
+    assert len(synthesis) == result['chunks']  # Um evento por chunk pronto
+    assert 'cache_write' in [stage for _, stage in events]
+    assert events[-1] == (1.0, 'done')
+
+
+def test_progress_of_a_cache_hit_skips_synthesis(generator):
+    generator.generate_audio("Já está no cache.", 'pt')
+    events = []
+    generator.generate_audio("Já está no cache.", 'pt',
+                             progress_callback=lambda value, stage: events.append((value, stage)))
+
+    assert [stage for _, stage in events] == ['cache_lookup', 'done']
+
+
+def test_failing_progress_callback_does_not_break_generation(generator):
+    def callback(value, stage):
+        raise RuntimeError("barra de progresso fechada")
+
+    assert generator.generate_audio("Texto qualquer.", 'pt', progress_callback=callback)['success']
+    result = asyncio.run(generator.agenerate_audio("Outro texto.", 'pt', progress_callback=callback))
+    assert result['success']
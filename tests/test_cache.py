@@ -0,0 +1,168 @@
+"""
+Testes dos caches de áudio (cache)
+"""
+import os
+import itertools
+
+import pytest
+
+import cache as cache_module
+from cache import DiskCache, MemoryCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Relógio que avança 1 s a cada leitura, para ordenar os acessos."""
+    ticks = itertools.count(1000.0)
+    monkeypatch.setattr(cache_module.time, 'time', lambda: next(ticks))
+
+
+def key(name: str) -> str:
+    return name * 32
+
+
+def make_cache(tmp_path, max_bytes=300, policy='lru') -> DiskCache:
+    return DiskCache(str(tmp_path / "cache"), max_bytes, eviction_policy=policy, low_watermark=0.9)
+
+
+def test_put_get_and_contains(tmp_path):
+    disk = make_cache(tmp_path)
+    disk.put(key('a'), b'audio')
+
+    assert disk.contains(key('a'))
+    assert not disk.contains(key('b'))
+    assert disk.get(key('a')) == b'audio'
+    assert disk.get(key('b')) is None
+    assert disk.get_path(key('a')) == disk.path_for(key('a'))
+    assert disk.total_bytes() == 5
+
+
+def test_contains_does_not_count_as_access(tmp_path):
+    disk = make_cache(tmp_path)
+    disk.put(key('a'), b'audio')
+
+    disk.contains(key('a'))
+    assert disk.stats()['hits'] == 0
+
+    disk.get_path(key('a'))
+    assert disk.stats()['hits'] == 1
+
+
+def test_overwrite_updates_total_bytes(tmp_path):
+    disk = make_cache(tmp_path)
+    disk.put(key('a'), b'x' * 100)
+    disk.put(key('a'), b'x' * 40)
+
+    assert disk.total_bytes() == 40
+    assert disk.stats()['entries'] == 1
+
+
+def test_lru_evicts_least_recently_used_down_to_watermark(tmp_path, clock):
+    disk = make_cache(tmp_path)
+    for name in 'abc':
+        disk.put(key(name), b'x' * 100)
+    disk.get(key('a'))
+
+    # 400 bytes > 300: despeja até caber em 270 (b e c, os menos recentes)
+    disk.put(key('d'), b'x' * 100)
+
+    assert [disk.contains(key(name)) for name in 'abcd'] == [True, False, False, True]
+    assert disk.total_bytes() == 200
+    assert not os.path.exists(disk.path_for(key('b')))
+    assert os.path.exists(disk.path_for(key('a')))
+
+
+def test_lfu_evicts_least_frequently_used(tmp_path, clock):
+    disk = make_cache(tmp_path, policy='lfu')
+    for name in 'abc':
+        disk.put(key(name), b'x' * 100)
+    for _ in range(2):
+        disk.get(key('a'))
+    disk.get(key('c'))
+
+    disk.put(key('d'), b'x' * 100)
+
+    # b e d sem acertos; b é o menos recente
+    assert [disk.contains(key(name)) for name in 'abcd'] == [True, False, True, False]
+
+
+def test_evict_to_target_and_clear(tmp_path, clock):
+    disk = make_cache(tmp_path, max_bytes=1000)
+    for name in 'abc':
+        disk.put(key(name), b'x' * 100)
+
+    assert disk.evict(target_bytes=150) == 2
+    assert disk.contains(key('c'))
+
+    disk.clear()
+    assert disk.stats()['entries'] == 0
+    assert disk.total_bytes() == 0
+    assert not os.path.exists(disk.path_for(key('c')))
+
+
+def test_missing_file_is_dropped_from_index(tmp_path):
+    disk = make_cache(tmp_path)
+    disk.put(key('a'), b'audio')
+    os.remove(disk.path_for(key('a')))
+
+    assert disk.get(key('a')) is None
+    assert not disk.contains(key('a'))
+    assert disk.total_bytes() == 0
+
+
+def test_flat_files_are_migrated_into_the_index(tmp_path):
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    (cache_dir / f"{key('a')}.mp3").write_bytes(b'old')
+
+    disk = DiskCache(str(cache_dir), 300)
+
+    assert disk.get(key('a')) == b'old'
+    assert disk.total_bytes() == 3
+
+
+def test_index_is_shared_between_instances(tmp_path):
+    make_cache(tmp_path).put(key('a'), b'audio')
+    assert make_cache(tmp_path).get(key('a')) == b'audio'
+
+
+def test_rejects_unknown_policy(tmp_path):
+    with pytest.raises(ValueError):
+        make_cache(tmp_path, policy='fifo')
+
+
+def test_memory_cache_evicts_least_recently_used_by_bytes():
+    memory = MemoryCache(max_bytes=250)
+    memory.put('a', b'x' * 100)
+    memory.put('b', b'x' * 100)
+    memory.get('a')
+    memory.put('c', b'x' * 100)
+
+    assert memory.get('b') is None
+    assert memory.get('a') == b'x' * 100
+    assert memory.get('c') == b'x' * 100
+    assert memory.stats()['total_bytes'] == 200
+
+
+def test_memory_cache_overwrite_and_oversized_items():
+    memory = MemoryCache(max_bytes=250)
+    memory.put('a', b'x' * 100)
+    memory.put('a', b'x' * 10)
+    memory.put('big', b'x' * 251)
+
+    assert memory.get('big') is None
+    assert memory.stats()['total_bytes'] == 10
+
+    memory.delete('a')
+    assert memory.stats()['entries'] == 0
+    assert memory.stats()['total_bytes'] == 0
+
+
+def test_memory_cache_counts_hits_and_misses():
+    memory = MemoryCache(max_bytes=100)
+    memory.put('a', b'x')
+    memory.get('a')
+    memory.get('b')
+
+    stats = memory.stats()
+    assert (stats['hits'], stats['misses']) == (1, 1)
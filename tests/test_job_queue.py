@@ -0,0 +1,248 @@
+"""
+Testes da fila persistente de jobs (job_queue)
+"""
+import os
+import threading
+
+import pytest
+
+import job_queue as job_queue_module
+from audio_generator import AudioGenerator
+from job_queue import DONE, FAILED, QUEUED, RUNNING, JobQueue, JobWorker, start_purger
+from rate_limiter import AdaptiveRateLimiter
+from tts_backends import LocalBackend
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Relógio controlado pelo teste (avança só quando pedido)."""
+    current = {'value': 1000.0}
+    monkeypatch.setattr(job_queue_module.time, 'time', lambda: current['value'])
+
+    def advance(seconds: float = 1.0):
+        current['value'] += seconds
+
+    return advance
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return JobQueue(str(tmp_path / "jobs"), stale_timeout=60.0, max_attempts=2)
+
+
+def test_claim_takes_oldest_job_once(queue, clock):
+    first = queue.submit({'text': 'um'})
+    clock()
+    second = queue.submit({'text': 'dois'})
+
+    job = queue.claim('w1')
+    assert job['id'] == first
+    assert (job['status'], job['worker'], job['attempts']) == (RUNNING, 'w1', 1)
+    assert job['params'] == {'text': 'um'}
+
+    assert queue.claim('w2')['id'] == second
+    assert queue.claim('w3') is None
+
+
+def test_concurrent_claims_never_share_a_job(queue):
+    ids = {queue.submit({'text': str(i)}) for i in range(20)}
+    claimed = []
+
+    def work(name):
+        while True:
+            job = queue.claim(name)
+            if job is None:
+                return
+            claimed.append(job['id'])
+
+    threads = [threading.Thread(target=work, args=(f"w{i}",)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(claimed) == sorted(ids)
+
+
+def test_stale_job_is_requeued_then_failed_after_max_attempts(queue, clock):
+    job_id = queue.submit({'text': 'x'})
+    queue.claim('w1')
+
+    # Heartbeats mantêm o job com o worker
+    clock(50)
+    queue.heartbeat(job_id, 0.5, 'synthesis')
+    clock(50)
+    assert queue.claim('w2') is None
+    assert queue.get(job_id)['progress'] == 0.5
+
+    # Sem sinal de vida, volta à fila e é reservado de novo
+    clock(61)
+    job = queue.claim('w2')
+    assert (job['id'], job['attempts']) == (job_id, 2)
+
+    # Esgotadas as tentativas, o job falha em vez de voltar à fila
+    clock(61)
+    assert queue.claim('w3') is None
+    job = queue.get(job_id)
+    assert job['status'] == FAILED
+    assert job['error']
+
+
+def test_complete_and_fail_only_apply_to_the_current_worker(queue, clock):
+    job_id = queue.submit({'text': 'x'})
+    queue.claim('w1')
+    clock(61)
+    queue.claim('w2')
+
+    # w1 foi dado como parado: o resultado atrasado é descartado
+    assert not queue.complete(job_id, 'w1', b'old', {'size': 3})
+    assert not queue.fail(job_id, 'w1', 'erro')
+    assert queue.get(job_id)['status'] == RUNNING
+    assert queue.read_audio(job_id) is None
+
+    assert queue.complete(job_id, 'w2', b'audio', {'size': 5})
+    job = queue.get(job_id)
+    assert (job['status'], job['progress'], job['result']) == (DONE, 1, {'size': 5})
+    assert queue.read_audio(job_id) == b'audio'
+
+    # Um job finalizado não muda mais
+    assert not queue.fail(job_id, 'w2', 'erro')
+
+
+def test_complete_links_source_file_and_survives_its_removal(queue, tmp_path):
+    source = tmp_path / "cached.mp3"
+    source.write_bytes(b'audio')
+    job_id = queue.submit({'text': 'x'})
+    queue.claim('w1')
+
+    assert queue.complete(job_id, 'w1', b'audio', {'cache_key': 'abc'}, str(source))
+    assert os.path.samefile(queue.result_path(job_id), source)
+
+    # Despejo do cache: o áudio do job continua disponível
+    source.unlink()
+    assert queue.read_audio(job_id) == b'audio'
+    assert queue.get(job_id)['result'] == {'cache_key': 'abc'}
+
+
+def test_complete_writes_audio_when_source_is_gone(queue, tmp_path):
+    job_id = queue.submit({'text': 'x'})
+    queue.claim('w1')
+
+    assert queue.complete(job_id, 'w1', b'audio', {}, str(tmp_path / "evicted.mp3"))
+    assert queue.read_audio(job_id) == b'audio'
+
+
+def test_late_worker_never_replaces_the_published_audio(queue, clock):
+    job_id = queue.submit({'text': 'x'})
+    queue.claim('w1')
+    clock(61)
+    queue.claim('w2')
+    assert queue.complete(job_id, 'w2', b'audio', {})
+
+    assert not queue.complete(job_id, 'w1', b'old', {})
+    assert queue.read_audio(job_id) == b'audio'
+    assert os.listdir(queue.results_dir) == [f"{job_id}.mp3"]
+
+
+def test_result_file_uses_the_job_format(queue, clock):
+    job_id = queue.submit({'text': 'x'})
+    queue.claim('w1')
+
+    assert queue.complete(job_id, 'w1', b'OggS', {'format': 'ogg'})
+    assert os.path.exists(queue.result_path(job_id, 'ogg'))
+    assert queue.read_audio(job_id, 'ogg') == b'OggS'
+    assert queue.read_audio(job_id) is None
+
+    clock(100)
+    assert queue.purge(older_than=50) == 1
+    assert os.listdir(queue.results_dir) == []
+
+
+def test_purge_removes_old_finished_jobs(queue, clock):
+    done = queue.submit({'text': 'a'})
+    queue.claim('w1')
+    queue.complete(done, 'w1', b'audio', {})
+    pending = queue.submit({'text': 'b'})
+
+    clock(100)
+    assert queue.purge(older_than=200) == 0
+    assert queue.purge(older_than=50) == 1
+
+    assert queue.get(done) is None
+    assert queue.read_audio(done) is None
+    assert queue.get(pending)['status'] == QUEUED
+    assert queue.counts() == {QUEUED: 1}
+
+
+def test_purger_runs_on_a_schedule_until_stopped(queue):
+    purged = []
+    ran = threading.Semaphore(0)
+
+    def on_purge(q):
+        purged.append(q)
+        ran.release()
+
+    done = queue.submit({'text': 'a'})
+    queue.claim('w1')
+    queue.complete(done, 'w1', b'audio', {})
+
+    stop = start_purger(queue, retention=0, interval=0.01, on_purge=on_purge)
+    try:
+        for _ in range(3):
+            assert ran.acquire(timeout=5)
+    finally:
+        stop.set()
+
+    assert queue.get(done) is None
+    assert purged[0] is queue
+
+
+class FakeGenerator:
+    enable_cache = False
+
+    def __init__(self, result):
+        self.result = result
+
+    def generate_audio(self, text, lang, speed, tld, progress_callback=None, quality=None):
+        progress_callback(0.5, 'synthesis')
+        return dict(self.result)
+
+
+def test_worker_records_success_and_failure(queue):
+    worker = JobWorker(queue, FakeGenerator({'success': True, 'audio_data': b'audio', 'size': 5, 'cache_key': 'k'}), name='w1')
+    job_id = queue.submit({'text': 'x'})
+    worker.process(queue.claim(worker.name))
+
+    job = queue.get(job_id)
+    assert job['status'] == DONE
+    assert job['result'] == {'size': 5, 'cache_key': 'k'}
+    assert queue.read_audio(job_id) == b'audio'
+
+    worker.generator = FakeGenerator({'success': False, 'error': 'falhou'})
+    job_id = queue.submit({'text': 'y'})
+    worker.process(queue.claim(worker.name))
+
+    job = queue.get(job_id)
+    assert (job['status'], job['error']) == (FAILED, 'falhou')
+
+
+def test_worker_result_is_the_cached_file_not_a_copy(queue, tmp_path, clock):
+    generator = AudioGenerator(
+        backend=LocalBackend(),
+        cache_dir=str(tmp_path / "cache"),
+        rate_limiter=AdaptiveRateLimiter(rate=0, initial_window=64, max_window=64)
+    )
+    worker = JobWorker(queue, generator, name='w1')
+    job_id = queue.submit({'text': "Um áudio guardado uma vez só.", 'lang': 'pt'})
+    worker.process(queue.claim(worker.name))
+
+    job = queue.get(job_id)
+    cache_path = generator.cache.path_for(job['result']['cache_key'])
+    assert 'audio_data' not in job['result']
+    assert os.path.samefile(queue.result_path(job_id), cache_path)
+    assert os.stat(cache_path).st_nlink == 2
+
+    # A retenção do job acaba: o cache continua com o áudio
+    clock(100)
+    assert queue.purge(older_than=50) == 1
+    assert os.path.exists(cache_path) and os.stat(cache_path).st_nlink == 1
@@ -0,0 +1,142 @@
+"""
+Testes da narração de documentos longos (long_document)
+"""
+import functools
+import os
+import tracemalloc
+
+import pytest
+
+import long_document
+from audio_generator import AudioGenerator
+from config import VoicifyConfig
+from long_document import checkpoint_path, render_document
+from mp3_utils import mp3_duration
+from rate_limiter import AdaptiveRateLimiter
+from text_segmenter import iter_file
+from tts_backends import LocalBackend
+
+
+class FlakyBackend(LocalBackend):
+    """Backend local que falha a partir de uma chamada."""
+
+    def __init__(self, fail_after=None, **options):
+        super().__init__(**options)
+        self.fail_after = fail_after
+
+    def synthesize(self, text, lang, tld, timeout=None):
+        if self.fail_after is not None and self.calls >= self.fail_after:
+            raise RuntimeError("serviço indisponível")
+        return super().synthesize(text, lang, tld, timeout)
+
+
+def make_generator(tmp_path, backend):
+    # Sem cache, cada frase chega ao backend e as chamadas podem ser contadas
+    return AudioGenerator(
+        enable_cache=False,
+        backend=backend,
+        cache_dir=str(tmp_path / "cache"),
+        rate_limiter=AdaptiveRateLimiter(rate=0, initial_window=64, max_window=64)
+    )
+
+
+def write_document(path, count):
+    path.write_text(' '.join(f"Frase {i} do capitulo." for i in range(count)), encoding='utf-8')
+    return str(path)
+
+
+@pytest.fixture
+def document(tmp_path):
+    return write_document(tmp_path / "capitulo.txt", 600)
+
+
+def expected_audio(count):
+    backend = LocalBackend()
+    return b''.join(backend.render(f"Frase {i} do capitulo.", 'pt', 'com') for i in range(count))
+
+
+def test_document_beyond_the_text_limit_is_narrated_in_order(document, tmp_path):
+    output = str(tmp_path / "capitulo.mp3")
+    events = []
+
+    result = render_document(document, output, 'pt', generator=make_generator(tmp_path, LocalBackend()),
+                             max_workers=4, progress_callback=lambda value, stage: events.append((value, stage)))
+
+    assert os.path.getsize(document) > VoicifyConfig.MAX_TEXT_LENGTH
+    assert (result['success'], result['segments'], result['resumed_from']) == (True, 600, 0)
+    with open(output, 'rb') as f:
+        audio = f.read()
+    assert audio == expected_audio(600)
+    assert result['size'] == len(audio)
+    assert result['duration'] == pytest.approx(mp3_duration(audio))
+    assert not os.path.exists(checkpoint_path(output))
+
+    values = [value for value, _ in events]
+    assert values == sorted(values)
+    assert events[-1] == (1.0, 'done')
+
+
+def test_failed_run_resumes_from_the_checkpoint(document, tmp_path):
+    output = str(tmp_path / "capitulo.mp3")
+
+    failed = render_document(document, output, 'pt', generator=make_generator(tmp_path, FlakyBackend(fail_after=450)),
+                             max_workers=2)
+    assert not failed['success']
+    assert 0 < failed['segments'] <= 450
+    assert os.path.exists(checkpoint_path(output))
+
+    backend = LocalBackend()
+    result = render_document(document, output, 'pt', generator=make_generator(tmp_path, backend), max_workers=2)
+
+    assert result['success']
+    assert result['resumed_from'] == failed['segments']
+    assert backend.calls == 600 - failed['segments']
+    with open(output, 'rb') as f:
+        assert f.read() == expected_audio(600)
+
+
+@pytest.mark.parametrize('change', ['truncated_output', 'edited_input'])
+def test_stale_checkpoint_starts_over(document, tmp_path, change):
+    output = str(tmp_path / "capitulo.mp3")
+    render_document(document, output, 'pt', generator=make_generator(tmp_path, FlakyBackend(fail_after=300)),
+                    max_workers=2)
+
+    if change == 'truncated_output':
+        with open(output, 'r+b') as f:
+            f.truncate(10)
+    else:
+        write_document(tmp_path / "capitulo.txt", 601)
+
+    backend = LocalBackend()
+    result = render_document(document, output, 'pt', generator=make_generator(tmp_path, backend), max_workers=2)
+
+    assert result['resumed_from'] == 0
+    assert backend.calls == result['segments']
+
+
+def test_empty_document_fails(tmp_path):
+    document = tmp_path / "vazio.txt"
+    document.write_text("  \n", encoding='utf-8')
+
+    result = render_document(str(document), str(tmp_path / "vazio.mp3"), 'pt',
+                             generator=make_generator(tmp_path, LocalBackend()))
+    assert not result['success']
+    assert result['segments'] == 0
+
+
+def test_audio_goes_to_disk_without_accumulating_in_memory(tmp_path, monkeypatch):
+    # Blocos pequenos: o texto também passa por vários blocos de leitura
+    monkeypatch.setattr(long_document, 'iter_file', functools.partial(iter_file, block_size=1024))
+    document = write_document(tmp_path / "capitulo.txt", 400)
+    generator = make_generator(tmp_path, LocalBackend())
+
+    tracemalloc.start()
+    try:
+        result = render_document(document, str(tmp_path / "capitulo.mp3"), 'pt', generator=generator, max_workers=4)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    assert result['segments'] == 400
+    assert result['size'] > 2_000_000
+    assert peak < result['size'] / 5
@@ -0,0 +1,144 @@
+"""
+Testes das métricas do processo (metrics) e dos tempos por etapa
+"""
+import time
+import urllib.request
+
+import pytest
+
+import metrics
+from audio_generator import AudioGenerator
+from metrics import Counter, Histogram, StageTimer, STAGES
+from rate_limiter import AdaptiveRateLimiter
+from tts_backends import LocalBackend
+
+
+class FailingBackend(LocalBackend):
+    name = "failing"
+
+    def synthesize(self, text, lang, tld, timeout=None):
+        raise RuntimeError("serviço indisponível")
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    metrics.REGISTRY.reset()
+    yield
+    metrics.REGISTRY.reset()
+
+
+def make_generator(tmp_path, backend=None):
+    return AudioGenerator(
+        backend=backend or LocalBackend(),
+        cache_dir=str(tmp_path / "cache"),
+        rate_limiter=AdaptiveRateLimiter(rate=0, initial_window=64, max_window=64)
+    )
+
+
+def test_counter_renders_labelled_series():
+    counter = Counter("test_total", "Teste", ("lang",))
+    counter.inc(lang="pt")
+    counter.inc(2, lang='e"n')
+
+    assert counter.value(lang="pt") == 1
+    assert counter.total() == 3
+    assert list(counter.collect()) == ['test_total{lang="e\\"n"} 2', 'test_total{lang="pt"} 1']
+
+
+def test_histogram_buckets_are_cumulative_and_quantiles_interpolate():
+    histogram = Histogram("test_seconds", "Teste", buckets=(1.0, 2.0))
+    for value in (0.5, 1.5, 1.5, 5.0):
+        histogram.observe(value)
+
+    assert list(histogram.collect()) == [
+        'test_seconds_bucket{le="1"} 1',
+        'test_seconds_bucket{le="2"} 3',
+        'test_seconds_bucket{le="+Inf"} 4',
+        'test_seconds_sum 8.5',
+        'test_seconds_count 4',
+    ]
+    assert histogram.quantile(0.5) == pytest.approx(1.5)
+    assert histogram.quantile(1.0) == 2.0
+
+
+def test_histogram_series_are_kept_per_label():
+    histogram = Histogram("test_seconds", "Teste", ("lang",))
+    histogram.observe(0.2, lang="pt")
+
+    assert histogram.count(lang="pt") == 1
+    assert histogram.count(lang="en") == 0
+    assert histogram.quantile(0.5, lang="en") is None
+
+
+def test_stage_timer_adds_up_repeated_stages():
+    timer = StageTimer()
+    for _ in range(2):
+        with timer.stage('synthesis'):
+            time.sleep(0.02)
+
+    timings = timer.finish()
+    assert set(timings) == set(STAGES) | {'total'}
+    assert timings['synthesis'] >= 0.04
+    assert timings['total'] >= timings['synthesis']
+    assert timings['cache_write'] == 0.0
+
+
+def test_results_carry_a_timing_for_every_stage(tmp_path):
+    generator = make_generator(tmp_path)
+
+    cold = generator.generate_audio("Tempos de cada etapa.", 'pt')
+    warm = generator.generate_audio("Tempos de cada etapa.", 'pt')
+
+    for result in (cold, warm):
+        assert set(result['timings']) == set(STAGES) | {'total'}
+    assert cold['timings']['synthesis'] > 0
+    assert cold['timings']['cache_write'] > 0
+    assert warm['timings']['synthesis'] == 0.0
+    assert warm['timings']['cache_lookup'] > 0
+
+
+def test_generations_update_the_process_metrics(tmp_path):
+    generator = make_generator(tmp_path)
+
+    first = generator.generate_audio("Métricas do processo.", 'pt')
+    generator.generate_audio("Métricas do processo.", 'pt')
+    generator.generate_audio("Process metrics.", 'en')
+
+    assert metrics.GENERATIONS.value(lang="pt", status="success") == 2
+    assert metrics.CACHE_REQUESTS.value(result="hit") == 1
+    assert metrics.CACHE_REQUESTS.value(result="miss") == 2
+    assert metrics.cache_hit_ratio() == pytest.approx(1 / 3)
+    assert metrics.BYTES_SERVED.total() >= 2 * first['size']
+    assert metrics.GENERATION_SECONDS.count(lang="pt") == 2
+    assert metrics.GENERATION_SECONDS.quantile(0.95, lang="en") is not None
+    assert metrics.UPSTREAM_REQUESTS.value(backend="local") == 2
+
+
+def test_upstream_failures_count_towards_the_error_rate(tmp_path):
+    generator = make_generator(tmp_path, FailingBackend())
+
+    result = generator.generate_audio("Falha no serviço.", 'pt')
+
+    assert not result['success']
+    assert metrics.GENERATIONS.value(lang="pt", status="error") == 1
+    assert metrics.UPSTREAM_ERRORS.value(backend="failing") == 1
+    assert metrics.upstream_error_rate() == 1.0
+
+
+def test_metrics_are_served_in_prometheus_text_format(tmp_path):
+    make_generator(tmp_path).generate_audio("Exposição HTTP.", 'pt')
+    server = metrics.start_http_server(0, host="127.0.0.1")
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url) as response:
+            content_type = response.headers['Content-Type']
+            body = response.read().decode('utf-8')
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert content_type == metrics.CONTENT_TYPE
+    assert "# TYPE voicify_generation_seconds histogram" in body
+    assert 'voicify_generations_total{lang="pt",status="success"} 1' in body
+    assert 'voicify_stage_seconds_count{stage="synthesis"} 1' in body
+    assert "voicify_cache_hit_ratio 0" in body
@@ -0,0 +1,86 @@
+"""
+Testes da manipulação de MP3 em nível de frame (mp3_utils)
+"""
+import io
+
+import pytest
+
+from mp3_utils import concat_mp3, iter_frames, mp3_duration, parse_frame_header, strip_tags, write_frames
+
+# Cabeçalho de frame no formato do gTTS: MPEG-2 camada III, 32 kbps, 24 kHz, mono
+HEADER = bytes([0xFF, 0xF3, 0x44, 0xC0])
+FRAME_LENGTH = 72 * 32000 // 24000
+FRAME_SECONDS = 576 / 24000
+
+
+def frame(fill: int = 0) -> bytes:
+    return HEADER + bytes([fill]) * (FRAME_LENGTH - len(HEADER))
+
+
+def info_frame() -> bytes:
+    # Xing/Info logo após o side info (9 bytes em MPEG-2 mono)
+    data = bytearray(frame())
+    data[13:17] = b'Info'
+    return bytes(data)
+
+
+def id3v2(payload: bytes = b'x' * 20) -> bytes:
+    size = len(payload)
+    syncsafe = bytes([(size >> 21) & 0x7F, (size >> 14) & 0x7F, (size >> 7) & 0x7F, size & 0x7F])
+    return b'ID3\x04\x00\x00' + syncsafe + payload
+
+
+def id3v1() -> bytes:
+    return b'TAG' + b'\x00' * 125
+
+
+def stream(frames: int, fill: int = 0) -> bytes:
+    return id3v2() + info_frame() + frame(fill) * frames + id3v1()
+
+
+def test_parse_frame_header():
+    header = parse_frame_header(frame())
+    assert header.version == '2'
+    assert header.layer == 3
+    assert header.bitrate == 32000
+    assert header.sample_rate == 24000
+    assert header.channel_mode == 3
+    assert header.frame_length == FRAME_LENGTH
+    assert header.samples == 576
+
+
+def test_parse_frame_header_rejects_invalid_data():
+    assert parse_frame_header(b'\x00' * 4) is None
+    assert parse_frame_header(HEADER[:3]) is None
+    # Índice de bitrate reservado (15)
+    assert parse_frame_header(bytes([0xFF, 0xF3, 0xF4, 0xC0])) is None
+
+
+def test_iter_frames_skips_tags_info_frame_and_garbage():
+    data = id3v2() + info_frame() + frame(1) + b'\x00\xFF\x12' + frame(2) + id3v1()
+    offsets = [offset for offset, _ in iter_frames(data)]
+    assert [data[offset + 4] for offset in offsets] == [1, 2]
+
+
+def test_strip_tags_keeps_only_audio_frames():
+    assert strip_tags(stream(3, fill=7)) == frame(7) * 3
+
+    out = io.BytesIO()
+    assert write_frames(stream(2), out) == 2 * FRAME_LENGTH
+    assert out.getvalue() == frame() * 2
+
+
+def test_concat_mp3_joins_frames_without_tags():
+    joined = concat_mp3([stream(2, fill=1), stream(3, fill=2)])
+    assert joined == frame(1) * 2 + frame(2) * 3
+    assert mp3_duration(joined) == pytest.approx(5 * FRAME_SECONDS)
+
+
+def test_concat_mp3_rejects_stream_without_frames():
+    with pytest.raises(ValueError):
+        concat_mp3([stream(1), id3v2()])
+
+
+def test_mp3_duration_ignores_metadata():
+    assert mp3_duration(stream(10)) == pytest.approx(10 * FRAME_SECONDS)
+    assert mp3_duration(b'') == 0
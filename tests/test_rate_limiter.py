@@ -0,0 +1,112 @@
+"""
+Testes do limitador de taxa adaptativo (rate_limiter)
+"""
+import asyncio
+import time
+
+import pytest
+
+from audio_generator import AudioGenerator
+from rate_limiter import AdaptiveRateLimiter, RateLimitTimeout, UpstreamThrottledError, is_congestion_error
+from tts_backends import LocalBackend
+
+
+def test_window_grows_additively_on_success():
+    limiter = AdaptiveRateLimiter(rate=0, initial_window=2, max_window=3)
+
+    for _ in range(2):
+        with limiter.slot():
+            pass
+    assert limiter.window == pytest.approx(2.0 + 1 / 2 + 1 / 2.5)
+
+    for _ in range(20):
+        with limiter.slot():
+            pass
+    assert limiter.window == 3
+    assert limiter.stats()['succeeded'] == 22
+
+
+def test_congestion_halves_the_window_once_per_cooldown():
+    limiter = AdaptiveRateLimiter(rate=0, initial_window=8, min_window=1, cooldown=60)
+
+    for _ in range(3):
+        with pytest.raises(UpstreamThrottledError):
+            with limiter.slot():
+                raise UpstreamThrottledError()
+
+    # Uma rajada de recusas conta como um único sinal
+    assert limiter.window == 4
+    assert limiter.stats()['throttled'] == 3
+    assert limiter.in_flight == 0
+
+
+def test_timeouts_reduce_the_window_but_other_errors_do_not():
+    limiter = AdaptiveRateLimiter(rate=0, initial_window=8, cooldown=0)
+
+    with pytest.raises(ValueError):
+        with limiter.slot():
+            raise ValueError("texto inválido")
+    assert limiter.window == 8
+
+    with pytest.raises(TimeoutError):
+        with limiter.slot():
+            raise TimeoutError()
+    assert limiter.window == 4
+
+    limiter.min_window = 3
+    with pytest.raises(TimeoutError):
+        with limiter.slot():
+            raise TimeoutError()
+    assert limiter.window == 3
+
+
+def test_retry_after_pauses_new_calls():
+    limiter = AdaptiveRateLimiter(rate=0, initial_window=4)
+
+    with pytest.raises(UpstreamThrottledError):
+        with limiter.slot():
+            raise UpstreamThrottledError(retry_after=0.2)
+
+    start = time.monotonic()
+    with limiter.slot():
+        pass
+    assert time.monotonic() - start >= 0.15
+
+
+def test_full_window_times_out_without_shrinking():
+    limiter = AdaptiveRateLimiter(rate=0, initial_window=1, max_wait=0.05)
+    limiter.acquire()
+
+    with pytest.raises(RateLimitTimeout):
+        limiter.acquire()
+    with pytest.raises(RateLimitTimeout):
+        asyncio.run(limiter.aacquire(timeout=0.05))
+
+    assert limiter.window == 1
+    assert limiter.stats()['throttled'] == 0
+
+    limiter.release()
+    limiter.acquire(timeout=0)
+
+
+def test_token_bucket_limits_the_rate():
+    limiter = AdaptiveRateLimiter(rate=20, burst=1, initial_window=16)
+
+    start = time.monotonic()
+    for _ in range(4):
+        with limiter.slot():
+            pass
+    assert time.monotonic() - start >= 0.12
+
+
+def test_local_timeout_is_not_reported_as_upstream_throttling(tmp_path):
+    assert not is_congestion_error(RateLimitTimeout("sem vaga"))
+
+    limiter = AdaptiveRateLimiter(rate=0, initial_window=1, max_window=1, max_wait=0.05)
+    generator = AudioGenerator(backend=LocalBackend(), cache_dir=str(tmp_path), rate_limiter=limiter)
+    limiter.acquire()  # outra chamada ocupando a única vaga
+
+    result = generator.generate_audio("Olá.", 'pt')
+    assert result['success'] is False
+    assert (result['throttled'], result['rate_limited']) == (False, True)
+    assert limiter.window == 1
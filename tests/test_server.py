@@ -0,0 +1,163 @@
+"""
+Testes da API HTTP (server) chamando a aplicação ASGI diretamente
+"""
+import asyncio
+import json
+
+import pytest
+
+from audio_generator import AudioGenerator
+from rate_limiter import AdaptiveRateLimiter
+from server import VoicifyAPI, etag_matches, parse_range
+from tts_backends import LocalBackend
+
+
+@pytest.fixture
+def api(tmp_path):
+    generator = AudioGenerator(
+        backend=LocalBackend(),
+        cache_dir=str(tmp_path / "cache"),
+        rate_limiter=AdaptiveRateLimiter(rate=0, initial_window=64, max_window=64)
+    )
+    return VoicifyAPI(generator)
+
+
+class Response:
+    def __init__(self, messages):
+        start = messages[0]
+        self.status = start['status']
+        self.headers = {name.decode(): value.decode() for name, value in start['headers']}
+        self.body = b''.join(message.get('body', b'') for message in messages[1:])
+        self.closed = not messages[-1].get('more_body', False)
+
+    def json(self):
+        return json.loads(self.body)
+
+
+def call(api, method, path, body=None, headers=()):
+    scope = {
+        'type': 'http',
+        'method': method,
+        'path': path,
+        'headers': [(name.encode(), value.encode()) for name, value in headers],
+    }
+    requests = [{'type': 'http.request', 'body': json.dumps(body).encode() if body is not None else b''}]
+    messages = []
+
+    async def receive():
+        return requests.pop(0)
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(api(scope, receive, send))
+    return Response(messages)
+
+
+@pytest.fixture
+def cached(api):
+    """Sintetiza um texto e devolve (url, áudio, etag)."""
+    response = call(api, 'POST', '/v1/synthesize', {'text': "Olá, mundo.", 'lang': 'pt'})
+    assert response.status == 200
+    return response.headers['content-location'], response.body, response.headers['etag']
+
+
+def test_synthesize_then_hit_the_cache(api, monkeypatch):
+    # A API usa o caminho assíncrono do gerador, sem threads por requisição
+    monkeypatch.setattr(api.generator, 'generate_audio', None)
+    body = {'text': "Olá, mundo.", 'language': "🇧🇷 Português (Brasil)"}
+
+    first = call(api, 'POST', '/v1/synthesize', body)
+    second = call(api, 'POST', '/v1/synthesize', body)
+
+    assert (first.status, second.status) == (200, 200)
+    assert first.headers['content-type'] == 'audio/mpeg'
+    assert (first.headers['x-voicify-cache'], second.headers['x-voicify-cache']) == ('miss', 'hit')
+    assert first.body == second.body
+    assert first.headers['etag'] == second.headers['etag']
+
+
+def test_invalid_requests_are_rejected(api):
+    assert call(api, 'POST', '/v1/synthesize', {'text': ""}).status == 400
+    assert call(api, 'POST', '/v1/synthesize', {'text': "Oi", 'speed': 9}).status == 400
+    assert call(api, 'POST', '/v1/synthesize', {'text': "Oi", 'quality': 'Máxima'}).status == 400
+    assert call(api, 'POST', '/v1/stream', {'text': "Oi", 'quality': 'Baixa'}).status == 400
+    assert call(api, 'GET', '/v1/synthesize').status == 405
+    assert call(api, 'GET', '/v1/nada').status == 404
+
+
+def test_batch_returns_urls_in_input_order(api, monkeypatch):
+    monkeypatch.setattr(api.generator, 'generate_batch', None)
+    response = call(api, 'POST', '/v1/batch', {'texts': ["Um.", "Dois.", "Um."], 'lang': 'pt'})
+
+    assert response.status == 200
+    data = response.json()
+    assert data['success']
+    keys = [item['cache_key'] for item in data['results']]
+    assert keys[0] == keys[2] != keys[1]
+
+    audio = call(api, 'GET', data['results'][1]['url'])
+    assert audio.status == 200
+    assert int(audio.headers['content-length']) == data['results'][1]['size']
+
+
+def test_audio_is_served_whole_and_by_range(api, cached):
+    url, audio, etag = cached
+
+    whole = call(api, 'GET', url)
+    assert (whole.status, whole.body, whole.headers['etag']) == (200, audio, etag)
+    assert whole.headers['accept-ranges'] == 'bytes'
+
+    part = call(api, 'GET', url, headers=[('range', 'bytes=10-19')])
+    assert part.status == 206
+    assert part.body == audio[10:20]
+    assert part.headers['content-range'] == f"bytes 10-19/{len(audio)}"
+
+    suffix = call(api, 'GET', url, headers=[('range', 'bytes=-5')])
+    assert suffix.body == audio[-5:]
+
+    beyond = call(api, 'GET', url, headers=[('range', f'bytes={len(audio)}-')])
+    assert beyond.status == 416
+    assert beyond.headers['content-range'] == f"bytes */{len(audio)}"
+
+
+def test_conditional_requests(api, cached):
+    url, audio, etag = cached
+
+    for header in (etag, f"W/{etag}", f'"outra", {etag}', '*'):
+        response = call(api, 'GET', url, headers=[('if-none-match', header)])
+        assert response.status == 304, header
+        assert response.body == b''
+
+    assert call(api, 'GET', url, headers=[('if-none-match', '"outra"')]).status == 200
+
+    # If-Range: a parte só vale para a mesma versão (comparação forte)
+    ranged = [('range', 'bytes=0-9')]
+    assert call(api, 'GET', url, headers=ranged + [('if-range', etag)]).status == 206
+    for stale in ('"outra"', f"W/{etag}", "Wed, 21 Oct 2015 07:28:00 GMT"):
+        response = call(api, 'GET', url, headers=ranged + [('if-range', stale)])
+        assert (response.status, response.body) == (200, audio), stale
+
+
+def test_head_sends_headers_only(api, cached):
+    url, audio, _ = cached
+
+    response = call(api, 'HEAD', url)
+    assert response.status == 200
+    assert response.body == b''
+    assert response.headers['content-length'] == str(len(audio))
+    assert response.closed
+
+    assert call(api, 'HEAD', url, headers=[('range', 'bytes=0-3')]).headers['content-length'] == '4'
+
+
+def test_unknown_audio_is_404(api):
+    assert call(api, 'GET', '/v1/audio/' + '0' * 32).status == 404
+
+
+def test_header_helpers():
+    assert etag_matches('W/"a", "b"', '"a"')
+    assert not etag_matches('', '"a"')
+    assert parse_range('bytes=0-', 10) == (0, 9)
+    assert parse_range('bytes=0-1,4-5', 10) is None
+    assert parse_range(None, 10) is None
@@ -0,0 +1,219 @@
+"""
+Testes da coalescência de chamadas idênticas (singleflight)
+"""
+import asyncio
+import fcntl
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from singleflight import SingleFlight
+
+
+class Abort(BaseException):
+    """Interrupção do executor (como um KeyboardInterrupt)."""
+
+
+@pytest.fixture
+def flight(tmp_path):
+    return SingleFlight(str(tmp_path / "locks"), timeout=5.0)
+
+
+def run_concurrently(count, target):
+    with ThreadPoolExecutor(max_workers=count) as executor:
+        futures = [executor.submit(target) for _ in range(count)]
+        return [future.exception() or future.result() for future in futures]
+
+
+def release_after_waiters(started: threading.Event, release: threading.Event):
+    """Libera o executor depois que ele começou e os demais entraram na espera."""
+    def run():
+        started.wait(5)
+        time.sleep(0.1)
+        release.set()
+
+    threading.Thread(target=run).start()
+
+
+def test_concurrent_callers_share_one_execution(flight):
+    calls = []
+    started, release = threading.Event(), threading.Event()
+
+    def fn():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return b'audio'
+
+    release_after_waiters(started, release)
+    results = run_concurrently(8, lambda: flight.do('k', fn))
+
+    assert len(calls) == 1
+    assert [value for value, _ in results] == [b'audio'] * 8
+    assert sorted(shared for _, shared in results) == [False] + [True] * 7
+    assert flight._calls == {}
+
+
+def test_leader_failure_propagates_to_waiters(flight):
+    calls = []
+    started, release = threading.Event(), threading.Event()
+
+    def fn():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        raise ConnectionError("serviço fora do ar")
+
+    release_after_waiters(started, release)
+    errors = run_concurrently(4, lambda: flight.do('k', fn))
+
+    assert len(calls) == 1
+    assert all(isinstance(error, ConnectionError) for error in errors)
+
+
+def test_waiters_take_over_when_the_leader_aborts(flight):
+    calls = []
+    started, release = threading.Event(), threading.Event()
+
+    def fn():
+        calls.append(1)
+        if len(calls) == 1:
+            started.set()
+            release.wait(5)
+            raise Abort()
+        return b'audio'
+
+    def leader():
+        with pytest.raises(Abort):
+            flight.do('k', fn)
+
+    thread = threading.Thread(target=leader)
+    thread.start()
+    assert started.wait(5)
+    release_after_waiters(started, release)
+
+    assert flight.do('k', fn) == (b'audio', False)
+    thread.join()
+    assert len(calls) == 2
+
+
+def test_waiting_for_a_stuck_leader_times_out(tmp_path):
+    flight = SingleFlight(None, timeout=0.1)
+    started, release = threading.Event(), threading.Event()
+
+    def fn():
+        started.set()
+        release.wait(5)
+        return b'audio'
+
+    thread = threading.Thread(target=flight.do, args=('k', fn))
+    thread.start()
+    assert started.wait(5)
+    try:
+        with pytest.raises(TimeoutError):
+            flight.do('k', fn)
+    finally:
+        release.set()
+        thread.join()
+
+
+def test_stale_lock_file_is_taken_over(flight):
+    # Arquivo deixado por um processo que caiu (ninguém segura o lock)
+    path = flight._lock_path('k')
+    open(path, 'w').close()
+
+    start = time.monotonic()
+    assert flight.do('k', lambda: b'audio') == (b'audio', False)
+    assert time.monotonic() - start < 1.0
+    assert not os.path.exists(path)
+
+
+def test_lock_file_replaced_while_waiting_is_not_trusted(flight, monkeypatch):
+    # Um descritor aberto antes do arquivo ser removido aponta para um
+    # arquivo antigo: o lock obtido nele não vale
+    path = flight._lock_path('k')
+    open(path, 'w').close()
+    old_inode = os.stat(path).st_ino
+
+    real_open = os.open
+    replaced = []
+
+    def open_then_replace(file, flags, mode=0o777):
+        fd = real_open(file, flags, mode)
+        if file == path and not replaced:
+            replaced.append(True)
+            os.unlink(path)
+            open(path, 'w').close()
+        return fd
+
+    monkeypatch.setattr(os, 'open', open_then_replace)
+    fd = flight._try_file_lock('k')
+    monkeypatch.undo()
+
+    assert fd is not None
+    assert os.fstat(fd).st_ino == os.stat(path).st_ino != old_inode
+    flight._release_file_lock('k', fd)
+
+
+def test_lock_held_by_another_process_is_waited_for_then_rechecked(flight):
+    # Outro processo (outra descrição de arquivo) segura o lock
+    other = os.open(flight._lock_path('k'), os.O_RDWR | os.O_CREAT)
+    fcntl.flock(other, fcntl.LOCK_EX)
+    cache = {}
+
+    def other_process_finishes():
+        time.sleep(0.2)
+        cache['k'] = b'audio do outro processo'
+        os.unlink(flight._lock_path('k'))
+        fcntl.flock(other, fcntl.LOCK_UN)
+        os.close(other)
+
+    threading.Thread(target=other_process_finishes).start()
+
+    start = time.monotonic()
+    value, shared = flight.do('k', lambda: pytest.fail("sintetizou de novo"), lambda: cache.get('k'))
+    assert (value, shared) == (b'audio do outro processo', True)
+    assert time.monotonic() - start >= 0.15
+
+
+def test_async_waiter_cancellation_does_not_cancel_the_leader(flight):
+    calls = []
+
+    async def fn():
+        calls.append(1)
+        await asyncio.sleep(0.2)
+        return b'audio'
+
+    async def main():
+        leader = asyncio.create_task(flight.ado('k', fn))
+        await asyncio.sleep(0.05)
+        waiter = asyncio.create_task(flight.ado('k', fn))
+        await asyncio.sleep(0.05)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        return await leader
+
+    assert asyncio.run(main()) == (b'audio', False)
+    assert len(calls) == 1
+
+
+def test_async_and_sync_callers_coalesce(flight):
+    release = threading.Event()
+
+    def fn():
+        release.wait(5)
+        return b'audio'
+
+    async def main():
+        leader = asyncio.create_task(asyncio.to_thread(flight.do, 'k', fn))
+        while 'k' not in flight._calls:
+            await asyncio.sleep(0.01)
+        asyncio.get_running_loop().call_later(0.05, release.set)
+        shared = await flight.ado('k', lambda: pytest.fail("sintetizou de novo"))
+        return await leader, shared
+
+    assert asyncio.run(main()) == ((b'audio', False), (b'audio', True))
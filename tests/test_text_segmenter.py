@@ -0,0 +1,121 @@
+"""
+Testes da segmentação de texto em frases (text_segmenter)
+"""
+import io
+
+import pytest
+
+from text_segmenter import iter_file, iter_segments
+from utils import split_text_into_chunks
+
+
+def segments(text, max_chars=100):
+    return list(iter_segments(text, max_chars))
+
+
+def test_splits_on_sentence_terminators():
+    assert segments("Olá mundo. Tudo bem? Sim!  Até logo") == [
+        "Olá mundo.", "Tudo bem?", "Sim!", "Até logo",
+    ]
+
+
+def test_abbreviations_and_initials_do_not_end_sentences():
+    text = "O Dr. Silva e a Sra. Souza chegaram. J. R. Tolkien escreveu, e.g. este livro."
+    assert segments(text) == [
+        "O Dr. Silva e a Sra. Souza chegaram.",
+        "J. R. Tolkien escreveu, e.g. este livro.",
+    ]
+
+
+def test_decimals_do_not_end_sentences():
+    assert segments("O valor é 3.14 ou 2,5. Próxima frase.") == [
+        "O valor é 3.14 ou 2,5.", "Próxima frase.",
+    ]
+
+
+def test_closing_quotes_stay_with_the_sentence():
+    assert segments('Ele disse "acabou." Depois saiu.') == ['Ele disse "acabou."', "Depois saiu."]
+
+
+def test_cjk_terminators_need_no_space():
+    assert segments("你好。今天好吗？很好！") == ["你好。", "今天好吗？", "很好！"]
+    assert segments("こんにちは。元気ですか？") == ["こんにちは。", "元気ですか？"]
+
+
+def test_devanagari_danda():
+    assert segments("नमस्ते। आप कैसे हैं।") == ["नमस्ते।", "आप कैसे हैं।"]
+
+
+def test_long_sentence_breaks_after_clauses_then_spaces():
+    text = "Primeira parte da frase, segunda parte da frase, terceira parte bem longa"
+    assert segments(text, max_chars=30) == [
+        "Primeira parte da frase,", "segunda parte da frase,", "terceira parte bem longa",
+    ]
+
+    words = " ".join(["palavra"] * 20)
+    pieces = segments(words, max_chars=30)
+    assert all(len(piece) <= 30 for piece in pieces)
+    assert " ".join(pieces) == words
+
+
+def test_hard_cut_without_breaks():
+    assert segments("字" * 250, max_chars=100) == ["字" * 100, "字" * 100, "字" * 50]
+
+
+def test_whitespace_is_normalized_and_empty_input_yields_nothing():
+    assert segments("  Uma\n\nfrase   com\tespaços.  ") == ["Uma frase com espaços."]
+    assert segments("") == []
+    assert segments(" \n ") == []
+
+
+SAMPLE = (
+    "O Sr. Almeida pagou R$ 3.50 pelo café... Depois disse: \"ótimo!\" e saiu. "
+    + "Uma frase muito longa, com várias vírgulas, que passa do orçamento, " * 6
+    + "sem ponto final " * 20
+    + "e termina aqui. 你好。今天好吗？नमस्ते। Fim"
+)
+
+
+@pytest.mark.parametrize("block_size", [1, 2, 3, 7, 16, 64, 101, 1000])
+def test_output_does_not_depend_on_block_size(block_size):
+    expected = segments(SAMPLE, max_chars=50)
+    blocks = iter_file(io.StringIO(SAMPLE), block_size)
+    assert list(iter_segments(blocks, 50)) == expected
+
+
+def test_segments_respect_budget():
+    assert all(len(piece) <= 50 for piece in segments(SAMPLE, max_chars=50))
+
+
+def test_custom_abbreviations():
+    text = "Veja o vol. 3 do livro. Fim."
+    assert segments(text) == ["Veja o vol.", "3 do livro.", "Fim."]
+    assert list(iter_segments(text, 100, frozenset({"vol."}))) == ["Veja o vol. 3 do livro.", "Fim."]
+
+
+@pytest.mark.parametrize("sentence", ["Uma frase comum de teste. ", "palavras sem ponto final "])
+def test_large_input_is_segmented_as_it_streams(sentence):
+    output = []
+    produced_before_read = []
+
+    def blocks():
+        for _ in range(200):  # ~5 MB no total
+            produced_before_read.append(len(output))
+            yield sentence * 1000
+
+    for segment in iter_segments(blocks(), 100):
+        output.append(segment)
+
+    # Cada bloco já gera segmentos antes da leitura do seguinte: só o
+    # trecho sem fim de frase fica guardado
+    assert all(b > a for a, b in zip(produced_before_read, produced_before_read[1:]))
+    assert all(len(segment) <= 100 for segment in output)
+    assert " ".join(output) == (sentence * 200_000).strip()
+
+
+def test_chunks_keep_punctuation_and_respect_the_character_budget():
+    text = "Olá! Tudo bem? Sim... Vamos lá; depois vemos. " * 20
+    chunks = split_text_into_chunks(text, max_chunk_size=120)
+
+    assert all(len(chunk) <= 120 for chunk in chunks)
+    assert " ".join(chunks) == text.strip()
@@ -0,0 +1,66 @@
+"""
+Testes do ajuste de velocidade sem mudança de tom (time_stretch)
+"""
+import numpy as np
+import pytest
+
+from time_stretch import time_stretch
+
+SAMPLE_RATE = 24000
+
+
+def tone(frequency: float, seconds: float = 1.0) -> np.ndarray:
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (np.sin(2 * np.pi * frequency * t) * 8000).astype(np.int16)
+
+
+def dominant_frequency(signal: np.ndarray) -> float:
+    spectrum = np.abs(np.fft.rfft(signal * np.hanning(len(signal))))
+    return np.fft.rfftfreq(len(signal), 1 / SAMPLE_RATE)[np.argmax(spectrum)]
+
+
+def rms(signal: np.ndarray) -> float:
+    return float(np.sqrt(np.mean(np.square(signal, dtype=np.float64))))
+
+
+@pytest.mark.parametrize("speed", [0.5, 0.75, 1.25, 1.5, 2.0])
+def test_duration_scales_with_speed(speed):
+    samples = tone(220)
+    result = time_stretch(samples, speed, SAMPLE_RATE)
+    assert result.dtype == np.float32
+    assert len(result) == int(round(len(samples) / speed))
+
+
+@pytest.mark.parametrize("speed", [0.75, 1.5])
+def test_pitch_and_level_are_preserved(speed):
+    samples = tone(220)
+    result = time_stretch(samples, speed, SAMPLE_RATE)
+    # Ignora as bordas, onde as janelas ainda não se sobrepõem
+    body = result[SAMPLE_RATE // 10:-SAMPLE_RATE // 10]
+    assert dominant_frequency(body) == pytest.approx(220, abs=5)
+    assert rms(body) == pytest.approx(rms(samples), rel=0.2)
+
+
+def test_stereo_keeps_channels():
+    stereo = np.stack([tone(220), tone(330)], axis=1)
+    result = time_stretch(stereo, 1.5, SAMPLE_RATE)
+    assert result.shape == (int(round(len(stereo) / 1.5)), 2)
+
+
+def test_unit_speed_and_empty_input_are_copies():
+    samples = tone(220, 0.1)
+    result = time_stretch(samples, 1.0, SAMPLE_RATE)
+    assert result.dtype == np.float32
+    np.testing.assert_array_equal(result, samples.astype(np.float32))
+    assert len(time_stretch(np.zeros(0, dtype=np.int16), 1.5, SAMPLE_RATE)) == 0
+
+
+def test_very_short_input():
+    result = time_stretch(tone(220, 0.005), 2.0, SAMPLE_RATE)
+    assert len(result) == int(round(0.005 * SAMPLE_RATE / 2.0))
+
+
+@pytest.mark.parametrize("speed", [0, -1.0])
+def test_rejects_non_positive_speed(speed):
+    with pytest.raises(ValueError):
+        time_stretch(tone(220, 0.1), speed, SAMPLE_RATE)
@@ -0,0 +1,141 @@
+"""
+Testes dos backends de síntese contra o servidor substituto do gTTS
+"""
+import asyncio
+import base64
+import time
+
+import pytest
+from gtts import gTTS
+from gtts.tts import gTTSError
+
+import tts_backends
+from benchmarks.standin_server import start_server
+from mp3_utils import iter_frames, mp3_duration
+from rate_limiter import UpstreamThrottledError
+from tts_backends import GTTSBackend, LocalBackend, TTSBackend
+
+
+@pytest.fixture
+def server_factory():
+    servers = []
+
+    def start(**options):
+        server = start_server(**options)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+
+
+def backend_for(server) -> GTTSBackend:
+    return GTTSBackend(endpoint=server.url, max_retries=0, timeout=5.0)
+
+
+async def asynthesize(backend, text):
+    try:
+        return await backend.asynthesize(text, 'pt', 'com.br')
+    finally:
+        await backend.aclose()
+
+
+def test_sync_and_async_synthesis_return_the_same_audio(server_factory):
+    server = server_factory()
+    backend = backend_for(server)
+    text = "Uma frase curta. " * 12  # mais de uma requisição do gTTS
+
+    audio = backend.synthesize(text, 'pt', 'com.br')
+    assert audio == asyncio.run(asynthesize(backend, text))
+    assert server.requests >= 4
+
+
+@pytest.mark.parametrize('mode', ['sync', 'async'])
+def test_http_errors_raise_gtts_error_in_both_paths(server_factory, mode):
+    backend = backend_for(server_factory(error_rate=1.0, error_status=500))
+
+    with pytest.raises(gTTSError, match="500"):
+        if mode == 'sync':
+            backend.synthesize("olá", 'pt', 'com.br')
+        else:
+            asyncio.run(asynthesize(backend, "olá"))
+
+
+@pytest.mark.parametrize('mode', ['sync', 'async'])
+def test_throttling_raises_upstream_throttled(server_factory, mode):
+    backend = backend_for(server_factory(error_rate=1.0, error_status=429))
+
+    with pytest.raises(UpstreamThrottledError) as raised:
+        if mode == 'sync':
+            backend.synthesize("olá", 'pt', 'com.br')
+        else:
+            asyncio.run(asynthesize(backend, "olá"))
+    assert raised.value.retry_after == 1.0
+
+
+def test_local_backend_is_deterministic():
+    backend = LocalBackend()
+    assert backend.synthesize("olá", 'pt', 'com') == backend.synthesize("olá", 'pt', 'com')
+    assert backend.synthesize("olá", 'pt', 'com') != backend.synthesize("oi", 'pt', 'com')
+    assert asyncio.run(backend.asynthesize("olá", 'pt', 'com')) == backend.synthesize("olá", 'pt', 'com')
+
+
+def test_installed_gtts_exposes_the_internals_the_pool_relies_on():
+    # Se falhar, a versão do gTTS mudou: revise tts_backends e requirements.txt
+    assert tts_backends._GTTS_INTERNALS
+
+    tts = gTTS(text="Uma frase. " * 20, lang='pt', tld='com.br')
+    prepared = tts_backends._gtts_requests(tts)
+    assert len(prepared) > 1
+    assert all(gTTS.GOOGLE_TTS_RPC in request.body for request in prepared)
+
+    audio = base64.b64encode(b'\xff\xf3audio').decode('ascii')
+    body = f')]}}\'\n[["wrb.fr","{gTTS.GOOGLE_TTS_RPC}","[\\"{audio}\\"]",null]]'
+    assert tts_backends._decode_gtts_response(body) == b'\xff\xf3audio'
+
+
+def test_without_the_internals_synthesis_falls_back_to_gtts(monkeypatch):
+    written = []
+
+    def write_to_fp(self, fp):
+        written.append((self.text, self.lang, self.tld, self.timeout))
+        fp.write(b'mp3')
+
+    monkeypatch.setattr(tts_backends, '_GTTS_INTERNALS', False)
+    monkeypatch.setattr(gTTS, 'write_to_fp', write_to_fp)
+    backend = GTTSBackend(timeout=7.0)
+
+    assert backend.synthesize("olá", 'pt', 'com.br') == b'mp3'
+    assert asyncio.run(asynthesize(backend, "oi")) == b'mp3'
+    assert written == [("olá", 'pt', 'com.br', 7.0), ("oi", 'pt', 'com.br', 7.0)]
+
+
+def test_backends_implement_the_protocol():
+    assert isinstance(LocalBackend(), TTSBackend)
+    assert isinstance(GTTSBackend(), TTSBackend)
+    assert LocalBackend.cache_namespace != GTTSBackend.cache_namespace
+
+
+def test_local_backend_renders_valid_mp3_proportional_to_the_text():
+    backend = LocalBackend(seconds_per_char=0.06)
+    short = backend.render("a" * 50, 'pt', 'com')
+    long = backend.render("a" * 500, 'pt', 'com')
+
+    assert {header.sample_rate for _, header in iter_frames(short)} == {24000}
+    assert mp3_duration(short) == pytest.approx(3.0, abs=LocalBackend.FRAME_DURATION)
+    assert mp3_duration(long) == pytest.approx(30.0, abs=LocalBackend.FRAME_DURATION)
+
+
+@pytest.mark.parametrize('mode', ['sync', 'async'])
+def test_local_backend_latency_beyond_the_timeout_raises(mode):
+    backend = LocalBackend(latency=0.5)
+
+    started = time.monotonic()
+    with pytest.raises(TimeoutError):
+        if mode == 'sync':
+            backend.synthesize("olá", 'pt', 'com', timeout=0.05)
+        else:
+            asyncio.run(backend.asynthesize("olá", 'pt', 'com', timeout=0.05))
+    assert time.monotonic() - started < 0.4
+    assert backend.calls == 1
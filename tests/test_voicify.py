@@ -0,0 +1,150 @@
+"""
+Testes da linha de comando (voicify render)
+"""
+import json
+import os
+
+import pytest
+
+from config import VoicifyConfig
+from voicify import CHECKPOINT_FILENAME, render_corpus
+
+
+class FakeGenerator:
+    """Gerador que registra as chamadas e devolve o formato pedido."""
+
+    def __init__(self, audio_format: str = None, failing=(), crash_on=None):
+        self.calls = []
+        self.audio_format = audio_format
+        self.failing = set(failing)
+        self.crash_on = crash_on
+
+    def generate_audio(self, text, lang, speed=1.0, tld='com', quality=None):
+        self.calls.append((text, quality))
+        if text == self.crash_on:
+            raise KeyboardInterrupt
+        if text in self.failing:
+            return {'success': False, 'error': "serviço indisponível"}
+        audio_format = self.audio_format or VoicifyConfig.OUTPUT_PROFILES[quality]['format']
+        audio = f"{text}:{quality}".encode('utf-8')
+        return {'success': True, 'audio_data': audio, 'size': len(audio), 'format': audio_format}
+
+
+LANGUAGE = "🇧🇷 Português (Brasil)"
+
+
+def write_corpus(path, rows):
+    path.write_text(''.join(json.dumps(row, ensure_ascii=False) + '\n' for row in rows), encoding='utf-8')
+    return str(path)
+
+
+def rendered_files(output):
+    return sorted(name for name in os.listdir(output) if not name.startswith('.'))
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    rows = [{'text': f"Frase {i}.", 'language': LANGUAGE, 'name': f"f{i}"} for i in range(3)]
+    return write_corpus(tmp_path / "corpus.jsonl", rows)
+
+
+def test_render_writes_files_in_the_quality_format(corpus, tmp_path):
+    output = tmp_path / "out"
+    generator = FakeGenerator()
+
+    counts = render_corpus(corpus, str(output), workers=2, generator=generator, quality='Baixa')
+
+    assert counts == {'rendered': 3, 'skipped': 0, 'failed': 0}
+    assert rendered_files(output) == ['f0.ogg', 'f1.ogg', 'f2.ogg']
+    assert {quality for _, quality in generator.calls} == {'Baixa'}
+
+
+def test_render_uses_the_delivered_format_when_encoding_falls_back(corpus, tmp_path):
+    output = tmp_path / "out"
+
+    render_corpus(corpus, str(output), generator=FakeGenerator('mp3'), quality='Baixa')
+    assert (output / "f0.mp3").exists()
+
+    # Retomada com a mesma qualidade: nada a refazer
+    generator = FakeGenerator('mp3')
+    assert render_corpus(corpus, str(output), generator=generator, quality='Baixa')['skipped'] == 3
+    assert generator.calls == []
+
+
+def test_changing_quality_renders_again(corpus, tmp_path):
+    output = tmp_path / "out"
+    render_corpus(corpus, str(output), generator=FakeGenerator())
+
+    generator = FakeGenerator()
+    counts = render_corpus(corpus, str(output), generator=generator, quality='Média')
+    assert counts['rendered'] == 3
+    assert len(generator.calls) == 3
+
+
+def test_crashed_run_resumes_without_rendering_finished_rows(corpus, tmp_path):
+    output = tmp_path / "out"
+
+    with pytest.raises(KeyboardInterrupt):
+        render_corpus(corpus, str(output), workers=1, generator=FakeGenerator(crash_on="Frase 2."))
+
+    generator = FakeGenerator()
+    counts = render_corpus(corpus, str(output), workers=1, generator=generator)
+    assert counts['skipped'] >= 1 and counts['skipped'] + counts['rendered'] == 3
+    assert ("Frase 0.", VoicifyConfig.DEFAULT_QUALITY) not in generator.calls
+    assert rendered_files(output) == ['f0.mp3', 'f1.mp3', 'f2.mp3']
+
+
+def test_failed_rows_are_retried_on_the_next_run(corpus, tmp_path):
+    output = tmp_path / "out"
+
+    counts = render_corpus(corpus, str(output), generator=FakeGenerator(failing={"Frase 1."}))
+    assert counts == {'rendered': 2, 'skipped': 0, 'failed': 1}
+
+    generator = FakeGenerator()
+    assert render_corpus(corpus, str(output), generator=generator) == {'rendered': 1, 'skipped': 2, 'failed': 0}
+    assert [text for text, _ in generator.calls] == ["Frase 1."]
+
+
+def test_changed_rows_and_missing_files_are_rendered_again(tmp_path):
+    output = tmp_path / "out"
+    rows = [{'text': f"Frase {i}.", 'language': LANGUAGE, 'name': f"f{i}"} for i in range(3)]
+    corpus = write_corpus(tmp_path / "corpus.jsonl", rows)
+    render_corpus(corpus, str(output), generator=FakeGenerator())
+
+    rows[0]['text'] = "Frase editada."
+    write_corpus(tmp_path / "corpus.jsonl", rows)
+    os.remove(output / "f2.mp3")
+
+    generator = FakeGenerator()
+    assert render_corpus(corpus, str(output), generator=generator)['rendered'] == 2
+    assert sorted(text for text, _ in generator.calls) == ["Frase 2.", "Frase editada."]
+    assert (output / "f0.mp3").read_bytes().startswith("Frase editada.".encode('utf-8'))
+
+
+def test_truncated_checkpoint_line_is_ignored(corpus, tmp_path):
+    output = tmp_path / "out"
+    render_corpus(corpus, str(output), generator=FakeGenerator())
+    with open(output / CHECKPOINT_FILENAME, 'a', encoding='utf-8') as f:
+        f.write('{"row": 0, "key": "abc", "st')
+
+    generator = FakeGenerator()
+    assert render_corpus(corpus, str(output), generator=generator)['skipped'] == 3
+    assert generator.calls == []
+
+
+def test_csv_rows_with_duplicate_names_and_invalid_fields(tmp_path):
+    path = tmp_path / "corpus.csv"
+    path.write_text(
+        "text,language,speed,name\n"
+        f"Bom dia.,{LANGUAGE},,saudacao\n"
+        f"Boa noite.,{LANGUAGE},1.25,saudacao\n"
+        "Hello.,Klingon,,ola\n"
+        f"Rápido demais.,{LANGUAGE},9,rapido\n",
+        encoding='utf-8'
+    )
+    output = tmp_path / "out"
+
+    counts = render_corpus(str(path), str(output), generator=FakeGenerator())
+
+    assert counts == {'rendered': 2, 'skipped': 0, 'failed': 2}
+    assert rendered_files(output) == ['saudacao-1.mp3', 'saudacao.mp3']
@@ -0,0 +1,80 @@
+"""
+Testes do pré-aquecimento do cache (warmup)
+"""
+import json
+
+import pytest
+
+from audio_generator import AudioGenerator
+from rate_limiter import AdaptiveRateLimiter
+from tts_backends import LocalBackend
+from warmup import read_catalog, warm_cache
+
+BR = "🇧🇷 Português (Brasil)"
+US = "🇺🇸 Inglês (EUA)"
+
+
+@pytest.fixture
+def generator(tmp_path):
+    return AudioGenerator(
+        backend=LocalBackend(),
+        cache_dir=str(tmp_path / "cache"),
+        rate_limiter=AdaptiveRateLimiter(rate=0, initial_window=64, max_window=64)
+    )
+
+
+def test_renders_missing_phrases_then_reports_them_cached(generator):
+    catalog = [{'text': "Bom dia."}, {'text': "Boa noite."}, {'text': "Bom dia."}]
+
+    report = warm_cache(catalog, [BR, US], generator=generator, workers=2)
+    assert report[BR] == {'total': 2, 'cached': 0, 'rendered': 2, 'failed': 0, 'coverage': 1.0}
+    assert report[US]['rendered'] == 2
+    assert generator.backend.calls == 4
+
+    again = warm_cache(catalog, [BR, US], generator=generator)
+    assert again[BR]['cached'] == 2 and again[BR]['rendered'] == 0
+    assert generator.backend.calls == 4
+
+
+def test_dry_run_only_measures_coverage(generator):
+    warm_cache([{'text': "Bom dia."}], [BR], generator=generator)
+
+    report = warm_cache([{'text': "Bom dia."}, {'text': "Até logo."}], [BR], generator=generator, dry_run=True)
+    assert report[BR]['coverage'] == 0.5
+    assert generator.backend.calls == 1
+
+
+def test_skipped_entries_are_counted(generator, caplog):
+    catalog = [
+        {'text': "Bom dia.", 'language': BR},
+        {'text': "Good morning.", 'language': US},
+        {'text': "Bonjour.", 'language': "Francês"},
+        {'text': "Rápido.", 'speed': "depressa"},
+    ]
+    skipped = {}
+
+    report = warm_cache(catalog, [BR], generator=generator, skipped=skipped)
+
+    assert report[BR]['total'] == 1
+    assert skipped == {'unknown_language': 1, 'other_language': 1, 'invalid_speed': 1}
+    assert "Francês" in caplog.text
+    assert "puladas" in caplog.text
+
+
+def test_unknown_requested_language_is_an_error(generator):
+    with pytest.raises(ValueError):
+        warm_cache([{'text': "Olá."}], ["Klingon"], generator=generator)
+
+
+def test_read_catalog_formats(tmp_path):
+    text = tmp_path / "frases.txt"
+    text.write_text("Bom dia.\n\n  Boa noite.  \n", encoding='utf-8')
+    assert list(read_catalog(str(text))) == [{'text': "Bom dia."}, {'text': "Boa noite."}]
+
+    jsonl = tmp_path / "frases.jsonl"
+    jsonl.write_text(json.dumps({'text': "Oi.", 'language': BR}, ensure_ascii=False) + "\n\n", encoding='utf-8')
+    assert list(read_catalog(str(jsonl))) == [{'text': "Oi.", 'language': BR}]
+
+    csv_path = tmp_path / "frases.csv"
+    csv_path.write_text("text,speed\nOi.,1.5\n", encoding='utf-8')
+    assert list(read_catalog(str(csv_path))) == [{'text': "Oi.", 'speed': "1.5"}]
@@ -0,0 +1,151 @@
+"""
+Segmentação de texto em frases com orçamento de caracteres (uma passada)
+"""
+import re
+from typing import Iterable, Iterator, Optional, Union, TextIO
+
+# Orçamento padrão: o gTTS envia trechos de até 100 caracteres por requisição
+DEFAULT_MAX_CHARS = 100
+
+# Caracteres lidos por vez de um arquivo
+READ_BLOCK_CHARS = 64 * 1024
+
+# Abreviações comuns (minúsculas, com o ponto) que não encerram uma frase
+ABBREVIATIONS = frozenset({
+    # Português / espanhol
+    "sr.", "sra.", "srta.", "dr.", "dra.", "prof.", "profa.", "eng.", "av.", "pág.", "págs.",
+    "cap.", "fig.", "tel.", "ex.", "obs.", "nº.", "núm.", "ud.", "uds.", "sto.", "sta.",
+    # Inglês
+    "mr.", "mrs.", "ms.", "st.", "jr.", "sr.", "vs.", "e.g.", "i.e.", "no.", "approx.", "dept.",
+    "inc.", "ltd.", "co.", "mt.",
+    # Francês / alemão / italiano
+    "mme.", "mlle.", "m.", "bzw.", "z.b.", "usw.", "nr.", "sig.", "dott.",
+})
+
+# Fim de frase: pontuação ocidental seguida de espaço (não quebra "3.14"),
+# pontuação de largura total do chinês e do japonês, danda do devanágari
+# e interrogação/ponto do árabe. Aspas e parênteses de fechamento ficam
+# com a frase.
+_TERMINATOR = re.compile(r"""
+    [.!?…]+ ["'”’)\]»]* (?=\s)
+  | [。！？｡]+ [」』）”’"]*
+  | [।॥]+
+  | [؟۔]+ (?=\s)
+""", re.VERBOSE)
+
+# Pontos preferidos para quebrar uma frase maior que o orçamento
+_CLAUSE_BREAK = re.compile(r"[,;:—–]\s|[、，；：،]")
+
+_WORD_BEFORE = re.compile(r"\S+$")
+
+
+def _is_abbreviation(buffer: str, end: int, abbreviations: frozenset) -> bool:
+    """Verifica se o ponto em buffer[end] fecha uma abreviação ou inicial."""
+    match = _WORD_BEFORE.search(buffer, max(0, end - 12), end)
+    if not match:
+        return False
+    
+    word = match.group()
+    # Iniciais de nomes ("J. Silva")
+    if len(word) == 1 and word.isupper():
+        return True
+    return f"{word.lower()}." in abbreviations
+
+
+def _fit(sentence: str, max_chars: int) -> Iterator[str]:
+    """
+    Normaliza os espaços de uma frase e a quebra em pedaços de até max_chars.
+    
+    Quebra de preferência após vírgulas e afins, depois no último espaço;
+    sem nenhum dos dois (ex.: chinês e japonês), corta no limite.
+    """
+    sentence = " ".join(sentence.split())
+    
+    while len(sentence) > max_chars:
+        window = sentence[:max_chars + 1]
+        
+        cut = 0
+        for match in _CLAUSE_BREAK.finditer(window):
+            cut = match.start() + 1
+        if cut < max_chars // 3:
+            cut = window.rfind(" ")
+        if cut < max_chars // 3:
+            cut = max_chars
+        
+        piece = sentence[:cut].strip()
+        if piece:
+            yield piece
+        sentence = sentence[cut:].strip()
+    
+    if sentence:
+        yield sentence
+
+
+def iter_file(file: TextIO, block_size: int = READ_BLOCK_CHARS) -> Iterator[str]:
+    """
+    Lê um arquivo de texto em blocos, para segmentar sem carregá-lo inteiro.
+    
+    Args:
+        file: Arquivo aberto em modo texto
+        block_size: Caracteres por bloco
+    
+    Yields:
+        str: Blocos do texto
+    """
+    while True:
+        block = file.read(block_size)
+        if not block:
+            return
+        yield block
+
+
+def iter_segments(
+    source: Union[str, Iterable[str]],
+    max_chars: int = DEFAULT_MAX_CHARS,
+    abbreviations: Optional[frozenset] = None
+) -> Iterator[str]:
+    """
+    Divide um texto em frases de até max_chars caracteres, em uma passada.
+    
+    Cada frase mantém a pontuação original e tem os espaços normalizados;
+    frases maiores que o orçamento são quebradas em vírgulas, espaços ou,
+    em último caso, no limite. O texto pode vir em blocos (ex.: iter_file),
+    e só o trecho ainda sem fim de frase fica em memória, então a memória
+    usada não depende do tamanho da entrada.
+    
+    Args:
+        source: Texto ou blocos de texto
+        max_chars: Tamanho máximo de cada segmento em caracteres
+        abbreviations: Abreviações que não encerram frases (padrão:
+            ABBREVIATIONS)
+    
+    Yields:
+        str: Segmentos, na ordem do texto
+    """
+    if isinstance(source, str):
+        source = (source,)
+    if abbreviations is None:
+        abbreviations = ABBREVIATIONS
+    
+    pending = ""
+    
+    for block in source:
+        buffer = pending + block
+        start = 0
+        
+        for match in _TERMINATOR.finditer(buffer):
+            if match.group() == "." and _is_abbreviation(buffer, match.start(), abbreviations):
+                continue
+            yield from _fit(buffer[start:match.end()], max_chars)
+            start = match.end()
+        
+        pending = buffer[start:]
+        
+        # Trecho longo sem fim de frase: libera os pedaços já completos e
+        # guarda só o último, que ainda pode continuar no próximo bloco
+        if len(pending) > max_chars * 2:
+            pieces = list(_fit(pending, max_chars))
+            yield from pieces[:-1]
+            pending = pieces[-1] + (" " if pending[-1].isspace() else "") if pieces else ""
+    
+    yield from _fit(pending, max_chars)
@@ -0,0 +1,139 @@
+"""
+Alteração de velocidade de áudio sem mudar o tom (WSOLA em NumPy)
+"""
+import numpy as np
+
+# Parâmetros padrão do WSOLA
+FRAME_MS = 40.0  # Duração de cada janela
+TOLERANCE_MS = 10.0  # Deslocamento máximo na busca por similaridade
+SEARCH_RATE = 8000  # Taxa (Hz) usada na busca, para reduzir o custo da correlação
+_OLA_BLOCK = 4096  # Frames somados de uma vez na sobreposição vetorizada
+
+
+def _find_positions(
+    mono: np.ndarray,
+    speed: float,
+    frame_length: int,
+    hop: int,
+    tolerance: int,
+    num_frames: int,
+    decimation: int
+) -> np.ndarray:
+    """
+    Escolhe a posição de leitura de cada janela (etapa de busca do WSOLA).
+    
+    Cada janela é lida perto da posição ideal (k * hop * speed), no ponto
+    em que ela mais se parece com a continuação natural da janela anterior.
+    A correlação é calculada sobre o sinal decimado, só na região que será
+    sobreposta.
+    
+    Args:
+        mono: Sinal mono, já com tolerance amostras de margem no início
+        speed: Fator de velocidade
+        frame_length: Tamanho da janela em amostras
+        hop: Passo de síntese em amostras
+        tolerance: Deslocamento máximo em amostras
+        num_frames: Número de janelas
+        decimation: Fator de decimação usado na busca
+    
+    Returns:
+        np.ndarray: Posições de leitura (no sinal com margem)
+    """
+    positions = np.empty(num_frames, dtype=np.int64)
+    overlap = frame_length - hop
+    ideal = tolerance + np.round(np.arange(num_frames) * hop * speed).astype(np.int64)
+    max_position = len(mono) - frame_length
+    
+    positions[0] = min(ideal[0], max_position)
+    
+    for k in range(1, num_frames):
+        # Continuação natural: o que viria logo após a janela anterior
+        natural = positions[k - 1] + hop
+        template = mono[natural:natural + overlap:decimation]
+        
+        start = min(max(ideal[k] - tolerance, 0), max_position)
+        stop = min(ideal[k] + tolerance, max_position)
+        region = mono[start:stop + overlap:decimation]
+        
+        if len(template) == 0 or len(region) < len(template):
+            positions[k] = start
+            continue
+        
+        correlation = np.correlate(region, template, mode='valid')
+        positions[k] = start + int(np.argmax(correlation)) * decimation
+    
+    return positions
+
+
+def time_stretch(
+    samples: np.ndarray,
+    speed: float,
+    sample_rate: int,
+    frame_ms: float = FRAME_MS,
+    tolerance_ms: float = TOLERANCE_MS
+) -> np.ndarray:
+    """
+    Altera a velocidade do áudio preservando o tom (WSOLA).
+    
+    Funciona para acelerar (speed > 1) e desacelerar (speed < 1). A busca
+    de posições roda por janela sobre um sinal decimado; a sobreposição
+    e soma das janelas é vetorizada em blocos.
+    
+    Args:
+        samples: Amostras PCM, formato (n,) ou (n, canais)
+        speed: Fator de velocidade (ex.: 1.5 = 50% mais rápido)
+        sample_rate: Taxa de amostragem em Hz
+        frame_ms: Duração de cada janela em milissegundos
+        tolerance_ms: Deslocamento máximo da busca em milissegundos
+    
+    Returns:
+        np.ndarray: Amostras float32 com duração n / speed, no mesmo formato
+    """
+    if speed <= 0:
+        raise ValueError("A velocidade deve ser positiva")
+    
+    x = np.asarray(samples, dtype=np.float32)
+    squeeze = x.ndim == 1
+    if squeeze:
+        x = x[:, np.newaxis]
+    
+    if speed == 1.0 or len(x) == 0:
+        result = x.copy()
+        return result[:, 0] if squeeze else result
+    
+    frame_length = max(int(sample_rate * frame_ms / 1000) // 2 * 2, 4)
+    hop = frame_length // 2
+    tolerance = int(sample_rate * tolerance_ms / 1000)
+    decimation = max(sample_rate // SEARCH_RATE, 1)
+    
+    output_length = int(round(len(x) / speed))
+    num_frames = max(int(np.ceil(output_length / hop)), 1)
+    
+    # Margem para que a busca e a última janela nunca saiam do sinal
+    needed = int(np.ceil((num_frames - 1) * hop * speed)) + tolerance + frame_length
+    pad_end = max(needed - len(x), 0) + tolerance
+    padded = np.pad(x, ((tolerance, pad_end), (0, 0)))
+    mono = padded.mean(axis=1)
+    
+    positions = _find_positions(mono, speed, frame_length, hop, tolerance, num_frames, decimation)
+    
+    # Janela de Hann periódica: com 50% de sobreposição a soma é constante
+    window = (0.5 - 0.5 * np.cos(2 * np.pi * np.arange(frame_length) / frame_length)).astype(np.float32)
+    offsets = np.arange(frame_length)
+    
+    # Com hop = frame_length / 2, a janela k cobre os blocos k e k + 1 da saída
+    blocks = np.zeros((num_frames + 1, hop, x.shape[1]), dtype=np.float32)
+    for first in range(0, num_frames, _OLA_BLOCK):
+        last = min(first + _OLA_BLOCK, num_frames)
+        frames = padded[positions[first:last, np.newaxis] + offsets] * window[:, np.newaxis]
+        blocks[first:last] += frames[:, :hop]
+        blocks[first + 1:last + 1] += frames[:, hop:]
+    
+    # Normaliza pela soma das janelas (só difere de 1 no primeiro bloco)
+    envelope = np.zeros((num_frames + 1, hop), dtype=np.float32)
+    envelope[:num_frames] += window[:hop]
+    envelope[1:] += window[hop:]
+    blocks /= np.maximum(envelope, 1e-3)[:, :, np.newaxis]
+    
+    result = blocks.reshape(-1, x.shape[1])[:output_length]
+    return result[:, 0] if squeeze else result
@@ -0,0 +1,446 @@
+"""
+Backends de síntese de voz usados pelo AudioGenerator
+"""
+import io
+import re
+import time
+import base64
+import random
+import asyncio
+import hashlib
+import logging
+import threading
+from types import SimpleNamespace
+from typing import Optional, Protocol, runtime_checkable
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from gtts import gTTS
+from gtts.tts import gTTSError
+
+from mp3_utils import concat_mp3
+from rate_limiter import UpstreamThrottledError, parse_retry_after
+
+try:
+    import httpx
+except ImportError:  # Opcional - sem httpx a API assíncrona usa threads
+    httpx = None
+
+logger = logging.getLogger(__name__)
+
+# Áudio (base64) na resposta do endpoint batchexecute usado pelo gTTS
+_GTTS_AUDIO_PATTERN = re.compile(r'jQ1olc","\[\\"(.*)\\"]')
+
+# O pool de conexões usa duas partes internas do gTTS: a montagem das
+# requisições (_prepare_requests) e o marcador do áudio na resposta
+# (GOOGLE_TTS_RPC), testadas nas versões fixadas em requirements.txt. Sem
+# elas, a síntese passa pelo próprio gTTS (write_to_fp), sem o pool.
+_GTTS_INTERNALS = hasattr(gTTS, '_prepare_requests') and hasattr(gTTS, 'GOOGLE_TTS_RPC')
+
+
+@runtime_checkable
+class TTSBackend(Protocol):
+    """
+    Interface de um backend de síntese.
+    
+    Um backend sinaliza congestionamento do serviço levantando
+    UpstreamThrottledError (HTTP 429) ou TimeoutError, que fazem o
+    limitador adaptativo reduzir a concorrência.
+    
+    Attributes:
+        name: Nome do backend (usado em logs)
+        cache_namespace: Prefixo das chaves de cache, para que áudios de
+            backends diferentes nunca se misturem
+    """
+    name: str
+    cache_namespace: str
+    
+    def synthesize(self, text: str, lang: str, tld: str, timeout: Optional[float] = None) -> bytes:
+        """Sintetiza um texto e retorna o áudio MP3."""
+        ...
+    
+    async def asynthesize(self, text: str, lang: str, tld: str, timeout: Optional[float] = None) -> bytes:
+        """Versão assíncrona de synthesize."""
+        ...
+    
+    async def aclose(self):
+        """Libera os recursos assíncronos do backend."""
+        ...
+
+
+def _gtts_requests(tts: gTTS) -> Optional[list]:
+    """
+    Requisições HTTP montadas pelo gTTS para um texto.
+    
+    Returns:
+        list: requests.PreparedRequest, uma por trecho de ~100 caracteres,
+        ou None se a versão instalada do gTTS não as expõe
+    """
+    if not _GTTS_INTERNALS:
+        return None
+    return tts._prepare_requests()
+
+
+def _gtts_write(tts: gTTS) -> bytes:
+    """Sintetiza pelo próprio gTTS (sem o pool de conexões nem o endpoint alternativo)."""
+    buffer = io.BytesIO()
+    tts.write_to_fp(buffer)
+    return buffer.getvalue()
+
+
+def _decode_gtts_response(body: str) -> bytes:
+    """
+    Extrai o áudio MP3 da resposta do endpoint usado pelo gTTS.
+    
+    Args:
+        body: Corpo da resposta HTTP
+    
+    Returns:
+        bytes: Áudio MP3
+    """
+    parts = []
+    
+    for line in body.splitlines():
+        if gTTS.GOOGLE_TTS_RPC in line:
+            match = _GTTS_AUDIO_PATTERN.search(line)
+            if not match:
+                raise gTTSError("Resposta do serviço de TTS sem áudio")
+            parts.append(base64.b64decode(match.group(1).encode('ascii')))
+    
+    if not parts:
+        raise gTTSError("Resposta do serviço de TTS sem áudio")
+    
+    return b''.join(parts)
+
+
+class GTTSBackend:
+    """
+    Backend que usa o serviço do Google Translate através do gTTS.
+    
+    O gTTS só monta as requisições; o envio é feito por um pool de
+    conexões HTTP compartilhado por todas as threads, com keep-alive e
+    novas tentativas com backoff, em vez de uma sessão nova por chamada.
+    """
+    
+    name = "gtts"
+    cache_namespace = ""
+    
+    # Falhas transitórias do serviço, repetidas com backoff (429 não entra:
+    # repetir só agrava o limite de taxa)
+    RETRY_STATUSES = (500, 502, 503, 504)
+    
+    def __init__(
+        self,
+        max_connections: int = 64,
+        max_keepalive_connections: int = 32,
+        timeout: float = 30.0,
+        pool_size: int = 16,
+        max_retries: int = 3,
+        backoff_factor: float = 0.3,
+        endpoint: Optional[str] = None
+    ):
+        """
+        Inicializa o backend.
+        
+        Args:
+            max_connections: Conexões simultâneas do cliente assíncrono
+            max_keepalive_connections: Conexões mantidas abertas no pool
+            timeout: Tempo limite padrão das requisições (segundos)
+            pool_size: Conexões mantidas por host no pool síncrono
+            max_retries: Novas tentativas em falhas de conexão e 5xx
+            backoff_factor: Fator do backoff exponencial entre tentativas
+            endpoint: URL alternativa do serviço (aceita {tld}), por
+                exemplo um servidor local nos testes
+        """
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.timeout = timeout
+        self.endpoint = endpoint
+        
+        if not _GTTS_INTERNALS:
+            logger.warning(
+                "Versão do gTTS sem a API interna esperada: síntese sem o pool de conexões"
+                + (f" e sem o endpoint {endpoint}" if endpoint else "")
+            )
+        
+        # Um único adaptador (e pool de conexões) para todas as threads;
+        # cada thread usa a sua própria Session, que não é thread-safe
+        self._adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=pool_size,
+            max_retries=Retry(
+                total=max_retries,
+                backoff_factor=backoff_factor,
+                status_forcelist=self.RETRY_STATUSES,
+                allowed_methods=None,
+                respect_retry_after_header=False,
+                raise_on_status=False
+            )
+        )
+        self._local = threading.local()
+        
+        # Cliente assíncrono, ligado ao event loop em uso
+        self._async_loop = None
+        self._async_client = None
+    
+    def _get_session(self) -> requests.Session:
+        """Retorna a Session da thread atual, ligada ao pool compartilhado."""
+        session = getattr(self._local, 'session', None)
+        
+        if session is None:
+            session = requests.Session()
+            session.mount("https://", self._adapter)
+            session.mount("http://", self._adapter)
+            self._local.session = session
+        
+        return session
+    
+    def _request_url(self, request, tld: str) -> str:
+        """URL de uma requisição montada pelo gTTS (ou a do endpoint alternativo)."""
+        if self.endpoint:
+            return self.endpoint.format(tld=tld)
+        return request.url
+    
+    def synthesize(self, text: str, lang: str, tld: str, timeout: Optional[float] = None) -> bytes:
+        """
+        Sintetiza um texto pelo pool de conexões compartilhado.
+        
+        Args:
+            text: Texto
+            lang: Idioma
+            tld: Top-level domain
+            timeout: Tempo limite de cada requisição HTTP (segundos)
+        
+        Returns:
+            bytes: Áudio MP3
+        """
+        tts = gTTS(text=text, lang=lang, tld=tld, slow=False, timeout=timeout or self.timeout)
+        prepared_requests = _gtts_requests(tts)
+        if prepared_requests is None:
+            return _gtts_write(tts)
+        
+        session = self._get_session()
+        parts = []
+        
+        for request in prepared_requests:
+            request.url = self._request_url(request, tld)
+            # send() não lê o ambiente: proxies (HTTP(S)_PROXY, NO_PROXY) e
+            # certificados vêm daqui, como no gTTS
+            settings = session.merge_environment_settings(request.url, {}, None, None, None)
+            
+            try:
+                response = session.send(request, timeout=timeout or self.timeout, **settings)
+                if response.status_code == 429:
+                    raise UpstreamThrottledError(retry_after=parse_retry_after(response.headers.get("Retry-After")))
+                response.raise_for_status()
+            except requests.exceptions.HTTPError:
+                raise gTTSError(tts=tts, response=response)
+            except requests.exceptions.Timeout as e:
+                raise TimeoutError(f"Tempo limite do serviço de TTS excedido: {e}") from e
+            except requests.exceptions.RequestException as e:
+                logger.debug(f"Falha na requisição ao serviço de TTS: {e}")
+                raise gTTSError(tts=tts)
+            
+            parts.append(_decode_gtts_response(response.text))
+        
+        return concat_mp3(parts)
+    
+    def close(self):
+        """Fecha as conexões do pool síncrono."""
+        self._adapter.close()
+
+    def _get_async_client(self):
+        """
+        Retorna o cliente httpx do event loop atual (ou None sem httpx).
+        
+        O cliente fica ligado ao loop em que foi criado, então é recriado
+        quando o backend passa a ser usado em outro loop.
+        """
+        if httpx is None:
+            return None
+        
+        loop = asyncio.get_running_loop()
+        
+        if self._async_loop is not loop:
+            self._async_loop = loop
+            self._async_client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections
+                )
+            )
+        
+        return self._async_client
+    
+    async def asynthesize(self, text: str, lang: str, tld: str, timeout: Optional[float] = None) -> bytes:
+        """
+        Sintetiza um texto usando o cliente HTTP compartilhado.
+        
+        O gTTS monta as requisições (uma por trecho de ~100 caracteres) e
+        elas são enviadas em paralelo pelo pool de conexões do httpx. Sem
+        httpx, a síntese síncrona roda em uma thread.
+        
+        Args:
+            text: Texto
+            lang: Idioma
+            tld: Top-level domain
+            timeout: Tempo limite de cada requisição HTTP (segundos)
+        
+        Returns:
+            bytes: Áudio MP3
+        """
+        client = self._get_async_client()
+        
+        if client is None or not _GTTS_INTERNALS:
+            return await asyncio.to_thread(self.synthesize, text, lang, tld, timeout)
+        
+        tts = gTTS(text=text, lang=lang, tld=tld, slow=False)
+        
+        async def send(request) -> bytes:
+            try:
+                response = await client.post(
+                    self._request_url(request, tld),
+                    content=request.body,
+                    headers=dict(request.headers),
+                    timeout=timeout or self.timeout
+                )
+            except httpx.TimeoutException as e:
+                raise TimeoutError(f"Tempo limite do serviço de TTS excedido: {e}") from e
+            except httpx.RequestError as e:
+                logger.debug(f"Falha na requisição ao serviço de TTS: {e}")
+                raise gTTSError(tts=tts)
+            
+            if response.status_code == 429:
+                raise UpstreamThrottledError(retry_after=parse_retry_after(response.headers.get("Retry-After")))
+            if response.is_error:
+                # Mesmo erro da síntese síncrona (o gTTSError lê status_code e reason)
+                raise gTTSError(tts=tts, response=SimpleNamespace(
+                    status_code=response.status_code, reason=response.reason_phrase
+                ))
+            return _decode_gtts_response(response.text)
+        
+        prepared_requests = _gtts_requests(tts)
+        parts = await asyncio.gather(*(send(request) for request in prepared_requests))
+        
+        return concat_mp3(parts)
+    
+    async def aclose(self):
+        """Fecha o cliente HTTP assíncrono."""
+        if self._async_client is not None:
+            await self._async_client.aclose()
+        self._async_loop = None
+        self._async_client = None
+
+
+class LocalBackend:
+    """
+    Backend local e determinístico, sem acesso à rede.
+    
+    Gera MP3 válido (frames MPEG-2 Layer III de 24 kHz mono, o mesmo
+    formato do gTTS) com duração proporcional ao texto. O áudio é
+    silencioso; os bytes de dados auxiliares de cada frame carregam um hash
+    do pedido, então textos diferentes geram arquivos diferentes e o mesmo
+    texto gera sempre o mesmo arquivo. Latência e jitter configuráveis
+    simulam o serviço real em testes de carga e benchmarks.
+    """
+    
+    name = "local"
+    cache_namespace = "local:"
+    
+    # Cabeçalho MPEG-2 Layer III, 32 kbps, 24 kHz, mono, sem CRC
+    FRAME_HEADER = bytes([0xFF, 0xF3, 0x44, 0xC0])
+    FRAME_SIZE = 96  # 72 * 32000 / 24000
+    FRAME_DURATION = 576 / 24000  # 24 ms
+    SIDE_INFO_SIZE = 9  # Zerada: o frame decodifica como silêncio
+    
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        char_latency: float = 0.0,
+        seconds_per_char: float = 0.06,
+        seed: int = 0
+    ):
+        """
+        Inicializa o backend.
+        
+        Args:
+            latency: Latência fixa de cada chamada (segundos)
+            jitter: Variação máxima, para mais ou para menos, da latência
+            char_latency: Latência adicional por caractere (segundos)
+            seconds_per_char: Duração do áudio gerado por caractere
+            seed: Semente do gerador de jitter
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.char_latency = char_latency
+        self.seconds_per_char = seconds_per_char
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+    
+    def render(self, text: str, lang: str, tld: str) -> bytes:
+        """
+        Gera o MP3 sintético de um texto, sem simular latência.
+        
+        Args:
+            text: Texto
+            lang: Idioma
+            tld: Top-level domain
+        
+        Returns:
+            bytes: Áudio MP3
+        """
+        num_frames = max(1, round(len(text) * self.seconds_per_char / self.FRAME_DURATION))
+        
+        digest = hashlib.sha1(f"{text}_{lang}_{tld}".encode('utf-8')).digest()
+        payload_size = self.FRAME_SIZE - len(self.FRAME_HEADER) - self.SIDE_INFO_SIZE
+        payload = (digest * (payload_size // len(digest) + 1))[:payload_size]
+        
+        frame = self.FRAME_HEADER + bytes(self.SIDE_INFO_SIZE) + payload
+        return frame * num_frames
+    
+    def _delay(self, text: str) -> float:
+        """Sorteia a latência simulada de uma chamada."""
+        with self._lock:
+            self.calls += 1
+            jitter = self._random.uniform(-self.jitter, self.jitter) if self.jitter else 0.0
+        return max(0.0, self.latency + jitter + self.char_latency * len(text))
+    
+    def synthesize(self, text: str, lang: str, tld: str, timeout: Optional[float] = None) -> bytes:
+        """
+        Sintetiza um texto (com a latência simulada).
+        
+        Args:
+            text: Texto
+            lang: Idioma
+            tld: Top-level domain
+            timeout: Tempo limite; latências maiores geram TimeoutError
+        
+        Returns:
+            bytes: Áudio MP3
+        """
+        delay = self._delay(text)
+        
+        if timeout is not None and delay > timeout:
+            time.sleep(timeout)
+            raise TimeoutError(f"Backend local excedeu {timeout}s")
+        
+        time.sleep(delay)
+        return self.render(text, lang, tld)
+    
+    async def asynthesize(self, text: str, lang: str, tld: str, timeout: Optional[float] = None) -> bytes:
+        """Versão assíncrona de synthesize."""
+        delay = self._delay(text)
+        
+        if timeout is not None and delay > timeout:
+            await asyncio.sleep(timeout)
+            raise TimeoutError(f"Backend local excedeu {timeout}s")
+        
+        await asyncio.sleep(delay)
+        return self.render(text, lang, tld)
+    
+    async def aclose(self):
+        """Nada a liberar."""
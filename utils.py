@@ -3,11 +3,15 @@ Funções utilitárias para o Voicify
 """
 import re
 import os
+import csv
+import json
 import hashlib
 import logging
-from typing import Optional, Tuple
+from typing import Any, Dict, Iterator, Optional, Tuple
 from datetime import datetime
 
+from text_segmenter import DEFAULT_MAX_CHARS, iter_segments
+
 logger = logging.getLogger(__name__)
 
 
@@ -64,6 +68,19 @@ def calculate_text_hash(text: str) -> str:
     return hashlib.md5(text.encode('utf-8')).hexdigest()
 
 
+def detect_audio_format(audio_data: bytes) -> str:
+    """
+    Identifica o formato do áudio pelo conteúdo.
+    
+    Args:
+        audio_data: Dados do áudio
+    
+    Returns:
+        str: 'ogg' (contêiner Ogg, ex.: Opus) ou 'mp3'
+    """
+    return 'ogg' if audio_data[:4] == b'OggS' else 'mp3'
+
+
 def estimate_audio_duration(text: str, words_per_minute: int = 150) -> float:
     """
     Estima duração do áudio em segundos.
@@ -135,41 +152,50 @@ def split_text_into_chunks(text: str, max_chunk_size: int = 500) -> list:
     """
     Divide texto em chunks menores.
     
+    Agrupa as frases de iter_segments, na ordem, em chunks de até
+    max_chunk_size caracteres, sem alterar a pontuação.
+    
     Args:
         text: Texto para dividir
-        max_chunk_size: Tamanho máximo do chunk em palavras
+        max_chunk_size: Tamanho máximo do chunk em caracteres
         
     Returns:
         list: Lista de chunks
     """
-    sentences = re.split(r'[.!?]+', text)
     chunks = []
-    current_chunk = []
-    current_size = 0
+    current_chunk = ""
     
-    for sentence in sentences:
-        sentence = sentence.strip()
-        if not sentence:
-            continue
-        
-        words = sentence.split()
-        sentence_size = len(words)
-        
-        if current_size + sentence_size > max_chunk_size:
-            if current_chunk:
-                chunks.append(' '.join(current_chunk) + '.')
-            current_chunk = words
-            current_size = sentence_size
+    for segment in iter_segments(text, max_chunk_size):
+        if current_chunk and len(current_chunk) + 1 + len(segment) > max_chunk_size:
+            chunks.append(current_chunk)
+            current_chunk = segment
         else:
-            current_chunk.extend(words)
-            current_size += sentence_size
+            current_chunk = f"{current_chunk} {segment}" if current_chunk else segment
     
     if current_chunk:
-        chunks.append(' '.join(current_chunk) + '.')
+        chunks.append(current_chunk)
     
     return chunks
 
 
+def split_text_into_sentences(text: str, max_chars: int = DEFAULT_MAX_CHARS) -> list:
+    """
+    Divide texto em frases, sem agrupá-las em chunks maiores.
+    
+    Cada frase de iter_segments vira um chunk próprio (frases com mais de
+    max_chars caracteres são quebradas). Assim, editar uma frase não
+    desloca os limites das demais.
+    
+    Args:
+        text: Texto para dividir
+        max_chars: Tamanho máximo de cada frase em caracteres
+    
+    Returns:
+        list: Lista de frases
+    """
+    return list(iter_segments(text, max_chars))
+
+
 def setup_logging():
     """Configura sistema de logging."""
     logging.basicConfig(
@@ -182,6 +208,30 @@ def setup_logging():
     )
 
 
+def read_rows(path: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Lê as linhas de um arquivo JSONL ou CSV sem carregá-lo inteiro.
+    
+    Args:
+        path: Arquivo de entrada (.csv = CSV com cabeçalho; senão, JSONL)
+    
+    Yields:
+        tuple: (número da linha de dados, campos da linha)
+    """
+    with open(path, encoding='utf-8', newline='') as f:
+        if path.lower().endswith('.csv'):
+            for index, row in enumerate(csv.DictReader(f)):
+                yield index, row
+            return
+        
+        index = 0
+        for line in f:
+            if not line.strip():
+                continue
+            yield index, json.loads(line)
+            index += 1
+
+
 def get_timestamp() -> str:
     """Retorna timestamp formatado."""
     return datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -0,0 +1,318 @@
+"""
+Linha de comando do Voicify (sem a interface do Streamlit)
+
+Uso:
+    python -m voicify render prompts.jsonl --output-dir audios --workers 8
+    python -m voicify render aulas.csv --output-dir audios
+    python -m voicify warmup catalogo.txt --language "🇧🇷 Português (Brasil)" --language "🇺🇸 Inglês (EUA)"
+    python -m voicify document capitulo.txt --output capitulo.mp3 --language "🇧🇷 Português (Brasil)"
+
+Cada linha da entrada (JSONL ou CSV com cabeçalho) tem os campos text,
+language (rótulo de LanguageConfig.LANGUAGES), speed (opcional, padrão
+1.0) e name (nome do arquivo de saída). Com --quality, os áudios saem no
+perfil escolhido (Baixa grava .ogg). O progresso é registrado em um
+checkpoint; se a execução for interrompida, rodar o mesmo comando de novo
+continua de onde parou.
+
+O comando document narra um único arquivo de texto de qualquer tamanho
+(sem o limite de caracteres da interface) em um MP3, com memória
+constante; também pode ser retomado (ver long_document).
+
+O comando warmup pré-renderiza um catálogo de frases no cache (ver
+warmup) e sai com código 1 se a cobertura não chegar a 100%.
+"""
+import os
+import sys
+import json
+import time
+import hashlib
+import logging
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Dict, List, Optional
+
+from config import VoicifyConfig, LanguageConfig
+from utils import read_rows, sanitize_filename, validate_text
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_FILENAME = ".voicify-checkpoint.jsonl"
+
+
+def row_key(row: Dict[str, Any], quality: str = VoicifyConfig.DEFAULT_QUALITY) -> str:
+    """Identifica o conteúdo de uma linha (muda se o texto, o idioma, a velocidade, o nome ou a qualidade mudarem)."""
+    fields = [str(row.get(field) or '') for field in ('text', 'language', 'speed', 'name')]
+    if quality != VoicifyConfig.DEFAULT_QUALITY:
+        fields.append(quality)  # chaves da qualidade padrão continuam as de antes
+    return hashlib.sha256('\x1f'.join(fields).encode('utf-8')).hexdigest()[:16]
+
+
+class Checkpoint:
+    """
+    Registro (JSONL) das linhas já processadas de uma execução.
+    
+    Cada linha concluída é gravada e sincronizada com o disco assim que o
+    arquivo de saída está completo, então uma queda perde no máximo os
+    itens em andamento. Uma linha só é pulada na retomada se o conteúdo
+    for o mesmo e o arquivo ainda existir.
+    """
+    
+    def __init__(self, path: str):
+        """
+        Abre o checkpoint, carregando o que já foi registrado.
+        
+        Args:
+            path: Arquivo do checkpoint
+        """
+        self.path = path
+        self.done = {}
+        self._lock = threading.Lock()
+        
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # linha incompleta de uma execução interrompida
+                    if entry.get('status') == 'done':
+                        self.done[entry['row']] = entry
+        
+        self._file = open(path, 'a', encoding='utf-8')
+    
+    def is_done(self, index: int, key: str) -> bool:
+        """Verifica se a linha já foi renderizada com o mesmo conteúdo."""
+        entry = self.done.get(index)
+        return entry is not None and entry['key'] == key and os.path.exists(entry['file'])
+    
+    def record(self, entry: Dict[str, Any]):
+        """Registra o resultado de uma linha."""
+        with self._lock:
+            self._file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            self._file.flush()
+            os.fsync(self._file.fileno())
+    
+    def close(self):
+        self._file.close()
+
+
+def _write_file(path: str, data: bytes):
+    """Grava o arquivo de forma atômica (nunca deixa um áudio pela metade)."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def render_corpus(
+    input_path: str,
+    output_dir: str,
+    workers: int = 4,
+    checkpoint_path: Optional[str] = None,
+    generator=None,
+    quality: str = VoicifyConfig.DEFAULT_QUALITY
+) -> Dict[str, int]:
+    """
+    Renderiza todas as linhas de um arquivo, retomando de um checkpoint.
+    
+    Args:
+        input_path: Arquivo JSONL ou CSV
+        output_dir: Diretório dos áudios gerados
+        workers: Linhas renderizadas em paralelo
+        checkpoint_path: Arquivo do checkpoint (padrão: dentro de output_dir)
+        generator: AudioGenerator (padrão: o gerador compartilhado do processo)
+        quality: Perfil de saída (chave de OUTPUT_PROFILES); define também
+            a extensão dos arquivos
+    
+    Returns:
+        dict: Contagem de linhas 'rendered', 'skipped' e 'failed'
+    """
+    if generator is None:
+        from audio_generator import get_shared_generator
+        generator = get_shared_generator()
+    
+    os.makedirs(output_dir, exist_ok=True)
+    checkpoint = Checkpoint(checkpoint_path or os.path.join(output_dir, CHECKPOINT_FILENAME))
+    counts = {'rendered': 0, 'skipped': 0, 'failed': 0}
+    audio_format = VoicifyConfig.OUTPUT_PROFILES[quality]['format']
+    used_names = set()
+    start = time.perf_counter()
+    
+    def render(index: int, row: Dict[str, Any], key: str, path: str) -> Dict[str, Any]:
+        entry = {'row': index, 'key': key, 'file': path}
+        
+        text = row.get('text') or ''
+        language = LanguageConfig.LANGUAGES.get(row.get('language'))
+        is_valid, message = validate_text(text, VoicifyConfig.MAX_TEXT_LENGTH)
+        
+        try:
+            speed = float(row.get('speed') or 1.0)
+        except ValueError:
+            speed = None
+        
+        if language is None:
+            error = f"Idioma desconhecido: {row.get('language')!r}"
+        elif not is_valid:
+            error = message
+        elif speed is None or not VoicifyConfig.MIN_SPEED <= speed <= VoicifyConfig.MAX_SPEED:
+            error = f"Velocidade inválida: {row.get('speed')!r}"
+        else:
+            result = generator.generate_audio(text, language['code'], speed, language['tld'], quality=quality)
+            if result['success']:
+                # Se a recodificação falhar, o áudio sai em MP3: a extensão acompanha
+                path = f"{os.path.splitext(path)[0]}.{result['format']}"
+                entry['file'] = path
+                try:
+                    _write_file(path, result['audio_data'])
+                    return dict(entry, status='done', size=result['size'])
+                except OSError as e:
+                    result['error'] = f"Erro ao gravar {path}: {e}"
+            error = result['error']
+        
+        return dict(entry, status='failed', error=error)
+    
+    def finish(future):
+        entry = future.result()
+        checkpoint.record(entry)
+        
+        if entry['status'] == 'done':
+            counts['rendered'] += 1
+        else:
+            counts['failed'] += 1
+            logger.error(f"Linha {entry['row']}: {entry['error']}")
+    
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="voicify-cli")
+    pending = set()
+    
+    try:
+        for index, row in read_rows(input_path):
+            # Nomes repetidos recebem o número da linha (determinístico na retomada)
+            name = sanitize_filename(str(row.get('name') or f"{index:06d}"))
+            if name in used_names:
+                name = f"{name}-{index}"
+            used_names.add(name)
+            
+            key = row_key(row, quality)
+            if checkpoint.is_done(index, key):
+                counts['skipped'] += 1
+                continue
+            
+            path = os.path.join(output_dir, f"{name}.{audio_format}")
+            pending.add(executor.submit(render, index, row, key, path))
+            
+            # Janela limitada: a entrada é lida aos poucos
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    finish(future)
+        
+        for future in pending:
+            finish(future)
+    
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        checkpoint.close()
+    
+    elapsed = time.perf_counter() - start
+    logger.info(
+        f"Corpus: {counts['rendered']} renderizados, {counts['skipped']} já prontos, "
+        f"{counts['failed']} falhas em {elapsed:.1f}s"
+    )
+    
+    return counts
+
+
+def cmd_render(args) -> int:
+    counts = render_corpus(args.input, args.output_dir, args.workers, args.checkpoint, quality=args.quality)
+    print(f"{counts['rendered']} renderizados, {counts['skipped']} já prontos, {counts['failed']} falhas")
+    return 1 if counts['failed'] else 0
+
+
+def cmd_document(args) -> int:
+    from long_document import render_document
+    
+    language = LanguageConfig.LANGUAGES.get(args.language)
+    if language is None:
+        print(f"Idioma desconhecido: {args.language!r}", file=sys.stderr)
+        return 2
+    
+    def show(progress: float, stage: str):
+        print(f"\r{progress:6.1%}", end="", file=sys.stderr, flush=True)
+    
+    result = render_document(
+        args.input, args.output, language['code'], language['tld'], args.speed,
+        max_workers=args.workers, progress_callback=show
+    )
+    print(file=sys.stderr)
+    
+    if not result['success']:
+        print(f"Erro: {result['error']} (rode de novo para continuar da frase {result['segments']})", file=sys.stderr)
+        return 1
+    
+    print(f"{result['segments']} frases, {result['duration']:.0f}s de áudio gravados em {args.output}")
+    return 0
+
+
+def cmd_warmup(args) -> int:
+    from warmup import read_catalog, warm_cache
+    
+    skipped = {}
+    try:
+        report = warm_cache(
+            read_catalog(args.catalog), args.language,
+            workers=args.workers, dry_run=args.check, quality=args.quality, skipped=skipped
+        )
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return 2
+    
+    for label, counts in report.items():
+        print(
+            f"{label}: {counts['coverage']:.1%} de {counts['total']} no cache "
+            f"({counts['cached']} já estavam, {counts['rendered']} renderizados, {counts['failed']} falhas)"
+        )
+    if any(skipped.values()):
+        print(
+            f"Entradas puladas: {skipped['unknown_language']} de idioma desconhecido, "
+            f"{skipped['other_language']} de outros idiomas, {skipped['invalid_speed']} com velocidade inválida"
+        )
+    return 0 if all(counts['coverage'] == 1.0 for counts in report.values()) else 1
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="voicify", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    render = subparsers.add_parser("render", help="Renderiza as linhas de um arquivo JSONL ou CSV")
+    render.add_argument("input", help="Arquivo JSONL ou CSV")
+    render.add_argument("--output-dir", default="voicify_output", help="Diretório dos áudios")
+    render.add_argument("--workers", type=int, default=VoicifyConfig.BATCH_MAX_WORKERS, help="Linhas em paralelo")
+    render.add_argument("--checkpoint", help="Arquivo do checkpoint (padrão: no diretório de saída)")
+    render.add_argument("--quality", choices=list(VoicifyConfig.OUTPUT_PROFILES), default=VoicifyConfig.DEFAULT_QUALITY, help="Perfil de saída")
+    render.set_defaults(func=cmd_render)
+    
+    warmup = subparsers.add_parser("warmup", help="Pré-renderiza um catálogo de frases no cache")
+    warmup.add_argument("catalog", help="Catálogo: .txt (uma frase por linha), JSONL ou CSV")
+    warmup.add_argument("--language", action="append", help="Rótulo do idioma (repetível; padrão: todos)")
+    warmup.add_argument("--workers", type=int, default=VoicifyConfig.BATCH_MAX_WORKERS, help="Frases em paralelo")
+    warmup.add_argument("--quality", choices=list(VoicifyConfig.OUTPUT_PROFILES), default=VoicifyConfig.DEFAULT_QUALITY, help="Perfil de saída")
+    warmup.add_argument("--check", action="store_true", help="Só informa a cobertura, sem renderizar")
+    warmup.set_defaults(func=cmd_warmup)
+    
+    document = subparsers.add_parser("document", help="Narra um arquivo de texto longo em um único MP3")
+    document.add_argument("input", help="Arquivo de texto (UTF-8)")
+    document.add_argument("--output", required=True, help="Arquivo MP3 de saída")
+    document.add_argument("--language", default="🇧🇷 Português (Brasil)", help="Rótulo do idioma (como na interface)")
+    document.add_argument("--speed", type=float, default=VoicifyConfig.DEFAULT_SPEED, help="Velocidade da fala")
+    document.add_argument("--workers", type=int, default=VoicifyConfig.CHUNK_MAX_WORKERS, help="Frases em paralelo")
+    document.set_defaults(func=cmd_document)
+    
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,206 @@
+"""
+Pré-aquecimento do cache com um catálogo fixo de frases
+
+Renderiza o catálogo em cada variante de idioma pedida, em paralelo,
+pulando o que já está no cache, para que um nó recém-implantado sirva
+o catálogo inteiro sem chamar o gTTS.
+
+O catálogo pode ser um arquivo de texto (uma frase por linha) ou um
+JSONL/CSV com o campo text e, opcionalmente, language (rótulo de
+LanguageConfig.LANGUAGES: a frase só vale para esse idioma) e speed.
+Entradas de outros idiomas, de idiomas desconhecidos ou com velocidade
+inválida são puladas, contadas e registradas no log.
+"""
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from config import VoicifyConfig, LanguageConfig
+from utils import read_rows, validate_text
+
+logger = logging.getLogger(__name__)
+
+
+def read_catalog(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Lê as entradas de um catálogo de frases.
+    
+    Args:
+        path: Arquivo .txt (uma frase por linha), .csv ou JSONL
+    
+    Yields:
+        dict: Entradas com 'text' e, se houver, 'language' e 'speed'
+    """
+    if path.lower().endswith('.txt'):
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield {'text': line.strip()}
+        return
+    
+    for _, row in read_rows(path):
+        yield row
+
+
+def _targets(
+    catalog: Iterable[Dict[str, Any]],
+    languages: List[str],
+    skipped: Dict[str, int]
+) -> Iterator[Tuple[str, str, float]]:
+    """
+    Expande o catálogo em (rótulo do idioma, texto, velocidade), sem repetições.
+    
+    Args:
+        catalog: Entradas do catálogo
+        languages: Rótulos pedidos
+        skipped: Recebe as entradas puladas por motivo (ver warm_cache)
+    """
+    seen = set()
+    
+    for entry in catalog:
+        text = (entry.get('text') or '').strip()
+        try:
+            speed = float(entry.get('speed') or 1.0)
+        except ValueError:
+            skipped['invalid_speed'] += 1
+            logger.error(f"Velocidade inválida em {text[:40]!r}: {entry.get('speed')!r}")
+            continue
+        
+        label = entry.get('language')
+        if label and label not in LanguageConfig.LANGUAGES:
+            skipped['unknown_language'] += 1
+            logger.warning(f"Idioma desconhecido no catálogo, entrada pulada: {label!r} ({text[:40]!r})")
+            continue
+        if label and label not in languages:
+            skipped['other_language'] += 1
+            continue
+        
+        for label in ([label] if label else languages):
+            target = (label, text, speed)
+            if target not in seen:
+                seen.add(target)
+                yield target
+
+
+def warm_cache(
+    catalog: Iterable[Dict[str, Any]],
+    languages: Optional[List[str]] = None,
+    generator=None,
+    workers: int = VoicifyConfig.BATCH_MAX_WORKERS,
+    dry_run: bool = False,
+    quality: str = VoicifyConfig.DEFAULT_QUALITY,
+    skipped: Optional[Dict[str, int]] = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Renderiza no cache as frases do catálogo que ainda não estão nele.
+    
+    A cobertura final é conferida de novo no índice do cache, então um
+    cache pequeno demais para o catálogo (com despejos durante o
+    aquecimento) aparece como cobertura incompleta.
+    
+    Args:
+        catalog: Entradas do catálogo (ver read_catalog)
+        languages: Rótulos de LanguageConfig.LANGUAGES (padrão: todos)
+        generator: AudioGenerator (padrão: o gerador compartilhado do processo)
+        workers: Frases renderizadas em paralelo
+        dry_run: Só mede a cobertura atual, sem renderizar
+        quality: Perfil de saída a aquecer (chave de OUTPUT_PROFILES)
+        skipped: Dicionário preenchido com as entradas puladas:
+            'unknown_language', 'other_language' (idioma não pedido) e
+            'invalid_speed'
+    
+    Returns:
+        dict: Por rótulo de idioma, as contagens 'total', 'cached' (já
+        estavam no cache), 'rendered', 'failed' e 'coverage' (fração do
+        catálogo no cache ao final)
+    """
+    if generator is None:
+        from audio_generator import get_shared_generator
+        generator = get_shared_generator()
+    
+    languages = list(languages or LanguageConfig.LANGUAGES)
+    for label in languages:
+        if label not in LanguageConfig.LANGUAGES:
+            raise ValueError(f"Idioma desconhecido: {label!r}")
+    
+    report = {
+        label: {'total': 0, 'cached': 0, 'rendered': 0, 'failed': 0, 'coverage': 0.0}
+        for label in languages
+    }
+    if skipped is None:
+        skipped = {}
+    skipped.update({'unknown_language': 0, 'other_language': 0, 'invalid_speed': 0})
+    targets = []
+    start = time.perf_counter()
+    
+    def render(label: str, text: str, speed: float) -> Dict[str, Any]:
+        language = LanguageConfig.LANGUAGES[label]
+        return generator.generate_audio(text, language['code'], speed, language['tld'], quality=quality)
+    
+    def finish(future, label: str, text: str):
+        result = future.result()
+        if result['success']:
+            report[label]['rendered'] += 1
+        else:
+            report[label]['failed'] += 1
+            logger.error(f"Falha ao aquecer {text[:40]!r} ({label}): {result['error']}")
+    
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="voicify-warmup")
+    pending = {}
+    
+    try:
+        for label, text, speed in _targets(catalog, languages, skipped):
+            language = LanguageConfig.LANGUAGES[label]
+            report[label]['total'] += 1
+            targets.append((label, text, speed))
+            
+            is_valid, message = validate_text(text, VoicifyConfig.MAX_TEXT_LENGTH)
+            if not is_valid:
+                report[label]['failed'] += 1
+                logger.error(f"Entrada inválida {text[:40]!r}: {message}")
+                continue
+            
+            if generator.is_cached(text, language['code'], speed, language['tld'], quality):
+                report[label]['cached'] += 1
+                continue
+            if dry_run:
+                continue
+            
+            pending[executor.submit(render, label, text, speed)] = (label, text)
+            
+            # Janela limitada: o catálogo é lido aos poucos
+            if len(pending) >= workers * 2:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    finish(future, *pending.pop(future))
+        
+        for future in list(pending):
+            finish(future, *pending.pop(future))
+    
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+    
+    # Cobertura conferida no cache (pode ter havido despejos)
+    covered = dict.fromkeys(languages, 0)
+    for label, text, speed in targets:
+        language = LanguageConfig.LANGUAGES[label]
+        if generator.is_cached(text, language['code'], speed, language['tld'], quality):
+            covered[label] += 1
+    
+    for label, counts in report.items():
+        counts['coverage'] = covered[label] / counts['total'] if counts['total'] else 1.0
+    
+    elapsed = time.perf_counter() - start
+    logger.info(
+        f"Aquecimento: {sum(c['rendered'] for c in report.values())} renderizados, "
+        f"{sum(c['cached'] for c in report.values())} já no cache, "
+        f"{sum(c['failed'] for c in report.values())} falhas em {elapsed:.1f}s"
+    )
+    if any(skipped.values()):
+        logger.warning(
+            f"Entradas do catálogo puladas: {skipped['unknown_language']} de idioma desconhecido, "
+            f"{skipped['other_language']} de outros idiomas, {skipped['invalid_speed']} com velocidade inválida"
+        )
+    
+    return report